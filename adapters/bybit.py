@@ -1,5 +1,21 @@
+import os
+import time
+
+from pybit.exceptions import InvalidRequestError
 from pybit.unified_trading import HTTP
 
+from adapters.bybit_stream import BybitTickerStream
+from adapters.fanout import FanOut
+from adapters.orders import FINAL, OrderPipeline
+from adapters.scheduler import RequestScheduler, pool_connections
+from core.candles import CandleAggregator
+from core.circuit import CircuitBreaker
+
+
+def _base_coin(symbol: str) -> str:
+    """ETHUSDT -> ETH."""
+    return symbol[: -len("USDT")] if symbol.endswith("USDT") else symbol
+
 
 class BybitBroker:
     """
@@ -9,11 +25,44 @@ class BybitBroker:
     - OBSERVADOR: nunca executa ordens (apenas loga)
     - REAL: executa ordens reais
 
+    Market data:
+    - stream=False: REST a cada tick
+    - stream=True: WebSocket em segundo plano; tick() só lê a
+      tabela de últimos preços (sem rede no caminho do Engine)
+
+    Execução:
+    - submit() envia a ordem e retorna o orderLinkId na hora;
+      order_status() diz em que pé ela está (ver OrderPipeline)
+    - buy()/sell() são a versão bloqueante, para quem ainda espera
+      o resultado na mesma chamada
+
+    Candles:
+    - timeframes=("5m", "4h", ...): barras OHLCV montadas localmente a
+      partir dos preços de cada tick (CandleAggregator), sem requisição
+      extra; fechamentos saem no snapshot como "_bars" e "_event"
+
+    Credenciais vêm de BYBIT_API_KEY / BYBIT_API_SECRET.
+
     Nunca lança exceção para fora.
     """
 
     def __init__(
-        self, symbols: list[str], mode: str = "OBSERVADOR", armed: bool = False
+        self,
+        symbols: list[str],
+        mode: str = "OBSERVADOR",
+        armed: bool = False,
+        stream: bool = False,
+        stream_url: str | None = None,
+        endpoint: str | None = None,
+        workers: int = 8,
+        request_timeout: float = 2.0,
+        tick_timeout: float = 3.0,
+        hedge_after: float | None = None,
+        scheduler: RequestScheduler | None = None,
+        order_value: float = 10.0,
+        order_timeout: float = 10.0,
+        timeframes: tuple | None = None,
+        min_position_value: float = 1.0,
     ):
         self.symbols = symbols
         self.mode = mode
@@ -22,9 +71,60 @@ class BybitBroker:
         self.session = HTTP(
             testnet=False,
             recv_window=10000,
+            timeout=request_timeout,
+            api_key=os.environ.get("BYBIT_API_KEY"),
+            api_secret=os.environ.get("BYBIT_API_SECRET"),
+        )
+        if endpoint:
+            # Ex.: servidor local de testes (tools/fake_rest_exchange.py)
+            self.session.endpoint = endpoint
+        pool_connections(self.session.client, workers)
+
+        # Toda requisição passa pelo agendador: orçamento por classe
+        # de endpoint e ordens sempre na frente do polling
+        self.scheduler = scheduler or RequestScheduler(workers=workers)
+        self.request_timeout = request_timeout
+
+        # Requisições concorrentes com prazo: nenhum símbolo lento
+        # segura o tick inteiro
+        self.fanout = FanOut(
+            workers=workers,
+            request_timeout=request_timeout,
+            tick_timeout=tick_timeout,
+            hedge_after=hedge_after,
+            executor=self.scheduler.lane("market"),
         )
 
         self._last_snapshot: dict = {}
+        self._universe = frozenset(symbols)
+        self.errors: dict[str, str] = {}  # símbolo -> erro do último tick
+
+        # Último preço bom de cada símbolo e quando chegou (monotonic)
+        self._known: dict[str, float] = {}
+        self._fetched_at: dict[str, float] = {}
+
+        # Corretora lenta ou falhando: para de insistir e entra em
+        # modo degradado (preços antigos, marcados como tal)
+        self.breaker = CircuitBreaker("BYBIT", slow_seconds=request_timeout / 2)
+
+        # Ordens: envio assíncrono, acompanhadas tick a tick
+        self.orders = OrderPipeline(
+            self.session,
+            self.scheduler,
+            ack_timeout=request_timeout,
+            on_fill=self._on_filled,
+            deadline=order_timeout,
+        )
+        self.order_value = order_value  # valor em USDT de cada compra
+        self.order_timeout = order_timeout
+        self.holdings: dict[str, float] = {}  # símbolo -> qty comprada (líquida)
+        self.min_position_value = min_position_value  # USDT; abaixo é poeira
+
+        self.candles = CandleAggregator(symbols, timeframes) if timeframes else None
+
+        self.stream = None
+        if stream:
+            self.stream = BybitTickerStream(symbols, url=stream_url).start()
 
     # -------------------------------------------------
     # MERCADO
@@ -36,34 +136,155 @@ class BybitBroker:
             "BTCUSDT": 90481.0,
             "ETHUSDT": 3047.2,
             ...
+            "_freshness": {"BTCUSDT": 0.0, "ETHUSDT": 4.2, ...}
         }
 
+        Com timeframes configurados, nos ticks em que alguma barra fecha:
+            "_bars": {"BTCUSDT": {"5m": {"ts", "open", ..., "volume"}}}
+            "_event": {"time_event": ["5M_CLOSED", ...]}
+
+        Símbolos que não responderam dentro do prazo do tick mantêm o
+        último preço conhecido; "_freshness" diz há quantos segundos
+        cada preço chegou (None = nunca).
+
+        Com o disjuntor aberto, nenhuma requisição sai: o snapshot é
+        só o último conhecido, envelhecendo.
+
         Nunca lança exceção.
         Em falha, retorna último snapshot válido ou {}.
         """
-        prices = {}
+        self.poll_orders()
+
+        if self.stream is not None:
+            snapshot = self.stream.snapshot()
+            snapshot["_freshness"] = {s: self.stream.age(s) for s in self.symbols}
+            return self._aggregate(snapshot)
+
+        if not self.breaker.allow():
+            return self._aggregate(self._snapshot(), {})
 
         try:
-            for symbol in self.symbols:
-                try:
-                    r = self.session.get_tickers(category="spot", symbol=symbol)
+            self.errors = {}
+            deadline = self.fanout.deadline()
+            prices = self._fetch_bulk(deadline)
 
-                    if r.get("retCode") != 0:
-                        prices[symbol] = None
-                    else:
-                        last = r["result"]["list"][0]["lastPrice"]
-                        prices[symbol] = float(last)
+            # Fallback individual, em paralelo, apenas para quem faltou no
+            # lote — e só com o disjuntor fechado (sonda é uma requisição só)
+            missing = [s for s in self.symbols if prices.get(s) is None]
+            if missing and self.breaker.state == CircuitBreaker.CLOSED:
+                prices.update(self._fetch_many(missing, deadline))
 
-                except Exception as e:
-                    print(f"[BYBIT] Erro ao buscar {symbol}: {e}")
-                    prices[symbol] = None
+            now = time.monotonic()
+            for symbol, price in prices.items():
+                if price is not None:
+                    self._known[symbol] = price
+                    self._fetched_at[symbol] = now
 
-            self._last_snapshot = prices
-            return prices
+            return self._aggregate(self._snapshot(), prices)
 
         except Exception:
             return self._last_snapshot or {}
 
+    def _snapshot(self) -> dict:
+        now = time.monotonic()
+        snapshot = {s: self._known.get(s) for s in self.symbols}
+        snapshot["_freshness"] = {
+            s: round(now - self._fetched_at[s], 3) if s in self._fetched_at else None
+            for s in self.symbols
+        }
+        self._last_snapshot = snapshot
+        return snapshot
+
+    def _aggregate(self, snapshot: dict, prices: dict | None = None) -> dict:
+        """
+        Alimenta o CandleAggregator com os preços novos do tick
+        (`prices`; sem ele, os do snapshot) e anexa ao snapshot as
+        barras que fecharam.
+        """
+        if self.candles is None:
+            return snapshot
+
+        now = time.time()
+        closed = self.candles.advance(now)
+        for symbol in self.symbols:
+            price = (prices if prices is not None else snapshot).get(symbol)
+            if price is not None:
+                closed += self.candles.update(symbol, price, now)
+
+        if closed:
+            bars = {}
+            for tf, symbol, bar in closed:
+                bars.setdefault(symbol, {})[tf] = bar.to_dict()
+            snapshot = dict(snapshot)
+            snapshot["_bars"] = bars
+            snapshot["_event"] = {"time_event": self.candles.events(closed)}
+
+        return snapshot
+
+    def _fetch_bulk(self, deadline: float) -> dict:
+        """
+        Uma única requisição com todos os tickers spot, filtrada pelo
+        universo configurado. Custo de rede constante, seja com 7 ou
+        200 símbolos.
+        """
+        started = time.monotonic()
+        r, error = self.fanout.call(
+            self.session.get_tickers, category="spot", deadline=deadline
+        )
+        latency = time.monotonic() - started
+
+        # Recusa de negócio (retCode) prova que a corretora responde;
+        # só timeout, rede e HTTP != 200 contam contra o disjuntor
+        self.breaker.record(
+            error is None or isinstance(error, InvalidRequestError), latency
+        )
+
+        if error is not None:
+            print(f"[BYBIT] Erro ao buscar tickers em lote: {error}")
+            return {}
+
+        if r.get("retCode") != 0:
+            print(f"[BYBIT] Lote recusado: {r.get('retMsg')}")
+            return {}
+
+        prices = {}
+        universe = self._universe
+        for item in r["result"]["list"]:
+            symbol = item.get("symbol")
+            if symbol not in universe:
+                continue
+            try:
+                prices[symbol] = float(item["lastPrice"])
+            except (KeyError, TypeError, ValueError) as e:
+                self.errors[symbol] = f"lastPrice inválido: {e}"
+
+        return prices
+
+    def _fetch_many(self, symbols: list[str], deadline: float) -> dict:
+        calls = {
+            s: (self.session.get_tickers, (), {"category": "spot", "symbol": s})
+            for s in symbols
+        }
+        results, errors = self.fanout.map(calls, deadline)
+
+        prices = {}
+        for symbol, error in errors.items():
+            print(f"[BYBIT] Erro ao buscar {symbol}: {error}")
+            self.errors[symbol] = str(error)
+            self.breaker.record(isinstance(error, InvalidRequestError))
+
+        for symbol, r in results.items():
+            self.breaker.record(True)
+            if r.get("retCode") != 0:
+                self.errors[symbol] = r.get("retMsg") or f"retCode {r.get('retCode')}"
+                continue
+            try:
+                prices[symbol] = float(r["result"]["list"][0]["lastPrice"])
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                self.errors[symbol] = f"lastPrice inválido: {e}"
+
+        return prices
+
     # -------------------------------------------------
     # POSIÇÕES
     # -------------------------------------------------
@@ -78,49 +299,196 @@ class BybitBroker:
 
         Ou None se não houver posição.
         """
-        try:
-            r = self.session.get_positions(category="spot", symbol=symbol)
+        positions = self._spot_positions(_base_coin(symbol))
+        return (positions or {}).get(symbol)
 
+    def get_open_positions(self) -> dict | None:
+        """
+        Todas as posições abertas numa única chamada:
+        {
+            "BTCUSDT": {"symbol": "BTCUSDT", "entry_price": 90481.2, "qty": 0.001},
+            ...
+        }
+
+        Retorna None em falha — diferente de {} (nenhuma posição).
+        """
+        return self._spot_positions()
+
+    def _spot_positions(self, coin: str | None = None) -> dict | None:
+        """
+        Em spot não há /v5/position/list (só derivativos): a posição é
+        o saldo da moeda base na carteira unificada. O preço médio de
+        entrada não existe no spot; vale o preço atual (usdValue do
+        saldo), ou o último conhecido. Saldos abaixo de
+        `min_position_value` (poeira de taxas) não são posição.
+        """
+        coins = self._wallet_coins(coin)
+        if coins is None:
+            return None
+
+        positions = {}
+        for name, c in coins.items():
+            symbol = f"{name}USDT"
+            qty = c["balance"]
+            if name == "USDT" or qty <= 0:
+                continue
+
+            value = c["usd_value"]
+            if not value and symbol in self._known:
+                value = qty * self._known[symbol]
+            if not value or value < self.min_position_value:
+                continue
+
+            positions[symbol] = {
+                "symbol": symbol,
+                "entry_price": value / qty,
+                "qty": qty,
+            }
+
+        return positions
+
+    def _wallet_coins(self, coin: str | None = None) -> dict | None:
+        """
+        Saldos da carteira unificada numa chamada (todas as moedas, ou
+        só `coin`): {moeda: {"balance", "free", "usd_value"}}.
+        None em falha.
+        """
+        params = {"accountType": "UNIFIED"}
+        if coin:
+            params["coin"] = coin
+
+        try:
+            r = self.scheduler.call(
+                "position",
+                self.session.get_wallet_balance,
+                timeout=self.request_timeout,
+                **params,
+            )
             if r.get("retCode") != 0:
                 return None
 
-            positions = r["result"]["list"]
-            for p in positions:
-                size = float(p.get("size", 0))
-                if size > 0:
-                    return {
-                        "symbol": symbol,
-                        "entry_price": float(p.get("avgPrice", 0)),
-                        "qty": size,
+            coins = {}
+            for account in (r.get("result") or {}).get("list") or []:
+                for c in account.get("coin") or []:
+                    balance = float(c.get("walletBalance") or 0)
+                    coins[c.get("coin")] = {
+                        "balance": balance,
+                        "free": balance - float(c.get("locked") or 0),
+                        "usd_value": float(c.get("usdValue") or 0),
                     }
+            return coins
 
-            return None
-
-        except Exception:
+        except Exception as e:
+            print(f"[BYBIT] Erro ao buscar saldos: {e}")
             return None
 
     # -------------------------------------------------
     # EXECUÇÃO
     # -------------------------------------------------
-    def buy(self, action: dict) -> bool:
+    def submit(self, action: dict) -> str | None:
+        """
+        Envia a ordem de `action` (BUY/SELL a mercado) sem esperar a
+        resposta. Retorna o orderLinkId, ou None se nada foi enviado.
+
+        BUY gasta `order_value` em moeda de cotação (ou action["qty"]);
+        SELL vende o que a última compra do símbolo rendeu, já
+        descontada a taxa (ou action["qty"]). Sem compra conhecida
+        neste processo (reinício, posição adotada na conciliação),
+        vende o saldo da moeda base na carteira.
+        """
+        kind = action.get("type")
+        symbol = action.get("symbol")
+
         if self.mode == "OBSERVADOR" or not self.armed:
-            print(f"[OBSERVADOR] BUY ignorado: {action}")
-            return False
+            print(f"[OBSERVADOR] {kind} ignorado: {action}")
+            return None
+
+        if not self.session.api_key:
+            print("[BYBIT] BYBIT_API_KEY/BYBIT_API_SECRET ausentes: ordem não enviada.")
+            return None
 
         try:
-            # Aqui entrará a lógica real de ordem
-            # (market, qty, etc.)
-            return True
-        except Exception:
-            return False
+            if kind == "BUY":
+                qty = action.get("qty") or self.order_value
+                return self.orders.submit(symbol, "Buy", qty, "quoteCoin")
+
+            if kind == "SELL":
+                qty = (
+                    action.get("qty")
+                    or self.holdings.get(symbol)
+                    or self.get_base_balance(symbol)
+                )
+                if not qty:
+                    print(f"[BYBIT] Sem quantidade conhecida para vender {symbol}.")
+                    return None
+                return self.orders.submit(symbol, "Sell", qty, "baseCoin")
+
+        except Exception as e:
+            print(f"[BYBIT] Erro ao enviar ordem: {e}")
+
+        return None
+
+    def get_base_balance(self, symbol: str) -> float | None:
+        """
+        Saldo disponível da moeda base de `symbol` (ex.: ETH em
+        ETHUSDT) na conta unificada. None em falha ou saldo zero.
+        """
+        coin = _base_coin(symbol)
+        c = (self._wallet_coins(coin) or {}).get(coin)
+        if c is None or c["free"] <= 0:
+            return None
+        return c["free"]
+
+    def poll_orders(self):
+        """
+        Acompanha as ordens em aberto (não bloqueia). Chamado pelo
+        tick(); quem só executa, sem buscar mercado, chama direto.
+        """
+        self.orders.poll()
+
+    def order_status(self, link_id: str) -> dict | None:
+        """
+        Estado da ordem no livro local (ver OrderPipeline):
+        {"status": "NEW" | "FILLED" | ..., "avg_price": ..., ...}
+        """
+        return self.orders.get(link_id)
+
+    def _on_filled(self, order: dict):
+        """FILLED ou PARTIAL_CANCELLED: só a quantidade executada conta."""
+        symbol = order["symbol"]
+        if order["side"] == "Buy":
+            # Spot: a taxa da compra sai da moeda base
+            self.holdings[symbol] = max(order["filled_qty"] - order["fee"], 0.0)
+        elif order["status"] == "FILLED":
+            self.holdings.pop(symbol, None)
+        else:
+            left = self.holdings.get(symbol, 0.0) - order["filled_qty"]
+            if left > 0:
+                self.holdings[symbol] = left
+            else:
+                self.holdings.pop(symbol, None)
+
+    def buy(self, action: dict) -> bool:
+        return self._execute(action)
 
     def sell(self, action: dict) -> bool:
-        if self.mode == "OBSERVADOR" or not self.armed:
-            print(f"[OBSERVADOR] SELL ignorado: {action}")
+        return self._execute(action)
+
+    def _execute(self, action: dict) -> bool:
+        """Versão bloqueante: envia e espera o estado final."""
+        link_id = self.submit(action)
+        if link_id is None:
             return False
 
-        try:
-            # Lógica real de venda
-            return True
-        except Exception:
+        # Após 2 × order_timeout a ordem já tem estado final (ver OrderPipeline)
+        order = self.orders.wait(link_id, 2 * self.order_timeout + 1)
+        if order is None or order["status"] not in FINAL:
+            print(f"[BYBIT] Ordem {link_id} sem confirmação no prazo.")
             return False
+
+        # Compra executada em parte vira posição; venda em parte deixa saldo
+        return order["status"] == "FILLED" or (
+            order["status"] == "PARTIAL_CANCELLED"
+            and order["side"] == "Buy"
+            and order["filled_qty"] > 0
+        )
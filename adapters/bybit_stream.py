@@ -0,0 +1,219 @@
+import json
+import random
+import threading
+import time
+
+import websocket
+
+
+class BybitTickerStream:
+    """
+    Market data da Bybit por WebSocket (canal público spot).
+
+    - assina tickers.<SYMBOL> (e, opcionalmente, publicTrade.<SYMBOL>)
+    - mantém em memória a tabela de último preço por símbolo
+    - snapshot() lê essa tabela sem bloquear em rede
+    - heartbeat {"op": "ping"} periódico, como a Bybit exige
+    - reconecta com backoff exponencial e reassina tudo
+
+    Roda numa thread daemon. Nunca lança exceção para fora.
+    """
+
+    URL = "wss://stream.bybit.com/v5/public/spot"
+
+    # A Bybit aceita no máximo 10 tópicos por requisição de subscribe no spot
+    SUBSCRIBE_CHUNK = 10
+
+    def __init__(
+        self,
+        symbols: list[str],
+        url: str | None = None,
+        trades: bool = False,
+        ping_interval: float = 20.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        self.symbols = list(symbols)
+        self.url = url or self.URL
+        self.trades = trades
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.prices: dict[str, float] = {}
+        self.updated_at: dict[str, float] = {}  # time.monotonic() da última atualização
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.connected = threading.Event()
+        self._ws = None
+        self._thread = None
+
+        # Métricas
+        self.messages = 0
+        self.reconnects = 0
+        self.last_error = None
+
+    # -------------------------------------------------
+    # CICLO DE VIDA
+    # -------------------------------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="bybit-stream", daemon=True
+        )
+        self._thread.start()
+        threading.Thread(
+            target=self._heartbeat, name="bybit-stream-ping", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        """Espera até haver preço para todos os símbolos (ou timeout)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if all(s in self.prices for s in self.symbols):
+                    return True
+            time.sleep(0.05)
+        return False
+
+    # -------------------------------------------------
+    # LEITURA
+    # -------------------------------------------------
+    def snapshot(self) -> dict:
+        """
+        {symbol: último preço ou None}. Nunca espera pela rede.
+        """
+        with self._lock:
+            return {s: self.prices.get(s) for s in self.symbols}
+
+    def age(self, symbol: str) -> float | None:
+        """Segundos desde a última atualização do símbolo."""
+        ts = self.updated_at.get(symbol)
+        return None if ts is None else time.monotonic() - ts
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected.is_set(),
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "symbols": len(self.prices),
+            "last_error": self.last_error,
+        }
+
+    # -------------------------------------------------
+    # CONEXÃO
+    # -------------------------------------------------
+    def _topics(self) -> list[str]:
+        topics = [f"tickers.{s}" for s in self.symbols]
+        if self.trades:
+            topics += [f"publicTrade.{s}" for s in self.symbols]
+        return topics
+
+    def _run(self):
+        delay = self.reconnect_delay
+
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+
+            try:
+                self._ws.run_forever()
+            except Exception as e:
+                self.last_error = str(e)
+
+            self.connected.clear()
+            if self._stop.is_set():
+                break
+
+            # Conexão que durou um tempo razoável zera o backoff
+            if time.monotonic() - started > self.max_reconnect_delay:
+                delay = self.reconnect_delay
+
+            self.reconnects += 1
+            print(f"[BYBIT-WS] Conexão perdida, reconectando em {delay:.1f}s")
+            self._stop.wait(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.ping_interval):
+            if self.connected.is_set():
+                self._send({"op": "ping"})
+
+    def _send(self, message: dict):
+        try:
+            self._ws.send(json.dumps(message))
+        except Exception as e:
+            self.last_error = str(e)
+
+    # -------------------------------------------------
+    # CALLBACKS
+    # -------------------------------------------------
+    def _on_open(self, ws):
+        topics = self._topics()
+        for i in range(0, len(topics), self.SUBSCRIBE_CHUNK):
+            self._send(
+                {"op": "subscribe", "args": topics[i : i + self.SUBSCRIBE_CHUNK]}
+            )
+        self.connected.set()
+
+    def _on_message(self, ws, raw):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+
+        topic = message.get("topic")
+        if not topic:
+            # Respostas de subscribe/pong
+            if message.get("success") is False:
+                print(f"[BYBIT-WS] Recusado: {message.get('ret_msg')}")
+            return
+
+        self.messages += 1
+        data = message.get("data")
+
+        if topic.startswith("tickers."):
+            if isinstance(data, dict) and data.get("lastPrice") is not None:
+                self._set(data.get("symbol") or topic[8:], data["lastPrice"])
+
+        elif topic.startswith("publicTrade."):
+            # Lista de negócios; o último é o mais recente
+            if isinstance(data, list) and data:
+                trade = data[-1]
+                self._set(trade.get("s") or topic[12:], trade.get("p"))
+
+    def _set(self, symbol, price):
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            self.prices[symbol] = price
+            self.updated_at[symbol] = time.monotonic()
+
+    def _on_error(self, ws, error):
+        self.last_error = str(error)
+
+    def _on_close(self, ws, status, reason):
+        self.connected.clear()
@@ -0,0 +1,146 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class FanOut:
+    """
+    Camada de requisições concorrentes com prazo.
+
+    - pool limitado de threads (`workers`)
+    - prazo por requisição (`request_timeout`)
+    - prazo do tick inteiro (`tick_timeout` ou `deadline` explícito)
+    - hedge opcional: requisição ainda sem resposta após `hedge_after`
+      segundos ganha uma cópia; vale a primeira que responder
+
+    Quem estoura o prazo é abandonado (a thread termina sozinha quando
+    o timeout HTTP da sessão vencer) e aparece como TimeoutError.
+    Nunca lança exceção para fora.
+
+    `executor` é qualquer objeto com submit(fn, *args, **kwargs) -> Future
+    (ex.: uma faixa do RequestScheduler); sem ele, usa um pool próprio.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        request_timeout: float = 2.0,
+        tick_timeout: float = 3.0,
+        hedge_after: float | None = None,
+        executor=None,
+    ):
+        self.workers = workers
+        self.request_timeout = request_timeout
+        self.tick_timeout = tick_timeout
+        self.hedge_after = hedge_after
+        self._owns_pool = executor is None
+        self.pool = executor or ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="fanout"
+        )
+
+        # Métricas
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def deadline(self) -> float:
+        """Prazo absoluto (time.monotonic) de um tick que começa agora."""
+        return time.monotonic() + self.tick_timeout
+
+    def map(self, calls: dict, deadline: float | None = None) -> tuple[dict, dict]:
+        """
+        calls = {chave: (função, args, kwargs)}
+
+        Retorna (resultados, erros), ambos indexados pela chave.
+        Toda chave aparece em exatamente um dos dois.
+        """
+        start = time.monotonic()
+        if deadline is None:
+            deadline = start + self.tick_timeout
+        limit = min(deadline, start + self.request_timeout)
+        hedge_at = start + self.hedge_after if self.hedge_after else None
+
+        pending = {}  # future -> (chave, é_hedge)
+        for key, call in calls.items():
+            pending[self._submit(call)] = (key, False)
+
+        results, errors = {}, {}
+
+        while pending:
+            now = time.monotonic()
+            wake = limit
+            if hedge_at is not None and now < hedge_at:
+                wake = min(wake, hedge_at)
+
+            done, _ = wait(
+                list(pending), timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED
+            )
+
+            for future in done:
+                key, hedged = pending.pop(future)
+                if key in results:
+                    continue
+
+                error = future.exception()
+                if error is None:
+                    results[key] = future.result()
+                    errors.pop(key, None)
+                    if hedged:
+                        self.hedge_wins += 1
+                elif not any(k == key for k, _ in pending.values()):
+                    # Só conta como erro quando não resta tentativa viva
+                    errors[key] = error
+
+            # Cópias de quem já respondeu não interessam mais
+            for future, (key, _) in list(pending.items()):
+                if key in results:
+                    del pending[future]
+                    future.cancel()
+
+            now = time.monotonic()
+            if now >= limit:
+                break
+
+            if hedge_at is not None and now >= hedge_at:
+                for key in {k for k, _ in pending.values()}:
+                    pending[self._submit(calls[key])] = (key, True)
+                    self.hedges += 1
+                hedge_at = None
+
+        for future, (key, _) in pending.items():
+            future.cancel()
+            if key not in results and key not in errors:
+                errors[key] = TimeoutError(f"sem resposta em {limit - start:.2f}s")
+                self.timeouts += 1
+
+        self.failures += sum(
+            1 for e in errors.values() if not isinstance(e, TimeoutError)
+        )
+        return results, errors
+
+    def call(self, fn, *args, deadline: float | None = None, **kwargs):
+        """
+        Uma única requisição com prazo (e hedge, se configurado).
+        Retorna (resultado, erro).
+        """
+        results, errors = self.map({0: (fn, args, kwargs)}, deadline)
+        return results.get(0), errors.get(0)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+    def shutdown(self):
+        if self._owns_pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, call):
+        fn, args, kwargs = call
+        self.requests += 1
+        return self.pool.submit(fn, *args, **kwargs)
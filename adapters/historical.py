@@ -0,0 +1,131 @@
+import heapq
+import os
+
+
+class HistoricalFeed:
+    """
+    Fonte de mercado a partir de klines gravados em disco.
+
+    Espera um CSV por símbolo em `directory`:
+        <directory>/<SYMBOL>.csv
+
+    Colunas (cabeçalho opcional), no formato de kline da Bybit:
+        start_ms, open, high, low, close, volume
+
+    Os arquivos são lidos em streaming e intercalados por timestamp;
+    cada tick entrega todos os símbolos que fecharam naquele instante.
+    """
+
+    def __init__(self, directory: str, symbols: list[str]):
+        self.directory = directory
+        self.symbols = symbols
+        self.ts = None  # segundos (epoch) do último tick entregue
+        self.bars = 0
+
+        self._stream = heapq.merge(
+            *(self._read(symbol) for symbol in symbols), key=lambda r: r[0]
+        )
+        self._next = next(self._stream, None)
+
+    def _read(self, symbol: str):
+        path = os.path.join(self.directory, f"{symbol}.csv")
+        if not os.path.exists(path):
+            print(f"[HIST] Arquivo ausente: {path}")
+            return
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                row = line.split(",")
+                try:
+                    ts = int(row[0])
+                    close = float(row[4])
+                except (ValueError, IndexError):
+                    continue  # cabeçalho ou linha corrompida
+                yield ts, symbol, close
+
+    def next_ts(self) -> float | None:
+        """Instante (segundos) do próximo tick, sem consumi-lo."""
+        return self._next[0] / 1000.0 if self._next else None
+
+    def tick(self) -> dict | None:
+        """
+        Retorna {symbol: close} do próximo instante, ou None no fim.
+        """
+        if self._next is None:
+            return None
+
+        ts = self._next[0]
+        feed = {}
+
+        while self._next is not None and self._next[0] == ts:
+            _, symbol, close = self._next
+            feed[symbol] = close
+            self.bars += 1
+            self._next = next(self._stream, None)
+
+        self.ts = ts / 1000.0
+        return feed
+
+
+class HistoricalBroker:
+    """
+    Broker de backtest: consome um HistoricalFeed e contabiliza
+    as execuções em silêncio (sem prints por tick).
+
+    Cada entrada aloca `stake` em moeda de cotação.
+    """
+
+    def __init__(self, feed: HistoricalFeed, stake: float = 100.0):
+        self.feed = feed
+        self.stake = stake
+
+        self.positions = {}  # symbol -> entry price
+        self.trades = []
+
+        self.pnl = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+
+    def tick(self) -> dict | None:
+        return self.feed.tick()
+
+    def buy(self, action: dict) -> bool:
+        self.positions[action["symbol"]] = action["price"]
+        return True
+
+    def sell(self, action: dict) -> bool:
+        symbol = action["symbol"]
+        entry = self.positions.pop(symbol, None)
+        if entry is None:
+            return False
+
+        price = action["price"]
+        change = (price - entry) / entry
+        pnl = self.stake * change
+
+        self.trades.append(
+            {
+                "symbol": symbol,
+                "entry": entry,
+                "exit": price,
+                "pnl": pnl,
+                "reason": action.get("reason"),
+                "ts": self.feed.ts,
+            }
+        )
+
+        self.pnl += pnl
+        self.peak = max(self.peak, self.pnl)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.pnl)
+        return True
+
+    def report(self) -> dict:
+        wins = sum(1 for t in self.trades if t["pnl"] > 0)
+        return {
+            "trades": len(self.trades),
+            "wins": wins,
+            "losses": len(self.trades) - wins,
+            "pnl": round(self.pnl, 4),
+            "max_drawdown": round(self.max_drawdown, 4),
+            "open_positions": len(self.positions),
+        }
@@ -0,0 +1,435 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+from pybit.exceptions import InvalidRequestError
+
+from tools.tracing import Histogram
+
+# Bybit: orderLinkId já usado (a tentativa anterior chegou)
+DUPLICATE_LINK_ID = 110072
+
+# Estados do livro de ordens
+PENDING = "PENDING"  # enviada, sem resposta ainda
+UNKNOWN = "UNKNOWN"  # envio sem resposta (timeout/rede): pode ter chegado
+NEW = "NEW"  # aceita pela corretora
+PARTIAL = "PARTIAL"
+FILLED = "FILLED"
+REJECTED = "REJECTED"
+CANCELLED = "CANCELLED"
+PARTIAL_CANCELLED = "PARTIAL_CANCELLED"  # executada em parte, resto cancelado
+FAILED = "FAILED"  # sem rastro na corretora após todas as tentativas
+
+OPEN = frozenset((PENDING, UNKNOWN, NEW, PARTIAL))
+FINAL = frozenset((FILLED, PARTIAL_CANCELLED, REJECTED, CANCELLED, FAILED))
+
+# orderStatus da v5 -> estado local
+_EXCHANGE_STATUS = {
+    "Created": NEW,
+    "New": NEW,
+    "Untriggered": NEW,
+    "PartiallyFilled": PARTIAL,
+    "Filled": FILLED,
+    "Rejected": REJECTED,
+    "Cancelled": CANCELLED,
+    "PartiallyFilledCanceled": PARTIAL_CANCELLED,
+    "Deactivated": CANCELLED,
+}
+
+
+class Order:
+    __slots__ = (
+        "link_id",
+        "symbol",
+        "side",
+        "qty",
+        "unit",
+        "status",
+        "order_id",
+        "attempts",
+        "created",
+        "sent_at",
+        "acked_at",
+        "filled_at",
+        "filled_qty",
+        "fee",
+        "avg_price",
+        "error",
+        "querying",
+        "queried_at",
+        "cancel_sent",
+        "history",
+    )
+
+    def __init__(self, link_id, symbol, side, qty, unit):
+        self.link_id = link_id
+        self.symbol = symbol
+        self.side = side
+        self.qty = qty
+        self.unit = unit
+        self.status = PENDING
+        self.order_id = None
+        self.attempts = 0
+        self.created = time.monotonic()
+        self.sent_at = self.created
+        self.acked_at = None
+        self.filled_at = None
+        self.filled_qty = 0.0
+        self.fee = 0.0
+        self.avg_price = None
+        self.error = None
+        self.querying = False
+        self.queried_at = 0.0
+        self.cancel_sent = False
+        self.history = [(PENDING, 0.0)]
+
+    def view(self) -> dict:
+        def ms(ts):
+            return round((ts - self.created) * 1000, 1) if ts else None
+
+        return {
+            "link_id": self.link_id,
+            "order_id": self.order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "qty": self.qty,
+            "status": self.status,
+            "attempts": self.attempts,
+            "filled_qty": self.filled_qty,
+            "fee": self.fee,
+            "avg_price": self.avg_price,
+            "ack_ms": ms(self.acked_at),
+            "fill_ms": ms(self.filled_at),
+            "error": self.error,
+            "history": list(self.history),
+        }
+
+
+class OrderPipeline:
+    """
+    Execução assíncrona de ordens com rastreio de ack/fill.
+
+    - submit() gera um orderLinkId (chave de idempotência), agenda o
+      envio na faixa "order" do RequestScheduler e retorna na hora
+    - a resposta do envio (ack) chega num callback e atualiza o livro
+    - poll() — chamado a cada tick — consulta, sem bloquear, as ordens
+      ainda abertas pelo orderLinkId até o estado final (ordens
+      ativas e, se não estiver lá, o histórico de ordens)
+    - reenvio só acontece depois de a corretora confirmar que a ordem
+      não existe, e sempre com o mesmo orderLinkId: se a tentativa
+      anterior tiver chegado, a corretora recusa a cópia como
+      duplicada (110072) e isso vale como ack. Nunca há ordem em dobro.
+
+    Prazo: ordem ainda aberta após `deadline` segundos recebe um
+    cancelamento (pelo orderLinkId) e segue sendo consultada até o
+    estado final — CANCELLED, ou PARTIAL_CANCELLED se algo executou.
+    Sem confirmação da corretora em 2 × `deadline`, a ordem é
+    abandonada como FAILED (ou PARTIAL_CANCELLED, se já havia
+    execução conhecida): ninguém espera por ela para sempre.
+
+    Latências de ack e de fill ficam em histogramas; cada transição
+    é registrada na própria ordem. Callbacks rodam nas threads do
+    agendador.
+    """
+
+    def __init__(
+        self,
+        session,
+        scheduler,
+        category: str = "spot",
+        ack_timeout: float = 2.0,
+        poll_interval: float = 0.5,
+        max_attempts: int = 3,
+        keep: int = 200,
+        on_fill=None,
+        deadline: float = 30.0,
+    ):
+        self.session = session
+        self.scheduler = scheduler
+        self.category = category
+        self.ack_timeout = ack_timeout
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.on_fill = on_fill  # callback(view) quando uma ordem executa
+
+        self.orders: dict[str, Order] = {}
+        self._finished = deque()
+        self._keep = keep
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.ack_latency = Histogram()
+        self.fill_latency = Histogram()
+        self.counts = {s: 0 for s in (*OPEN, *FINAL)}
+        self.resent = 0
+        self.duplicates = 0
+        self.cancels = 0
+        self.abandoned = 0
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def submit(self, symbol: str, side: str, qty: float, unit: str | None = None):
+        """
+        Envia uma ordem a mercado. Retorna o orderLinkId imediatamente.
+        side: "Buy" | "Sell"; unit: "quoteCoin" | "baseCoin" | None
+        """
+        link_id = f"ruffus-{uuid.uuid4().hex[:24]}"
+        order = Order(link_id, symbol, side, qty, unit)
+
+        with self._lock:
+            self.orders[link_id] = order
+            self.counts[PENDING] += 1
+
+        print(f"🧾 [ORDEM] {side} {symbol} qty={qty} enviada ({link_id})")
+        self._send(order)
+        return link_id
+
+    def get(self, link_id: str) -> dict | None:
+        with self._lock:
+            order = self.orders.get(link_id)
+            return order.view() if order else None
+
+    def poll(self):
+        """
+        Agenda consultas de estado para as ordens abertas cujo ack já
+        chegou (ou deveria ter chegado). Não bloqueia.
+        """
+        now = time.monotonic()
+        due = []
+        cancels = []
+        with self._lock:
+            for order in list(self.orders.values()):
+                if order.status not in OPEN:
+                    continue
+
+                age = now - order.created
+                if age >= 2 * self.deadline:
+                    self._abandon(order)
+                    continue
+                if age >= self.deadline and not order.cancel_sent:
+                    order.cancel_sent = True
+                    order.queried_at = 0.0
+                    cancels.append(order)
+
+                if order.querying:
+                    continue
+                if order.status == PENDING:
+                    if now - order.sent_at < self.ack_timeout:
+                        continue
+                elif now - order.queried_at < self.poll_interval:
+                    continue
+                order.querying = True
+                order.queried_at = now
+                due.append(order)
+
+        for order in cancels:
+            self._cancel(order)
+
+        for order in due:
+            future = self.scheduler.submit("position", self._lookup, order)
+            future.add_done_callback(lambda f, order=order: self._on_query(order, f))
+
+    def wait(self, link_id: str, timeout: float) -> dict | None:
+        """Versão bloqueante: espera um estado final (ou o prazo)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            self.poll()
+            order = self.get(link_id)
+            if order is None or order["status"] in FINAL:
+                return order
+            if time.monotonic() >= deadline:
+                return order
+            time.sleep(min(self.poll_interval, 0.05))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": [o.view() for o in self.orders.values() if o.status in OPEN],
+                "counts": dict(self.counts),
+                "resent": self.resent,
+                "duplicates": self.duplicates,
+                "cancels": self.cancels,
+                "abandoned": self.abandoned,
+                "ack": self.ack_latency.summary(),
+                "fill": self.fill_latency.summary(),
+            }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _send(self, order: Order):
+        params = {
+            "category": self.category,
+            "symbol": order.symbol,
+            "side": order.side,
+            "orderType": "Market",
+            "qty": str(order.qty),
+            "orderLinkId": order.link_id,
+        }
+        if order.unit:
+            params["marketUnit"] = order.unit
+
+        with self._lock:
+            order.attempts += 1
+            order.sent_at = time.monotonic()
+
+        future = self.scheduler.submit("order", self.session.place_order, **params)
+        future.add_done_callback(lambda f: self._on_ack(order, f))
+
+    def _on_ack(self, order: Order, future):
+        error = future.exception()
+
+        with self._lock:
+            if order.status not in OPEN:
+                return  # a consulta já resolveu a ordem
+
+            if error is None:
+                result = future.result().get("result") or {}
+                order.order_id = result.get("orderId")
+                self._move(order, NEW)
+
+            elif isinstance(error, InvalidRequestError):
+                if error.status_code == DUPLICATE_LINK_ID:
+                    # Uma tentativa anterior chegou: é a mesma ordem
+                    self.duplicates += 1
+                    self._move(order, NEW)
+                else:
+                    order.error = error.message
+                    self._move(order, REJECTED)
+
+            elif order.status == PENDING:
+                # Timeout/rede: não dá para saber se chegou.
+                # Só a consulta pelo orderLinkId decide o reenvio.
+                order.error = str(error)
+                order.queried_at = 0.0
+                self._move(order, UNKNOWN)
+
+    def _on_query(self, order: Order, future):
+        resend = False
+
+        with self._lock:
+            order.querying = False
+            if order.status not in OPEN:
+                return
+
+            error = future.exception()
+            if error is not None:
+                return  # tenta de novo no próximo poll()
+
+            item = future.result()
+            if item is None:
+                # A corretora não conhece a ordem
+                if order.status in (PENDING, UNKNOWN):
+                    if order.cancel_sent:
+                        order.error = order.error or "sem rastro após o prazo"
+                        self._move(order, FAILED)
+                    elif order.attempts < self.max_attempts:
+                        resend = True
+                    else:
+                        self._move(order, FAILED)
+                # NEW/PARTIAL ausente: atraso de replicação, tenta depois
+            else:
+                self._apply(order, item)
+
+        if resend:
+            self.resent += 1
+            print(f"🔁 [ORDEM] Reenviando {order.link_id} (mesmo orderLinkId)")
+            self._send(order)
+
+    def _lookup(self, order: Order) -> dict | None:
+        """
+        A ordem na corretora, pelo orderLinkId. /v5/order/realtime só
+        lista ordens ativas: executada ou cancelada (uma ordem a mercado
+        executa na hora) só aparece no histórico. Roda no scheduler.
+        """
+        for fetch in (self.session.get_open_orders, self.session.get_order_history):
+            response = fetch(
+                category=self.category,
+                symbol=order.symbol,
+                orderLinkId=order.link_id,
+            )
+            items = (response.get("result") or {}).get("list") or []
+            for item in items:
+                if item.get("orderLinkId") == order.link_id:
+                    return item
+        return None
+
+    def _apply(self, order: Order, item: dict):
+        def num(key):
+            try:
+                return float(item.get(key) or 0)
+            except (TypeError, ValueError):
+                return 0.0
+
+        order.order_id = item.get("orderId") or order.order_id
+        order.filled_qty = num("cumExecQty")
+        order.fee = num("cumExecFee")
+        order.avg_price = num("avgPrice") or order.avg_price
+        if item.get("rejectReason") not in (None, "", "EC_NoError"):
+            order.error = item["rejectReason"]
+
+        status = _EXCHANGE_STATUS.get(item.get("orderStatus"), order.status)
+        if status == CANCELLED and order.filled_qty > 0:
+            status = PARTIAL_CANCELLED
+        if order.acked_at is None and status in (
+            PARTIAL,
+            FILLED,
+            PARTIAL_CANCELLED,
+        ):
+            self._move(order, NEW)
+        self._move(order, status)
+
+    def _cancel(self, order: Order):
+        """Pede o cancelamento; o estado final vem da próxima consulta."""
+        self.cancels += 1
+        print(f"⌛ [ORDEM] {order.link_id} passou do prazo. Cancelando.")
+        future = self.scheduler.submit(
+            "order",
+            self.session.cancel_order,
+            category=self.category,
+            symbol=order.symbol,
+            orderLinkId=order.link_id,
+        )
+        # Erro (já executada, inexistente...) não importa: a consulta decide
+        future.add_done_callback(lambda f: f.exception())
+
+    def _abandon(self, order: Order):
+        """Sem resposta da corretora após o prazo. Chamado com o lock."""
+        self.abandoned += 1
+        order.error = order.error or "sem confirmação da corretora"
+        self._move(order, PARTIAL_CANCELLED if order.filled_qty > 0 else FAILED)
+
+    def _move(self, order: Order, status: str):
+        """Transição de estado. Chamado com o lock."""
+        if status == order.status:
+            return
+
+        now = time.monotonic()
+        self.counts[order.status] -= 1
+        self.counts[status] += 1
+        order.status = status
+        order.history.append((status, round((now - order.created) * 1000, 1)))
+
+        if status == NEW and order.acked_at is None:
+            order.acked_at = now
+            self.ack_latency.record(now - order.created)
+        elif status == FILLED or (status == PARTIAL_CANCELLED and order.filled_qty > 0):
+            # Parte executada é posição real: vai ao on_fill também
+            order.filled_at = now
+            self.fill_latency.record(now - order.created)
+            if self.on_fill:
+                self.on_fill(order.view())
+
+        elapsed = (now - order.created) * 1000
+        print(
+            f"🧾 [ORDEM] {order.side} {order.symbol} → {status} "
+            f"({elapsed:.0f} ms, {order.link_id})"
+        )
+
+        if status in FINAL:
+            self._finished.append(order.link_id)
+            while len(self._finished) > self._keep:
+                self.orders.pop(self._finished.popleft(), None)
@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from requests.adapters import HTTPAdapter
+
+from tools.tracing import Histogram
+
+# Ordem de prioridade: quem vem antes é atendido antes
+LANES = ("order", "position", "market")
+
+# (requisições por segundo, rajada) — abaixo dos limites da Bybit v5
+DEFAULT_LIMITS = {
+    "order": (10.0, 10),
+    "position": (10.0, 10),
+    "market": (50.0, 50),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """
+        Consome um token se houver. Retorna 0.0 em caso de sucesso ou
+        quantos segundos faltam para o próximo token.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class _Job:
+    __slots__ = ("lane", "fn", "args", "kwargs", "future", "enqueued", "throttled")
+
+    def __init__(self, lane, fn, args, kwargs):
+        self.lane = lane
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued = time.monotonic()
+        self.throttled = False
+
+
+class _Lane:
+    """Executor de uma faixa só (compatível com FanOut)."""
+
+    def __init__(self, scheduler, lane):
+        self.scheduler = scheduler
+        self.lane = lane
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        return self.scheduler.submit(self.lane, fn, *args, **kwargs)
+
+
+class RequestScheduler:
+    """
+    Agendador único das requisições a uma corretora.
+
+    - um token bucket por classe de endpoint (order / position / market):
+      o polling de mercado nunca consome o orçamento de ordens
+    - faixas de prioridade: order > position > market
+    - `reserved_order_workers` threads atendem só ordens, então uma
+      ordem nunca espera atrás de uma requisição de mercado travada
+    - métricas de espera em fila e de throttling por faixa
+
+    Jobs são executados em threads daemon; o resultado volta num Future.
+    """
+
+    def __init__(
+        self,
+        limits: dict | None = None,
+        workers: int = 8,
+        reserved_order_workers: int = 1,
+    ):
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {lane: TokenBucket(*limits[lane]) for lane in LANES}
+        self._queues = {lane: deque() for lane in LANES}
+        self._cond = threading.Condition()
+
+        # Métricas
+        self.wait = {lane: Histogram() for lane in LANES}
+        self.submitted = {lane: 0 for lane in LANES}
+        self.throttled = {lane: 0 for lane in LANES}
+
+        for i in range(workers):
+            orders_only = i < reserved_order_workers
+            threading.Thread(
+                target=self._worker,
+                args=(LANES[:1] if orders_only else LANES,),
+                name=f"scheduler-{i}",
+                daemon=True,
+            ).start()
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def submit(self, lane: str, fn, *args, **kwargs) -> Future:
+        if lane not in self._queues:
+            raise ValueError(f"Faixa desconhecida: {lane}")
+
+        job = _Job(lane, fn, args, kwargs)
+        with self._cond:
+            self._queues[lane].append(job)
+            self.submitted[lane] += 1
+            self._cond.notify_all()
+        return job.future
+
+    def call(self, lane: str, fn, *args, timeout: float | None = None, **kwargs):
+        """Versão bloqueante de submit(). Propaga a exceção da chamada."""
+        return self.submit(lane, fn, *args, **kwargs).result(timeout)
+
+    def lane(self, lane: str) -> _Lane:
+        return _Lane(self, lane)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                lane: {
+                    "submitted": self.submitted[lane],
+                    "queued": len(self._queues[lane]),
+                    "throttled": self.throttled[lane],
+                    "wait": self.wait[lane].summary(),
+                }
+                for lane in LANES
+            }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _next(self, lanes):
+        """
+        Próximo job com token disponível, na ordem de prioridade.
+        Chamado com o lock; espera o necessário.
+        """
+        while True:
+            delay = None
+            for lane in lanes:
+                queue = self._queues[lane]
+
+                # Cancelados na fila (ex.: cópias de hedge) não gastam token
+                while queue and queue[0].future.cancelled():
+                    queue.popleft()
+                if not queue:
+                    continue
+
+                wait = self.buckets[lane].try_acquire()
+                if wait == 0.0:
+                    return queue.popleft()
+
+                head = queue[0]
+                if not head.throttled:
+                    head.throttled = True
+                    self.throttled[lane] += 1
+                delay = wait if delay is None else min(delay, wait)
+
+            self._cond.wait(delay)
+
+    def _worker(self, lanes):
+        while True:
+            with self._cond:
+                job = self._next(lanes)
+                self.wait[job.lane].record(time.monotonic() - job.enqueued)
+
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+            except BaseException as e:
+                job.future.set_exception(e)
+
+
+def pool_connections(session, size: int):
+    """
+    Conexões HTTP persistentes (keep-alive) para um requests.Session,
+    dimensionadas para `size` requisições simultâneas.
+    """
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
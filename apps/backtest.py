@@ -0,0 +1,267 @@
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import time
+
+from core.bus import CONTRACT_RESULT, DROP_OLDEST, EventBus
+from core.clock import SimulatedClock
+from core.engine import Engine
+from core.risk import RiskManager
+from core.world import World
+from core.profiles.registry import load_profile
+from strategies.canonical.registry import load_strategy
+from strategies.binary.impulse import ImpulseBinary
+
+from adapters.historical import HistoricalBroker, HistoricalFeed
+from brokers.bullex import BullexBroker
+from storage.store_json import JSONStore
+from tools.metrics import OutcomeMetrics
+
+SYMBOLS = [
+    "ETHUSDT",
+    "SOLUSDT",
+    "BNBUSDT",
+    "XRPUSDT",
+    "ADAUSDT",
+    "AVAXUSDT",
+    "LINKUSDT",
+]
+
+BINARY_SYMBOLS = [
+    "AUDCAD",
+    "AUDJPY",
+    "AUDUSD",
+    "CADJPY",
+    "EURGBP",
+    "EURCAD",
+    "EURJPY",
+    "EURUSD",
+    "GBPUSD",
+    "GBPJPY",
+    "USDCAD",
+    "USDJPY",
+]
+
+
+class _Silence:
+    """Descarta prints de estado/risco durante o backtest."""
+
+    def write(self, _):
+        return 0
+
+    def flush(self):
+        pass
+
+
+def _fresh_store(store_dir: str) -> str:
+    """
+    Limpa o que uma execução anterior deixou em `store_dir` (estado e
+    logs): o boot não restaura nada e os mesmos dados dão o mesmo
+    resultado. Retorna o caminho do state.json.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+
+    path = os.path.join(store_dir, "state.json")
+    if os.path.exists(path):
+        os.remove(path)
+    for name in ("events", "trades"):
+        shutil.rmtree(os.path.join(store_dir, name), ignore_errors=True)
+
+    return path
+
+
+def run_backtest(
+    data_dir: str,
+    symbols: list[str],
+    strategy: str = "simple_trend",
+    profile: str = "moderate",
+    store_dir: str = "storage/backtest",
+    stake: float = 100.0,
+    quiet: bool = True,
+) -> dict:
+    """
+    Executa o Engine real sobre klines históricos, o mais rápido
+    que a CPU permitir: sem sleep, sem painel, sem feedback,
+    com persistência em lote (gravada no fim). Com o relógio
+    simulado o Engine não grava o estado antes de cada ordem.
+
+    O relógio do Engine é o tempo dos candles: cooldowns e
+    limites diários do risco seguem os dados, não a parede.
+    Cada execução começa com `store_dir` limpo.
+    """
+    config = {
+        "profile": profile,
+        "symbols": symbols,
+        "store_path": _fresh_store(store_dir),
+        "armed": True,
+        "strategy": strategy,
+    }
+    config = load_profile(profile).apply(config)
+
+    feed = HistoricalFeed(data_dir, symbols)
+    broker = HistoricalBroker(feed, stake=stake)
+    store = JSONStore(config["store_path"])
+    clock = SimulatedClock(start=feed.next_ts() or 0)
+
+    engine = Engine(
+        broker=broker,
+        world=World(symbols, store, persist_history=0),
+        strategy=load_strategy(strategy, config),
+        risk=RiskManager(config),
+        store=store,
+        feedback=None,
+        mode="VIRTUAL",
+        max_staleness=3600.0,
+        clock=clock,
+    )
+
+    ticks = 0
+    silence = contextlib.redirect_stdout(_Silence())
+    started = time.perf_counter()
+
+    with silence if quiet else contextlib.nullcontext():
+        engine.boot()
+
+        while True:
+            market = broker.tick()
+            if market is None:
+                break
+            clock.set(feed.ts)
+            engine.step(market)
+            ticks += 1
+
+        engine.flush()
+
+    elapsed = time.perf_counter() - started
+
+    report = broker.report()
+    report.update(
+        {
+            "ticks": ticks,
+            "bars": feed.bars,
+            "seconds": round(elapsed, 3),
+            "ticks_per_second": round(ticks / elapsed, 1) if elapsed else None,
+        }
+    )
+    return report
+
+
+def run_binary_replay(
+    hours: float = 24.0,
+    seed: int = 7,
+    profile: str = "moderate",
+    store_dir: str = "storage/backtest_binary",
+    start: float = 1767225600.0,
+    quiet: bool = True,
+) -> dict:
+    """
+    Replay da linhagem binária em tempo simulado.
+
+    O SimulatedClock salta direto para o próximo evento agendado
+    (fechamento de 5m/4h, expiração de contrato), então horas de
+    mercado passam em segundos. Com a mesma semente, o resultado
+    é o mesmo de uma execução ao vivo com a mesma sequência de candles.
+    """
+    store_path = _fresh_store(store_dir)
+    random.seed(seed)
+
+    config = load_profile(profile).apply({"profile": profile, "armed": True})
+
+    clock = SimulatedClock(start=start)
+    store = JSONStore(store_path)
+    bus = EventBus()
+    metrics = OutcomeMetrics()
+    bus.subscribe(CONTRACT_RESULT, metrics.on_batch, name="metrics", policy=DROP_OLDEST)
+    broker = BullexBroker(BINARY_SYMBOLS, mode="VIRTUAL", armed=False, bus=bus)
+
+    engine = Engine(
+        broker=broker,
+        world=World(BINARY_SYMBOLS, store, persist_history=0),
+        strategy=ImpulseBinary(BINARY_SYMBOLS),
+        risk=RiskManager(config),
+        store=store,
+        feedback=None,
+        mode="VIRTUAL",
+        max_staleness=3600.0,
+        clock=clock,
+        bus=bus,
+    )
+
+    end = start + hours * 3600
+    steps = 0
+    silence = contextlib.redirect_stdout(_Silence())
+    started = time.perf_counter()
+
+    with silence if quiet else contextlib.nullcontext():
+        engine.boot()
+
+        while clock.time() < end:
+            market = broker.tick()
+            if market is not None:
+                engine.step(market)
+                steps += 1
+
+            if not clock.advance_to_next():
+                break
+
+        engine.flush()
+
+    elapsed = time.perf_counter() - started
+    simulated = clock.time() - start
+    outcomes = metrics.summary()
+
+    return {
+        "steps": steps,
+        "contracts": broker.contracts.opened,
+        "wins": outcomes["wins"],
+        "losses": outcomes["losses"],
+        "simulated_hours": round(simulated / 3600, 2),
+        "seconds": round(elapsed, 3),
+        "speedup": round(simulated / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest histórico do Ruffus")
+    parser.add_argument("data", nargs="?", help="diretório com <SYMBOL>.csv")
+    parser.add_argument("--binary", action="store_true", help="replay binário")
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--symbols", nargs="*", default=SYMBOLS)
+    parser.add_argument("--strategy", default="simple_trend")
+    parser.add_argument("--profile", default="moderate")
+    parser.add_argument("--store", help="diretório do estado do backtest")
+    parser.add_argument("--stake", type=float, default=100.0)
+    args = parser.parse_args()
+
+    if args.binary:
+        print(f"🧪 RUFFUS-BINARY — REPLAY ({args.hours}h, seed {args.seed})")
+        report = run_binary_replay(
+            hours=args.hours,
+            seed=args.seed,
+            profile=args.profile,
+            store_dir=args.store or "storage/backtest_binary",
+        )
+    else:
+        if not args.data:
+            parser.error("informe o diretório de dados (ou use --binary)")
+
+        print(f"🧪 RUFFUS — BACKTEST ({args.strategy} / {args.profile})")
+        report = run_backtest(
+            args.data,
+            args.symbols,
+            strategy=args.strategy,
+            profile=args.profile,
+            store_dir=args.store or "storage/backtest",
+            stake=args.stake,
+        )
+
+    print("-" * 40)
+    for key, value in report.items():
+        print(f"{key:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import time
 import os
 
+from core.bus import CONTRACT_RESULT, DROP_OLDEST, EventBus
+from core.candles import CandleAggregator
 from core.engine import Engine
 from core.risk import RiskManager
 from core.world import World
@@ -9,8 +11,11 @@ from strategies.binary.registry import load_binary_strategies
 
 from tools.feedback import FeedbackEngine
 from tools.memory import CognitiveMemory
+from tools.metrics import OutcomeMetrics
 from tools.panel import Panel
+from tools.tracing import Tracer
 
+from adapters.scheduler import RequestScheduler
 from brokers.bullex import BullexBroker
 from storage.store_json import JSONStore
 
@@ -41,8 +46,13 @@ def main():
         ],
         "store_path": "storage/binary/state.json",
         "memory_path": "storage/binary/memory.json",
-        "events_path": "storage/binary/events.jsonl",
+        "events_path": "storage/binary/events",
+        "stats_path": "storage/binary/impulse_stats.json",
         "sleep": 1,
+        "persist_max_staleness": 2.0,
+        "tracing": True,
+        "bus_batch": 64,
+        "derive_4h": True,  # 4h montado dos candles de 5m (API de 4h só no boot)
     }
 
     os.makedirs("storage/binary", exist_ok=True)
@@ -53,7 +63,7 @@ def main():
     memory = CognitiveMemory("storage/binary/memory.json")
     store = JSONStore("storage/binary/state.json")
     feedback = FeedbackEngine(
-        events_path="storage/binary/events.jsonl",
+        events_path=binary_config["events_path"],
         memory_path="storage/binary/memory.json",
         journal_path="storage/binary/journal.jsonl",
     )
@@ -61,12 +71,28 @@ def main():
     world = World(binary_config["symbols"], store)
     strategy = load_binary_strategies("impulse", binary_config)
     risk = RiskManager({})  # risco ainda neutro no estágio binário inicial
+    tracer = Tracer(enabled=binary_config["tracing"])
+
+    # Resultados de contratos: broker publica; Engine entrega em lote
+    # ao aprendizado da estratégia e ao log; placar em memória à parte
+    bus = EventBus(batch=binary_config["bus_batch"])
+    outcomes = OutcomeMetrics()
+    bus.subscribe(
+        CONTRACT_RESULT, outcomes.on_batch, name="metrics", policy=DROP_OLDEST
+    )
 
     broker = BullexBroker(
         binary_config["symbols"],
         mode=MODE,
         account="DEMO",
         armed=False,
+        scheduler=RequestScheduler(workers=4),
+        bus=bus,
+        aggregator=(
+            CandleAggregator(binary_config["symbols"], ("4h",))
+            if binary_config["derive_4h"]
+            else None
+        ),
     )
 
     engine = Engine(
@@ -77,6 +103,9 @@ def main():
         store=store,
         feedback=feedback,
         mode=MODE,
+        max_staleness=binary_config["persist_max_staleness"],
+        tracer=tracer,
+        bus=bus,
     )
 
     engine.boot()
@@ -87,6 +116,7 @@ def main():
     from tools import web
 
     web.engine_ref = engine
+    web.outcomes_ref = outcomes
 
     import threading
     import uvicorn
@@ -103,7 +133,8 @@ def main():
     # ------------------------------------------------------------------
     while True:
         try:
-            feed = broker.tick()
+            with tracer.span("broker.tick"):
+                feed = broker.tick()
 
             # Nenhum evento real → nenhum pensamento
             if feed is None:
@@ -111,12 +142,15 @@ def main():
                 continue
 
             engine.step(feed)
-            panel.render()
+
+            with tracer.span("panel.render"):
+                panel.render()
 
             time.sleep(binary_config["sleep"])
 
         except KeyboardInterrupt:
             print("\n⏹ Execução interrompida.")
+            engine.flush()
             break
 
 
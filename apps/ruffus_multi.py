@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+
+from core.engine import Engine
+from core.feed_hub import FeedHub
+from core.risk import RiskManager
+from core.world import World
+from core.profiles.registry import load_profile
+from strategies.canonical.registry import load_strategy
+
+from tools.feedback import FeedbackEngine
+from tools.tracing import Tracer
+
+from adapters.virtual import VirtualBroker
+from adapters.bybit import BybitBroker
+from storage.store_json import JSONStore
+
+MODE = "ASSISTED"
+WEB_PORT = 8002
+
+
+def make_broker(config: dict, symbols, mode: str, market: bool):
+    """
+    market=True: o broker único que busca o mercado para todos.
+    market=False: o broker de execução de um organismo (só ordens,
+    livro de ordens e saldo próprios).
+    """
+    if mode == "VIRTUAL":
+        return VirtualBroker(symbols)
+
+    live = mode in ("REAL", "ASSISTED")
+    return BybitBroker(
+        symbols,
+        mode="REAL" if live else "OBSERVADOR",
+        armed=config["armed"] and live,
+        stream=config["market_stream"] and market,
+        timeframes=config["timeframes"] if market else None,
+    )
+
+
+def check_symbols(specs: list[dict], mode: str):
+    """
+    Com conta real, cada símbolo pertence a um organismo só: o saldo
+    da moeda base é um só na corretora, e a venda de um venderia a
+    posição do outro.
+    """
+    if mode == "VIRTUAL":
+        return
+
+    owner = {}
+    for spec in specs:
+        for symbol in spec["symbols"]:
+            if symbol in owner:
+                raise ValueError(
+                    f"{symbol} aparece em {owner[symbol]} e em {spec['name']}: "
+                    "organismos na mesma conta precisam de símbolos disjuntos."
+                )
+            owner[symbol] = spec["name"]
+
+
+def build_engine(spec: dict, base: dict, mode: str) -> Engine:
+    """Um organismo completo (estratégia, risco, store, execução) por entrada."""
+    name = spec["name"]
+    root = os.path.join(base["storage_dir"], name)
+    os.makedirs(root, exist_ok=True)
+
+    config = {**base, **spec}
+    config = load_profile(config["profile"]).apply(config)
+
+    store = JSONStore(os.path.join(root, "state.json"))
+    feedback = FeedbackEngine(
+        events_path=os.path.join(root, "events"),
+        memory_path=os.path.join(root, "memory.json"),
+        journal_path=os.path.join(root, "journal.jsonl"),
+    )
+
+    return Engine(
+        broker=make_broker(config, config["symbols"], mode, market=False),
+        world=World(config["symbols"], store),
+        strategy=load_strategy(config["strategy"], config),
+        risk=RiskManager(config),
+        store=store,
+        feedback=feedback,
+        mode=mode,
+        max_staleness=config["persist_max_staleness"],
+        tracer=Tracer(enabled=config["tracing"]),
+    )
+
+
+def run_engine(name: str, engine: Engine, cursor, stop: threading.Event):
+    """Consome o feed compartilhado pelo próprio cursor, em ordem."""
+    broker = engine.broker
+    while not stop.is_set():
+        for snapshot in cursor.wait(timeout=1.0):
+            # Ordens deste organismo, acompanhadas na thread dele
+            if hasattr(broker, "poll_orders"):
+                broker.poll_orders()
+            try:
+                engine.step(snapshot)
+            except Exception as e:
+                print(f"❌ [{name}] Erro no step: {e}")
+
+    engine.flush()
+
+
+def main():
+    print(f"🧠 RUFFUS — MULTI-ENGINE ({MODE})")
+
+    # ------------------------------------------------------------------
+    # Um feed, vários organismos. Cada entrada de "engines" herda o
+    # config base e pode sobrescrever estratégia, perfil e parâmetros.
+    # Em conta real, os símbolos dos organismos não podem se repetir.
+    # ------------------------------------------------------------------
+    config = {
+        "profile": "moderate",
+        "stop_loss": -0.5,
+        "take_profit": 1.2,
+        "sleep": 1,
+        "storage_dir": "storage/multi",
+        "armed": True,
+        "persist_max_staleness": 2.0,
+        "tracing": True,
+        "market_stream": True,
+        "timeframes": ("5m", "4h"),
+        "feed_capacity": 256,  # snapshots retidos no anel compartilhado
+        "lag_report_every": 30,  # segundos entre checagens de atraso
+        "engines": [
+            {
+                "name": "trend-moderate",
+                "strategy": "simple_trend",
+                "symbols": ["ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"],
+            },
+            {
+                "name": "trend-conservative",
+                "strategy": "simple_trend",
+                "profile": "conservative",
+                "symbols": ["ADAUSDT", "AVAXUSDT", "LINKUSDT"],
+            },
+        ],
+    }
+
+    check_symbols(config["engines"], MODE)
+
+    # O feed cobre a união dos símbolos de todos os organismos
+    config["symbols"] = list(
+        dict.fromkeys(s for spec in config["engines"] for s in spec["symbols"])
+    )
+
+    # Um único broker de mercado: uma conexão para todos os organismos.
+    # Cada um executa pelo próprio broker (livro de ordens e saldos
+    # separados). Sem Reconciler: com várias estratégias na mesma
+    # conta, a posição de uma seria "desconhecida" para as outras.
+    broker = make_broker(config, config["symbols"], MODE, market=True)
+
+    hub = FeedHub(capacity=config["feed_capacity"])
+    stop = threading.Event()
+    engines = {}
+    threads = []
+
+    for spec in config["engines"]:
+        name = spec["name"]
+        engine = build_engine(spec, config, MODE)
+        engine.boot()
+        engines[name] = engine
+
+        cursor = hub.subscribe(name)
+        thread = threading.Thread(
+            target=run_engine,
+            args=(name, engine, cursor, stop),
+            name=f"engine-{name}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+
+    # ------------------------------------------------------------------
+    # Web API: primeiro organismo + estado do feed
+    # ------------------------------------------------------------------
+    from tools import web
+
+    web.engine_ref = next(iter(engines.values()))
+    web.hub_ref = hub
+
+    import uvicorn
+
+    def run_web():
+        uvicorn.run(web.app, host="127.0.0.1", port=WEB_PORT, log_level="error")
+
+    threading.Thread(target=run_web, daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Loop vital: um tick na corretora, publicado uma vez
+    # ------------------------------------------------------------------
+    last_report = time.monotonic()
+
+    while True:
+        try:
+            feed = broker.tick()
+            if feed is not None:
+                hub.publish(feed)
+
+            now = time.monotonic()
+            if now - last_report >= config["lag_report_every"]:
+                last_report = now
+                for name in hub.laggards():
+                    lag = hub.cursors[name].lag
+                    print(f"🐢 [FEED] {name} atrasado: {lag} snapshots")
+
+            time.sleep(config["sleep"])
+
+        except KeyboardInterrupt:
+            print("\n⏹ Execução interrompida.")
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+            break
+
+
+if __name__ == "__main__":
+    main()
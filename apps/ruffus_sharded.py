@@ -0,0 +1,124 @@
+import functools
+import os
+import time
+
+from core.engine import Engine
+from core.risk import RiskManager
+from core.shard import ShardedRuntime
+from core.world import World
+from core.profiles.registry import load_profile
+from strategies.canonical.registry import load_strategy
+
+from adapters.virtual import VirtualBroker
+from adapters.bybit import BybitBroker
+from storage.store_json import JSONStore
+
+MODE = "VIRTUAL"
+
+
+def make_broker(config: dict, symbols, mode: str, market: bool):
+    """
+    market=True: o broker do coordenador, que busca o mercado.
+    market=False: o broker de execução de um worker (só ordens).
+    """
+    if mode == "VIRTUAL":
+        return VirtualBroker(symbols)
+
+    live = mode in ("REAL", "ASSISTED")
+    return BybitBroker(
+        symbols,
+        mode="REAL" if live else "OBSERVADOR",
+        armed=config["armed"] and live,
+        stream=config["market_stream"] and market,
+        timeframes=config["timeframes"] if market else None,
+    )
+
+
+def build_engine(shard: int, symbols, risk, config: dict, mode: str) -> Engine:
+    """Roda dentro do worker: Engine do shard, com estado próprio."""
+    root = os.path.join(config["storage_dir"], f"shard-{shard}")
+    os.makedirs(root, exist_ok=True)
+
+    shard_config = {**config, "symbols": symbols}
+    store = JSONStore(os.path.join(root, "state.json"))
+
+    return Engine(
+        broker=make_broker(config, symbols, mode, market=False),
+        world=World(symbols, store),
+        strategy=load_strategy(config["strategy"], shard_config),
+        risk=risk,
+        store=store,
+        feedback=None,
+        mode=mode,
+        max_staleness=config["persist_max_staleness"],
+    )
+
+
+def main():
+    print(f"🧠 RUFFUS — SHARDED ({MODE})")
+
+    config = {
+        "profile": "moderate",
+        "stop_loss": -0.5,
+        "take_profit": 1.2,
+        "sleep": 1,
+        "symbols": [
+            "ETHUSDT",
+            "SOLUSDT",
+            "BNBUSDT",
+            "XRPUSDT",
+            "ADAUSDT",
+            "AVAXUSDT",
+            "LINKUSDT",
+        ],
+        "storage_dir": "storage/sharded",
+        "armed": True,
+        "strategy": "simple_trend",
+        "persist_max_staleness": 2.0,
+        "market_stream": True,
+        "timeframes": ("5m", "4h"),
+        "workers": None,  # None = um por núcleo
+        "max_inflight": 4,  # snapshots sem confirmação por worker
+        "stats_every": 30,  # segundos entre resumos
+    }
+
+    config = load_profile(config["profile"]).apply(config)
+
+    # Coordenador: um broker de mercado e o risco global
+    broker = make_broker(config, config["symbols"], MODE, market=True)
+    runtime = ShardedRuntime(
+        config["symbols"],
+        build=functools.partial(build_engine, config=config, mode=MODE),
+        risk=RiskManager(config),
+        workers=config["workers"],
+        max_inflight=config["max_inflight"],
+    ).start()
+
+    last_report = time.monotonic()
+
+    while True:
+        try:
+            feed = broker.tick()
+            if feed is not None:
+                runtime.publish(feed)
+
+            now = time.monotonic()
+            if now - last_report >= config["stats_every"]:
+                last_report = now
+                stats = runtime.stats()
+                lags = [s["lag"] for s in stats["shards"]]
+                print(
+                    f"🧩 [SHARDS] publicados={stats['published']} "
+                    f"lag={lags} risco={stats['risk']}"
+                )
+
+            time.sleep(config["sleep"])
+
+        except KeyboardInterrupt:
+            print("\n⏹ Execução interrompida.")
+            runtime.stop()
+            break
+
+
+if __name__ == "__main__":
+    main()
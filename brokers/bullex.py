@@ -1,17 +1,77 @@
-import time
 import random
+
 from brokers.bullex_api import BullexAPI
+from brokers.contracts import Contract, ContractBook
+from core.clock import WallClock
+
+# Duração de cada timeframe, em segundos
+TIMEFRAMES = {"5m": 300, "4h": 14400}
+
+
+class CandleSchedule:
+    """
+    Agenda de polling por (símbolo, timeframe).
+
+    Um candle só muda no fechamento do período, então não há por que
+    perguntar antes disso. due() diz quem já passou do próximo
+    fechamento; depois de consultado, o par volta a dormir até o
+    fechamento seguinte — ou, se a API ainda devolveu o candle antigo
+    (publicação atrasada), tenta de novo em `retry` segundos.
+    """
+
+    def __init__(self, retry: float = 2.0):
+        self.retry = retry
+        self.next_at: dict[tuple, float] = {}
+
+    def due(self, key, now: float) -> bool:
+        return now >= self.next_at.get(key, 0.0)
+
+    def done(self, key, now: float, changed: bool):
+        period = TIMEFRAMES[key[1]]
+        boundary = (int(now // period) + 1) * period
+        if changed or key not in self.next_at:
+            self.next_at[key] = boundary
+        else:
+            # Candle novo ainda não publicado: insiste perto do fechamento
+            self.next_at[key] = min(now + self.retry, boundary)
 
 
 class BullexBroker:
-    def __init__(self, symbols, mode="ASSISTED", account="DEMO", armed=False):
+    def __init__(
+        self,
+        symbols,
+        mode="ASSISTED",
+        account="DEMO",
+        armed=False,
+        clock=None,
+        scheduler=None,
+        store=None,
+        aggregator=None,
+        bus=None,
+    ):
         self.symbols = symbols
         self.mode = mode
-        self.api = BullexAPI(account=account)
+        self.scheduler = scheduler
+        self.api = BullexAPI(account=account, scheduler=scheduler)
         self.armed = armed
+        self.clock = clock or WallClock()
+
+        # Opcional: CandleAggregator que deriva o 4h dos candles de 5m
+        # (sem consultar o 4h na API)
+        self.aggregator = aggregator
 
-        self.contracts = []
-        self.events = []
+        # Contratos abertos por expiração. Resolvidos são publicados no
+        # EventBus (tópico "binary_result"), que os entrega ao
+        # aprendizado, ao log e às métricas; sem bus, vão direto ao log.
+        self.bus = bus
+        self.contracts = ContractBook(store=None if bus is not None else store)
+
+        # Último candle de cada (símbolo, timeframe) e quando consultar
+        self.candles: dict[tuple, dict] = {}
+        self.schedule = CandleSchedule()
+        self.api_calls = 0
+        self.api_calls_by_tf = {tf: 0 for tf in TIMEFRAMES}
+        self._started_at = None
 
         # Mundo cognitivo por símbolo
         self._world = {
@@ -32,6 +92,71 @@ class BullexBroker:
             for s in symbols
         }
 
+    @property
+    def clock(self):
+        return self._clock
+
+    @clock.setter
+    def clock(self, clock):
+        # A API simulada precisa enxergar o mesmo tempo do broker
+        self._clock = clock
+        self.api.clock = clock
+
+    # --------------------------------------------------
+    # CANDLES
+    # --------------------------------------------------
+    def _candle(self, symbol, timeframe, now):
+        """
+        Último candle de (symbol, timeframe). Só chama a API quando a
+        agenda manda; fora disso, devolve o do cache.
+        """
+        key = (symbol, timeframe)
+        cached = self.candles.get(key)
+
+        if cached is not None and not self.schedule.due(key, now):
+            return cached
+
+        candle = self.api.get_last_candle(symbol, timeframe=timeframe)
+        self.api_calls += 1
+        self.api_calls_by_tf[timeframe] += 1
+
+        changed = cached is None or candle["ts"] != cached["ts"]
+        self.candles[key] = candle
+        self.schedule.done(key, now, changed)
+        return candle
+
+    def _seed_4h(self, bw, symbol, now):
+        """
+        4h derivado: o primeiro fechamento local só vem no fim do
+        período corrente. Uma consulta ao 4h da API no boot dá a
+        referência macro já no primeiro tick (como sem agregador) e
+        semeia a barra em formação.
+        """
+        candle = self._candle(symbol, "4h", now)
+        start = candle["ts"] * TIMEFRAMES["4h"]
+        self.aggregator.seed(
+            symbol,
+            "4h",
+            start,
+            candle["open"],
+            candle["high"],
+            candle["low"],
+            candle["close"],
+        )
+        bw["last_4h_ts"] = start
+        self._update_macro(bw, symbol)
+
+    def stats(self) -> dict:
+        """Chamadas à API de candles (total, por timeframe e por hora)."""
+        now = self.clock.time()
+        hours = (now - self._started_at) / 3600 if self._started_at else 0
+        return {
+            "api_calls": self.api_calls,
+            "by_timeframe": dict(self.api_calls_by_tf),
+            "per_hour": round(self.api_calls / hours, 1) if hours else None,
+            "contracts": self.contracts.stats(),
+        }
+
     # --------------------------------------------------
     # MICRO (5M)
     # --------------------------------------------------
@@ -59,7 +184,7 @@ class BullexBroker:
     # MACRO (4H)
     # --------------------------------------------------
     def _update_macro(self, bw, symbol):
-        candle = self.api.get_last_candle(symbol, timeframe="4h")
+        candle = self.candles[(symbol, "4h")]
         price = candle["close"]
 
         ref = bw["macro_ref"]
@@ -85,7 +210,9 @@ class BullexBroker:
     # TICK — TEMPO BINÁRIO SEMÂNTICO
     # --------------------------------------------------
     def tick(self):
-        now = time.time()
+        now = self.clock.time()
+        if self._started_at is None:
+            self._started_at = now
 
         changed = False
         micro_updated = False
@@ -97,37 +224,29 @@ class BullexBroker:
         # ----------------------------------------------
         # 1. Contratos expirados (EVENTO REAL)
         # ----------------------------------------------
-        for c in self.contracts:
-            if c.resolved:
-                continue
-
-            if now >= c.expiry_at:
-                c.resolved = True
-                c.result = random.choice(["WIN", "LOSS"])
-                contract_resolved = True
-                changed = True
-
-                self.events.append(
-                    {
-                        "type": "binary_result",
-                        "id": c.id,
-                        "symbol": c.symbol,
-                        "result": c.result,
-                        "stake": c.stake,
-                        "pattern": getattr(c, "pattern", None),
-                        "zone": getattr(c, "zone", None),
-                        "tempo": getattr(c, "tempo", None),
-                    }
-                )
+        for c in self.contracts.due(now):
+            event = self.contracts.resolve(c, random.choice(["WIN", "LOSS"]))
+            if self.bus is not None:
+                self.bus.publish(event["type"], event)
+            contract_resolved = True
+            changed = True
 
         # ----------------------------------------------
         # 2. Candles (EVENTO REAL)
         # ----------------------------------------------
+        closed_4h = {}
+        if self.aggregator is not None:
+            closed_4h = {
+                symbol: bar
+                for tf, symbol, bar in self.aggregator.advance(now)
+                if tf == "4h"
+            }
+
         for symbol in self.symbols:
             bw = self._world[symbol]
 
             # ----- 5M
-            candle_5m = self.api.get_last_candle(symbol, timeframe="5m")
+            candle_5m = self._candle(symbol, "5m", now)
             ts5 = candle_5m["ts"]
 
             if bw["last_5m_ts"] != ts5:
@@ -136,16 +255,41 @@ class BullexBroker:
                 micro_updated = True
                 changed = True
 
-            # ----- 4H
-            candle_4h = self.api.get_last_candle(symbol, timeframe="4h")
-            ts4 = candle_4h["ts"]
+                if self.aggregator is not None:
+                    self.aggregator.update_bar(
+                        symbol,
+                        ts5 * TIMEFRAMES["5m"],
+                        candle_5m["open"],
+                        candle_5m["high"],
+                        candle_5m["low"],
+                        candle_5m["close"],
+                    )
 
-            if bw["last_4h_ts"] != ts4:
-                bw["last_4h_ts"] = ts4
-                self._update_macro(bw, symbol)
+            # ----- 4H
+            if self.aggregator is not None and bw["last_4h_ts"] is None:
+                self._seed_4h(bw, symbol, now)
                 macro_updated = True
                 changed = True
 
+            elif self.aggregator is not None:
+                bar = closed_4h.get(symbol)
+                if bar is not None:
+                    self.candles[(symbol, "4h")] = bar.to_dict()
+                    bw["last_4h_ts"] = bar.ts
+                    self._update_macro(bw, symbol)
+                    macro_updated = True
+                    changed = True
+
+            else:
+                candle_4h = self._candle(symbol, "4h", now)
+                ts4 = candle_4h["ts"]
+
+                if bw["last_4h_ts"] != ts4:
+                    bw["last_4h_ts"] = ts4
+                    self._update_macro(bw, symbol)
+                    macro_updated = True
+                    changed = True
+
             feed[symbol] = {
                 "price": bw["last_price"],
                 "binary": {
@@ -160,6 +304,8 @@ class BullexBroker:
                 },
             }
 
+        self._schedule_wakeups(now)
+
         # ----------------------------------------------
         # 3. Sem evento → sem pensamento
         # ----------------------------------------------
@@ -184,33 +330,49 @@ class BullexBroker:
 
         return feed
 
+    def _schedule_wakeups(self, now):
+        """
+        Informa ao relógio os próximos instantes em que algo acontece:
+        consultas agendadas de candle (fechamento de 5m/4h) e
+        expiração de contratos. Em replay, o
+        SimulatedClock salta direto para eles.
+        """
+        for at in set(self.schedule.next_at.values()):
+            self.clock.wake_at(at)
+
+        expiry = self.contracts.next_expiry()
+        if expiry is not None:
+            self.clock.wake_at(expiry)
+
     # --------------------------------------------------
     # EXECUÇÃO BINÁRIA
     # --------------------------------------------------
     def buy(self, action):
-        import uuid
+        meta = action.get("meta", {})
+        expiry = meta.get("expiry", 60)
 
         ok = self.api.place_demo_order(
             action["symbol"],
             action["side"],
             action["amount"],
-            action.get("meta", {}).get("expiry", 60),
+            expiry,
         )
 
-        contract = type("Contract", (), {})()
-        contract.id = str(uuid.uuid4())
-        contract.symbol = action["symbol"]
-        contract.side = action["side"]
-        contract.stake = action["amount"]
-        contract.expiry_at = time.time() + action.get("meta", {}).get("expiry", 60)
-        contract.resolved = False
-        contract.result = None
-
-        contract.pattern = action.get("meta", {}).get("pattern")
-        ctx = action.get("meta", {}).get("context", {})
-        contract.zone = ctx.get("zone")
-        contract.tempo = ctx.get("tempo")
-
-        self.contracts.append(contract)
+        ctx = meta.get("context", {})
+        intent = meta.get("intent", {})
+        now = self.clock.time()
+        self.contracts.add(
+            Contract(
+                action["symbol"],
+                action["side"],
+                action["amount"],
+                opened_at=now,
+                expiry_at=now + expiry,
+                pattern=meta.get("pattern"),
+                zone=ctx.get("zone"),
+                tempo=ctx.get("tempo"),
+                quality=intent.get("quality"),
+            )
+        )
 
         return True
@@ -1,15 +1,27 @@
 import random
-import time
+
+from core.clock import WallClock
 
 
 class BullexAPI:
-    def __init__(self, account="DEMO"):
+    def __init__(self, account="DEMO", clock=None, scheduler=None):
         self.account = account
+        self.clock = clock or WallClock()
+        # Opcional: RequestScheduler compartilhado (orçamento e prioridade)
+        self.scheduler = scheduler
         self._last = {}
         self._prices = {}
 
+    def _request(self, lane, fn, *args):
+        if self.scheduler is None:
+            return fn(*args)
+        return self.scheduler.call(lane, fn, *args)
+
     def get_last_candle(self, symbol, timeframe="5m"):
-        now = time.time()
+        return self._request("market", self._get_last_candle, symbol, timeframe)
+
+    def _get_last_candle(self, symbol, timeframe):
+        now = self.clock.time()
 
         if timeframe == "5m":
             block = int(now // 300)  # 5 minutos
@@ -46,4 +58,9 @@ class BullexAPI:
         Simula uma ordem binária DEMO.
         Retorna True se aceita.
         """
+        return self._request(
+            "order", self._place_demo_order, symbol, side, amount, expiry
+        )
+
+    def _place_demo_order(self, symbol, side, amount, expiry):
         return True
@@ -0,0 +1,125 @@
+import heapq
+import itertools
+import uuid
+from collections import deque
+
+
+class Contract:
+    """Contrato binário aberto (registro compacto)."""
+
+    __slots__ = (
+        "id",
+        "symbol",
+        "side",
+        "stake",
+        "opened_at",
+        "expiry_at",
+        "resolved",
+        "result",
+        "pattern",
+        "zone",
+        "tempo",
+        "quality",
+    )
+
+    def __init__(
+        self,
+        symbol,
+        side,
+        stake,
+        opened_at,
+        expiry_at,
+        pattern=None,
+        zone=None,
+        tempo=None,
+        quality=None,
+    ):
+        self.id = str(uuid.uuid4())
+        self.symbol = symbol
+        self.side = side
+        self.stake = stake
+        self.opened_at = opened_at
+        self.expiry_at = expiry_at
+        self.resolved = False
+        self.result = None
+        self.pattern = pattern
+        self.zone = zone
+        self.tempo = tempo
+        self.quality = quality
+
+    def to_event(self) -> dict:
+        return {
+            "type": "binary_result",
+            "id": self.id,
+            "symbol": self.symbol,
+            "result": self.result,
+            "stake": self.stake,
+            "pattern": self.pattern,
+            "zone": self.zone,
+            "tempo": self.tempo,
+            "quality": self.quality,
+        }
+
+
+class ContractBook:
+    """
+    Livro de contratos binários ordenado por expiração.
+
+    - heap mínimo por `expiry_at`: due() só toca nos contratos que já
+      venceram, nunca na lista inteira
+    - resolvidos saem do livro e vão para o log de eventos
+      (`store.record_event`), se houver store
+    - só os últimos `keep` resolvidos ficam em memória (painel/consulta)
+
+    Custo por tick e memória dependem só dos contratos abertos, não do
+    tempo de vida do processo.
+    """
+
+    def __init__(self, store=None, keep: int = 100):
+        self.store = store
+        self._heap = []  # (expiry_at, seq, contrato)
+        self._seq = itertools.count()
+        self.recent = deque(maxlen=keep)
+
+        # Métricas
+        self.opened = 0
+        self.resolved = 0
+
+    def add(self, contract: Contract) -> Contract:
+        heapq.heappush(self._heap, (contract.expiry_at, next(self._seq), contract))
+        self.opened += 1
+        return contract
+
+    def due(self, now: float):
+        """Retira do livro, em ordem de expiração, os contratos vencidos."""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            yield heapq.heappop(heap)[2]
+
+    def resolve(self, contract: Contract, result: str) -> dict:
+        contract.resolved = True
+        contract.result = result
+        self.resolved += 1
+        self.recent.append(contract)
+
+        event = contract.to_event()
+        if self.store is not None:
+            self.store.record_event(event)
+        return event
+
+    def next_expiry(self) -> float | None:
+        return self._heap[0][0] if self._heap else None
+
+    def open_contracts(self) -> list[Contract]:
+        return [c for _, _, c in sorted(self._heap)]
+
+    def __len__(self):
+        return len(self._heap)
+
+    def stats(self) -> dict:
+        return {
+            "open": len(self._heap),
+            "opened": self.opened,
+            "resolved": self.resolved,
+            "next_expiry": self.next_expiry(),
+        }
@@ -0,0 +1,182 @@
+import threading
+from collections import deque
+
+# Tópicos conhecidos
+CONTRACT_RESULT = "binary_result"  # contrato binário resolvido (broker)
+
+# Políticas de fila cheia
+FLUSH = "flush"  # o publicador entrega o lote ali mesmo (nada se perde)
+DROP_OLDEST = "drop_oldest"  # descarta o mais antigo (conta em `dropped`)
+
+
+class Subscription:
+    """Um assinante de um tópico: fila limitada + handler de lote."""
+
+    __slots__ = (
+        "topic",
+        "name",
+        "handler",
+        "batch",
+        "maxsize",
+        "policy",
+        "queue",
+        "delivered",
+        "batches",
+        "dropped",
+        "flushes",
+        "errors",
+    )
+
+    def __init__(self, topic, name, handler, batch, maxsize, policy):
+        self.topic = topic
+        self.name = name
+        self.handler = handler
+        self.batch = batch
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue = deque()
+
+        # Métricas
+        self.delivered = 0
+        self.batches = 0
+        self.dropped = 0
+        self.flushes = 0  # entregas forçadas por fila cheia
+        self.errors = 0
+
+    def stats(self) -> dict:
+        return {
+            "topic": self.topic,
+            "policy": self.policy,
+            "pending": len(self.queue),
+            "maxsize": self.maxsize,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "errors": self.errors,
+        }
+
+
+class EventBus:
+    """
+    Barramento de eventos em processo.
+
+    - publish() só enfileira: O(1) por assinante, não chama ninguém
+    - dispatch() — chamado pelo Engine, na thread dele — entrega os
+      eventos em lotes de até `batch` a cada handler(lista)
+    - cada assinante tem fila própria limitada a `maxsize`; com a fila
+      cheia vale a política do assinante:
+        FLUSH: o publicador entrega um lote na hora (contrapressão —
+               quem produz rápido demais paga a entrega; nada se perde)
+        DROP_OLDEST: o evento mais antigo é descartado e contado
+
+    Memória fica limitada por assinante, não pelo tempo de vida do
+    processo. Erro num handler é contado e não derruba os demais.
+    Com assinante FLUSH, publique na mesma thread que chama dispatch():
+    a entrega forçada roda em quem publica.
+    """
+
+    def __init__(self, batch: int = 64, maxsize: int = 1024):
+        self.batch = batch
+        self.maxsize = maxsize
+        self._subs: dict[str, list[Subscription]] = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.published = 0
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def subscribe(
+        self,
+        topic: str,
+        handler,
+        name: str | None = None,
+        batch: int | None = None,
+        maxsize: int | None = None,
+        policy: str = FLUSH,
+    ) -> Subscription:
+        """handler(eventos: list[dict]) recebe cada lote do tópico."""
+        if policy not in (FLUSH, DROP_OLDEST):
+            raise ValueError(f"Política desconhecida: {policy}")
+
+        sub = Subscription(
+            topic,
+            name or getattr(handler, "__qualname__", repr(handler)),
+            handler,
+            batch or self.batch,
+            maxsize or self.maxsize,
+            policy,
+        )
+        with self._lock:
+            self._subs.setdefault(topic, []).append(sub)
+        return sub
+
+    def publish(self, topic: str, event: dict):
+        full = []
+        with self._lock:
+            self.published += 1
+            for sub in self._subs.get(topic, ()):
+                if len(sub.queue) >= sub.maxsize:
+                    if sub.policy == DROP_OLDEST:
+                        sub.queue.popleft()
+                        sub.dropped += 1
+                    else:
+                        full.append(sub)
+                sub.queue.append(event)
+
+        for sub in full:
+            sub.flushes += 1
+            self._deliver(sub)
+
+    def dispatch(self, max_batches: int | None = None) -> int:
+        """
+        Entrega o que está nas filas. Com max_batches, limita os lotes
+        por assinante nesta chamada (o resto fica para a próxima).
+        Retorna o número de eventos entregues.
+        """
+        with self._lock:
+            subs = [s for group in self._subs.values() for s in group if s.queue]
+
+        delivered = 0
+        for sub in subs:
+            rounds = 0
+            while sub.queue and (max_batches is None or rounds < max_batches):
+                delivered += self._deliver(sub)
+                rounds += 1
+        return delivered
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(s.queue) for g in self._subs.values() for s in g)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "published": self.published,
+                "subscribers": {
+                    s.name: s.stats() for g in self._subs.values() for s in g
+                },
+            }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _deliver(self, sub: Subscription) -> int:
+        with self._lock:
+            n = min(sub.batch, len(sub.queue))
+            events = [sub.queue.popleft() for _ in range(n)]
+
+        if not events:
+            return 0
+
+        try:
+            sub.handler(events)
+        except Exception as e:
+            sub.errors += 1
+            print(f"⚠️ [BUS] Erro em {sub.name} ({sub.topic}): {e}")
+
+        sub.delivered += n
+        sub.batches += 1
+        return n
@@ -0,0 +1,155 @@
+# Duração de cada timeframe suportado, em segundos
+TIMEFRAMES = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+}
+
+
+def event_name(timeframe: str) -> str:
+    """Ex.: "5m" -> "5M_CLOSED" (mesmo vocabulário do ImpulseBinary)."""
+    return f"{timeframe.upper()}_CLOSED"
+
+
+class Bar:
+    """Barra OHLCV. `ts` é o início do período (segundos)."""
+
+    __slots__ = ("ts", "open", "high", "low", "close", "volume")
+
+    def __init__(self, ts, open_, high, low, close, volume=0.0):
+        self.ts = ts
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def to_dict(self) -> dict:
+        return {
+            "ts": self.ts,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+        }
+
+
+class CandleAggregator:
+    """
+    Barras OHLCV de vários timeframes montadas localmente, a partir de
+    um único fluxo de ticks (ou de barras menores).
+
+    Por símbolo guarda só a barra em formação e a última fechada de
+    cada timeframe: memória constante, atualização O(timeframes).
+
+    Uma barra fecha quando chega dado de um período seguinte ou quando
+    advance(now) percebe que o relógio passou do fim dela — sem esperar
+    o próximo tick. Períodos sem nenhum dado não geram barra.
+
+    update()/update_bar()/advance() retornam os fechamentos como
+    [(timeframe, símbolo, Bar)], em ordem de timeframe.
+    """
+
+    def __init__(self, symbols, timeframes=("5m", "4h")):
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if unknown:
+            raise ValueError(f"Timeframes desconhecidos: {unknown}")
+
+        # Do menor para o maior
+        self.timeframes = tuple(sorted(timeframes, key=TIMEFRAMES.get))
+        self._periods = tuple(TIMEFRAMES[tf] for tf in self.timeframes)
+
+        self.forming: dict[str, list] = {
+            s: [None] * len(self.timeframes) for s in symbols
+        }
+        self.closed: dict[str, list] = {
+            s: [None] * len(self.timeframes) for s in symbols
+        }
+
+    # -------------------------------------------------
+    # ENTRADA
+    # -------------------------------------------------
+    def update(self, symbol: str, price: float, ts: float, volume: float = 0.0):
+        """Um tick (preço negociado/último preço) no instante ts."""
+        return self.update_bar(symbol, ts, price, price, price, price, volume)
+
+    def update_bar(self, symbol, ts, open_, high, low, close, volume=0.0):
+        """
+        Uma barra menor (ex.: 5m vinda da corretora) que começa em ts.
+        Precisa caber inteira no período dos timeframes agregados.
+        """
+        forming = self.forming.get(symbol)
+        if forming is None:
+            return []
+
+        closed = []
+        for i, period in enumerate(self._periods):
+            start = ts - ts % period
+            bar = forming[i]
+
+            if bar is None or start > bar.ts:
+                if bar is not None:
+                    self._close(symbol, i, closed)
+                forming[i] = Bar(start, open_, high, low, close, volume)
+            elif start == bar.ts:
+                if high > bar.high:
+                    bar.high = high
+                if low < bar.low:
+                    bar.low = low
+                bar.close = close
+                bar.volume += volume
+            # dado atrasado (período já fechado): ignorado
+
+        return closed
+
+    def seed(self, symbol, timeframe, ts, open_, high, low, close, volume=0.0):
+        """
+        Barra em formação já conhecida (ex.: o candle corrente da API
+        no boot), para o primeiro fechamento cobrir o período inteiro.
+        Não substitui uma barra que já está em formação.
+        """
+        forming = self.forming.get(symbol)
+        if forming is None:
+            return
+
+        i = self.timeframes.index(timeframe)
+        if forming[i] is None:
+            start = ts - ts % self._periods[i]
+            forming[i] = Bar(start, open_, high, low, close, volume)
+
+    def advance(self, now: float):
+        """Fecha as barras cujo período já terminou em `now`."""
+        closed = []
+        for symbol, forming in self.forming.items():
+            for i, period in enumerate(self._periods):
+                bar = forming[i]
+                if bar is not None and now >= bar.ts + period:
+                    self._close(symbol, i, closed)
+        closed.sort(key=lambda c: TIMEFRAMES[c[0]])
+        return closed
+
+    # -------------------------------------------------
+    # LEITURA
+    # -------------------------------------------------
+    def last_closed(self, symbol: str, timeframe: str) -> Bar | None:
+        return self.closed[symbol][self.timeframes.index(timeframe)]
+
+    def current(self, symbol: str, timeframe: str) -> Bar | None:
+        return self.forming[symbol][self.timeframes.index(timeframe)]
+
+    @staticmethod
+    def events(closed) -> list[str]:
+        """Fechamentos -> ["5M_CLOSED", "4H_CLOSED", ...] sem repetição."""
+        return list(dict.fromkeys(event_name(tf) for tf, _, _ in closed))
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _close(self, symbol, i, closed):
+        bar = self.forming[symbol][i]
+        self.closed[symbol][i] = bar
+        self.forming[symbol][i] = None
+        closed.append((self.timeframes[i], symbol, bar))
@@ -0,0 +1,130 @@
+from collections import deque
+
+from core.clock import WallClock
+
+
+class CircuitBreaker:
+    """
+    Disjuntor por corretora.
+
+    CLOSED     tudo normal; cada chamada registra sucesso/falha e latência
+    OPEN       taxa de erro (ou de lentidão) passou do limite na janela:
+               nenhuma chamada sai até `open_seconds` passar
+    HALF_OPEN  deixa passar sondas; `probe_successes` seguidas fecham
+               o disjuntor, uma falha reabre com espera dobrada
+               (até `max_open_seconds`)
+
+    allow() diz se a próxima chamada pode sair; record() informa o
+    resultado.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_seconds: float = 2.0,
+        slow_rate: float = 0.8,
+        open_seconds: float = 5.0,
+        max_open_seconds: float = 60.0,
+        probe_successes: int = 2,
+        clock=None,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probe_successes = probe_successes
+        self.clock = clock or WallClock()
+
+        self.state = self.CLOSED
+        self.calls = deque(maxlen=window)  # (ok, lento)
+        self.open_seconds = open_seconds
+        self.open_until = 0.0
+        self.probes_ok = 0
+
+        self.transitions = deque(maxlen=20)
+        self.rejected = 0
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self.clock.time() < self.open_until:
+                self.rejected += 1
+                return False
+            self._move(self.HALF_OPEN, "espera encerrada, sondando")
+
+        return True
+
+    def record(self, ok: bool, latency: float | None = None):
+        slow = latency is not None and latency >= self.slow_seconds
+
+        if self.state == self.HALF_OPEN:
+            if ok and not slow:
+                self.probes_ok += 1
+                if self.probes_ok >= self.probe_successes:
+                    self.open_seconds = self.base_open_seconds
+                    self.calls.clear()
+                    self._move(self.CLOSED, "sondas bem-sucedidas")
+            else:
+                self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+                self._open("sonda falhou" if not ok else "sonda lenta")
+            return
+
+        if self.state == self.OPEN:
+            return  # resposta tardia de antes da abertura
+
+        self.calls.append((ok, slow))
+        if len(self.calls) < self.min_calls:
+            return
+
+        n = len(self.calls)
+        errors = sum(1 for ok_, _ in self.calls if not ok_)
+        slows = sum(1 for _, slow_ in self.calls if slow_)
+
+        if errors / n >= self.error_rate:
+            self._open(f"{errors}/{n} falhas")
+        elif slows / n >= self.slow_rate:
+            self._open(f"{slows}/{n} chamadas lentas")
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "open_until": self.open_until if self.state == self.OPEN else None,
+            "rejected": self.rejected,
+            "transitions": list(self.transitions),
+        }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _open(self, reason: str):
+        self.open_until = self.clock.time() + self.open_seconds
+        self._move(self.OPEN, reason)
+
+    def _move(self, state: str, reason: str):
+        if state == self.state:
+            return
+
+        self.transitions.append(
+            {
+                "ts": self.clock.time(),
+                "from": self.state,
+                "to": state,
+                "reason": reason,
+            }
+        )
+        print(f"🔌 [{self.name}] {self.state} → {state} ({reason})")
+        self.state = state
+        self.probes_ok = 0
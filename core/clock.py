@@ -0,0 +1,80 @@
+import heapq
+import time
+from datetime import date
+
+
+class WallClock:
+    """
+    Relógio real. Usado em operação ao vivo.
+    """
+
+    simulated = False
+
+    def time(self) -> float:
+        return time.time()
+
+    def today(self) -> date:
+        return date.today()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wake_at(self, ts: float):
+        """No relógio real o tempo anda sozinho."""
+        pass
+
+
+class SimulatedClock:
+    """
+    Relógio simulado para replays.
+
+    O tempo só anda quando alguém manda:
+    - set(ts) / advance(s): avanço explícito
+    - advance_to_next(): salta direto para o próximo instante
+      registrado via wake_at() (fechamento de candle, expiração
+      de contrato...), sem esperar nada.
+    """
+
+    simulated = True
+
+    def __init__(self, start: float | None = None):
+        self.now = time.time() if start is None else float(start)
+        self._wakeups = []
+        self._scheduled = set()
+
+    def time(self) -> float:
+        return self.now
+
+    def today(self) -> date:
+        return date.fromtimestamp(self.now)
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        self.now += max(0.0, seconds)
+
+    def set(self, ts: float):
+        # O tempo nunca volta
+        if ts > self.now:
+            self.now = ts
+
+    def wake_at(self, ts: float):
+        if ts > self.now and ts not in self._scheduled:
+            self._scheduled.add(ts)
+            heapq.heappush(self._wakeups, ts)
+
+    def advance_to_next(self) -> bool:
+        """
+        Avança até o próximo instante agendado.
+        Retorna False se não houver nada agendado.
+        """
+        while self._wakeups and self._wakeups[0] <= self.now:
+            self._scheduled.discard(heapq.heappop(self._wakeups))
+
+        if not self._wakeups:
+            return False
+
+        self.now = heapq.heappop(self._wakeups)
+        self._scheduled.discard(self.now)
+        return True
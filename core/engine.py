@@ -1,10 +1,29 @@
 import json
 import os
+from core.bus import CONTRACT_RESULT
+from core.clock import WallClock
 from core.state_machine import State, StateMachine
+from core.tick_cache import TickCache
+from storage.persister import StatePersister
+from tools.tracing import Tracer
 
 
 class Engine:
-    def __init__(self, broker, world, strategy, risk, store, feedback, mode: str):
+    def __init__(
+        self,
+        broker,
+        world,
+        strategy,
+        risk,
+        store,
+        feedback,
+        mode: str,
+        max_staleness: float = 1.0,
+        clock=None,
+        tracer=None,
+        reconciler=None,
+        bus=None,
+    ):
         self.broker = broker
         self.world = world
         self.strategy = strategy
@@ -12,6 +31,40 @@ class Engine:
         self.store = store
         self.feedback = feedback
 
+        # Relógio único do organismo. Se informado, é repassado a todo
+        # componente que tenha um atributo `clock` (risco, estratégia,
+        # broker...), para que replays simulados fiquem coerentes.
+        self.clock = clock or WallClock()
+        if clock is not None:
+            for part in (world, strategy, risk, broker):
+                if hasattr(part, "clock"):
+                    part.clock = clock
+
+        # Indicadores pedidos pela estratégia são calculados uma única
+        # vez, dentro do World, e lidos do snapshot.
+        if hasattr(strategy, "indicators") and hasattr(world, "register"):
+            for name, period in strategy.indicators:
+                world.register(name, period)
+
+        # Latência por estágio (desligada = custo ~zero)
+        self.tracer = tracer or Tracer(enabled=False)
+
+        # Conciliação corretora × estratégia (roda fora do tick; aqui
+        # só chegam as divergências)
+        self.reconciler = reconciler
+        if reconciler is not None:
+            reconciler.attach(self._positions_view)
+
+        # Barramento de eventos: resultados de contratos chegam em lote
+        # ao aprendizado da estratégia e ao log. Entrega a cada step(),
+        # nesta thread.
+        self.bus = bus
+        if bus is not None:
+            if hasattr(strategy, "learn"):
+                bus.subscribe(CONTRACT_RESULT, strategy.learn, name="strategy")
+            if hasattr(store, "record_events"):
+                bus.subscribe(CONTRACT_RESULT, store.record_events, name="store")
+
         self.initial_mode = mode
         self.mode = mode
         self.identity = self.load_identity
@@ -20,6 +73,18 @@ class Engine:
         self.pending_action = None
         self.human_confirmed = False
 
+        # Diagnóstico/snapshot calculados uma vez por tick
+        self.tick = 0
+        self.cache = TickCache()
+
+        # Persistência guiada por mudança (write-behind)
+        self.persister = StatePersister(store, max_staleness=max_staleness)
+        self._persisted_versions = None
+
+        # Símbolos alterados no tick (None = World sem rastreamento)
+        self.changed = None
+        self._decided_versions = None
+
         self.state_handlers = {
             State.IDLE: self.handle_idle,
             State.ENTERING: self.handle_entering,
@@ -73,7 +138,17 @@ class Engine:
         if self.state.current() == State.BOOT:
             self.state.set(State.IDLE)
 
-        self.persist()
+        # Corretora é a verdade: concilia antes do primeiro tick
+        if self.reconciler is not None:
+            self.reconciler.check()
+            self._reconcile()
+
+        # Posição restaurada também ocupa vaga no limite do risco
+        holding = self.state.current() in (State.IN_POSITION, State.EXITING)
+        if holding and hasattr(self.risk, "on_restored"):
+            self.risk.on_restored(1)
+
+        self.flush()
 
     # -------------------------------------------------
     # CICLO
@@ -83,23 +158,113 @@ class Engine:
             self.handle_error()
             return
 
-        self._global_ritual(market_snapshot)
+        with self.tracer.span("engine.step"):
+            self.tick += 1
+            self._global_ritual(market_snapshot)
+            self._reconcile()
 
-        handler = self.state_handlers.get(self.state.current())
-        if handler:
-            handler()
+            handler = self.state_handlers.get(self.state.current())
+            if handler:
+                handler()
 
-        self.persist()
+            with self.tracer.span("persist"):
+                self.persist()
 
     # -------------------------------------------------
     # RITUAL GLOBAL
     # -------------------------------------------------
     def _global_ritual(self, market_snapshot):
-        self.world.update(market_snapshot)
+        with self.tracer.span("world.update"):
+            self.changed = self.world.update(market_snapshot)
 
         if self.feedback:
-            diagnosis = self.feedback.diagnose()
-            self.strategy.adapt(diagnosis)
+            with self.tracer.span("feedback.diagnose"):
+                diagnosis = self.diagnosis()
+            with self.tracer.span("strategy.adapt"):
+                self.strategy.adapt(diagnosis)
+
+        if self.bus is not None:
+            with self.tracer.span("bus.dispatch"):
+                self.bus.dispatch()
+
+    # -------------------------------------------------
+    # CONCILIAÇÃO
+    # -------------------------------------------------
+    def _positions_view(self):
+        """Lido pela thread do Reconciler: (entradas, versão do estado)."""
+        entries = getattr(self.strategy, "entries", None)
+        return dict(entries or {}), self.state.version
+
+    def _reconcile(self):
+        """
+        Aplica as divergências apontadas pelo Reconciler.
+
+        Só em IDLE/IN_POSITION (com ordem em voo a divergência é
+        esperada) e só se o estado não mudou desde a leitura das
+        posições.
+        """
+        if self.reconciler is None:
+            return
+
+        diffs = self.reconciler.drain()
+        if not diffs:
+            return
+
+        current = self.state.current()
+        if current not in (State.IDLE, State.IN_POSITION):
+            return
+
+        entries = getattr(self.strategy, "entries", None)
+        if not isinstance(entries, dict):
+            return
+
+        applied = False
+        for diff in diffs:
+            if diff.get("state_version") != self.state.version:
+                continue
+
+            symbol = diff["symbol"]
+            if diff["kind"] == "UNTRACKED" and symbol not in entries:
+                print(f"🔗 Posição real detectada em {symbol}. Sincronizando.")
+                if hasattr(self.strategy, "on_position_opened"):
+                    self.strategy.on_position_opened(symbol, diff["entry_price"])
+
+            elif diff["kind"] == "VANISHED" and symbol in entries:
+                print(f"🔗 Posição em {symbol} não existe na corretora. Removendo.")
+                if hasattr(self.strategy, "on_position_closed"):
+                    self.strategy.on_position_closed(symbol)
+
+            else:
+                continue
+
+            applied = True
+            self.store.record_event({"type": "reconcile", "mode": self.mode, **diff})
+
+        if not applied:
+            return
+
+        target = State.IN_POSITION if entries else State.IDLE
+        if target != current:
+            self.state.set(target)
+
+    # -------------------------------------------------
+    # DIAGNÓSTICO (cache por tick)
+    # -------------------------------------------------
+    def _cache_version(self):
+        # Muda quando o tick avança ou um novo evento é registrado
+        return (self.tick, getattr(self.store, "event_seq", 0))
+
+    def diagnosis(self):
+        if not self.feedback:
+            return {}
+        return self.cache.get(
+            "diagnosis", self._cache_version(), self.feedback.diagnose
+        )
+
+    def health(self):
+        if not self.feedback:
+            return None
+        return self.cache.get("health", self._cache_version(), self.feedback.health)
 
     # -------------------------------------------------
     # CONTEXTO
@@ -107,21 +272,79 @@ class Engine:
     def _build_context(self):
         return {
             "mode": self.mode,
-            "health": self.feedback.health() if self.feedback else None,
+            "health": self.health(),
         }
 
     # -------------------------------------------------
-    # HANDLERS
+    # DECISÃO GUIADA POR MUDANÇA
     # -------------------------------------------------
-    def handle_idle(self):
+    def _relevant_changes(self, state):
+        """
+        O que a estratégia precisa reavaliar neste tick:
+
+        - None: tudo (estado, regime ou modo mudaram, o tick traz um
+          "_event", ou o World não rastreia mudanças)
+        - conjunto vazio: nada; decide/risco são pulados
+        - conjunto: só estes símbolos
+
+        Em IDLE qualquer símbolo alterado importa; em posição, só os
+        símbolos com entrada aberta na estratégia.
+        """
+        versions = (
+            self.state.version,
+            getattr(self.strategy, "version", None),
+            self.mode,
+        )
+        if versions != self._decided_versions or None in versions:
+            self._decided_versions = versions
+            return None
+
+        if self.changed is None or "_event" in getattr(self.world, "meta", {}):
+            return None
+
+        if state == State.IN_POSITION:
+            entries = getattr(self.strategy, "entries", None)
+            if isinstance(entries, dict):
+                return self.changed & entries.keys()
+
+        return self.changed
+
+    def _decide(self, state):
+        """
+        Retorna a ação da estratégia, ou None sem sequer chamá-la
+        quando nada relevante mudou desde a última decisão.
+        """
+        # Mercado inteiro defasado (ex.: disjuntor aberto): nenhuma
+        # entrada nova, sem nem consultar a estratégia
+        if state == State.IDLE and getattr(self.world, "degraded", False):
+            return None
+
+        symbols = self._relevant_changes(state)
+        if symbols is not None and not symbols:
+            return None
+
         world_view = self.world.snapshot()
         context = self._build_context()
 
-        action = self.strategy.decide(State.IDLE, world_view, context)
+        with self.tracer.span("strategy.decide"):
+            if symbols is not None and hasattr(self.strategy, "decide_changed"):
+                return self.strategy.decide_changed(state, world_view, context, symbols)
+            return self.strategy.decide(state, world_view, context)
+
+    # -------------------------------------------------
+    # HANDLERS
+    # -------------------------------------------------
+    def handle_idle(self):
+        action = self._decide(State.IDLE)
         if not action:
             return
 
-        if not self.risk.allow(State.IDLE, action):
+        if hasattr(self.world, "is_stale"):
+            action["stale"] = self.world.is_stale(action.get("symbol"))
+
+        with self.tracer.span("risk.allow"):
+            allowed = self.risk.allow(State.IDLE, action)
+        if not allowed:
             return
 
         self.pending_action = action
@@ -137,20 +360,37 @@ class Engine:
             self.state.set(State.ERROR)
             return
 
-        if self.mode == "ASSISTED" and not self.human_confirmed:
+        # Ordem já enviada: a confirmação humana foi consumida no envio
+        if (
+            self.mode == "ASSISTED"
+            and not self.human_confirmed
+            and "order_id" not in action
+        ):
             self.state.set(State.AWAIT_CONFIRMATION)
             return
 
         self.human_confirmed = False
 
-        ok = self.broker.buy(action)
+        ok = self._execute("buy", action)
+        if ok is None:
+            return  # aguardando a corretora; segue em ENTERING
 
-        if ok:
+        if ok and action.get("type") == "CONTRACT":
+            # Contrato binário expira sozinho: não há posição a acompanhar
+            self.state.set(State.POST_TRADE)
+            self.risk.on_executed(action)
+        elif ok:
+            if hasattr(self.strategy, "on_position_opened"):
+                self.strategy.on_position_opened(
+                    action["symbol"], action.get("fill_price", action.get("price"))
+                )
             self.state.set(State.IN_POSITION)
             self.risk.on_executed(action)
         else:
             self.store.record_event({"type": "engine_error", "reason": "BUY_FAILED"})
             self.state.set(State.ERROR)
+            if hasattr(self.risk, "on_failed"):
+                self.risk.on_failed(action)
 
         self.pending_action = None
 
@@ -158,14 +398,13 @@ class Engine:
         pass
 
     def handle_in_position(self):
-        world_view = self.world.snapshot()
-        context = self._build_context()
-
-        action = self.strategy.decide(State.IN_POSITION, world_view, context)
+        action = self._decide(State.IN_POSITION)
         if not action:
             return
 
-        if not self.risk.allow(State.IN_POSITION, action):
+        with self.tracer.span("risk.allow"):
+            allowed = self.risk.allow(State.IN_POSITION, action)
+        if not allowed:
             return
 
         if action["type"] == "SELL":
@@ -178,16 +417,93 @@ class Engine:
             self.state.set(State.ERROR)
             return
 
-        ok = self.broker.sell(action)
+        ok = self._execute("sell", action)
+        if ok is None:
+            return  # aguardando a corretora; segue em EXITING
 
         if ok:
+            if hasattr(self.strategy, "on_position_closed"):
+                self.strategy.on_position_closed(action.get("symbol"))
             self.state.set(State.POST_TRADE)
+            if hasattr(self.risk, "on_position_closed"):
+                self.risk.on_position_closed(action)
         else:
             self.store.record_event({"type": "engine_error", "reason": "SELL_FAILED"})
             self.state.set(State.ERROR)
 
         self.pending_action = None
 
+    def _execute(self, side: str, action: dict):
+        """
+        Executa a ordem de `action` ("buy" ou "sell").
+
+        Retorna True (executada), False (falhou) ou None (ainda na
+        corretora).
+
+        Brokers com submit()/order_status() são assíncronos: a ordem sai
+        sem bloquear o tick, o orderLinkId fica em action["order_id"] e
+        os ticks seguintes consultam o livro de ordens do broker. Os
+        demais executam na hora com buy()/sell().
+        """
+        if not hasattr(self.broker, "order_status"):
+            self._checkpoint()
+            with self.tracer.span(f"broker.{side}"):
+                return getattr(self.broker, side)(action)
+
+        order_id = action.get("order_id")
+        if order_id is None:
+            self._checkpoint()
+            with self.tracer.span("broker.submit"):
+                order_id = self.broker.submit(action)
+            if order_id is None:
+                return False
+            action["order_id"] = order_id
+            return None
+
+        order = self.broker.order_status(order_id)
+        status = order.get("status") if order else None
+
+        # Executada em parte e o resto cancelado (liquidez, prazo)
+        if status == "PARTIAL_CANCELLED" and order.get("filled_qty"):
+            self.store.record_event(
+                {
+                    "type": "order_partial",
+                    "side": side.upper(),
+                    "symbol": action.get("symbol"),
+                    "order_id": order_id,
+                    "filled_qty": order["filled_qty"],
+                    "price": order.get("avg_price"),
+                }
+            )
+            if side == "sell":
+                # Ainda há saldo: a próxima ordem vende o restante
+                del action["order_id"]
+                if action.get("qty"):
+                    action["qty"] -= order["filled_qty"]
+                return None
+            status = "FILLED"  # a parte comprada é a posição
+
+        if status == "FILLED":
+            if order.get("avg_price"):
+                action["fill_price"] = order["avg_price"]
+            self.store.record_event(
+                {
+                    "type": "order_filled",
+                    "side": side.upper(),
+                    "symbol": action.get("symbol"),
+                    "order_id": order_id,
+                    "price": action.get("fill_price"),
+                    "ack_ms": order.get("ack_ms"),
+                    "fill_ms": order.get("fill_ms"),
+                }
+            )
+            return True
+
+        if status in (None, "REJECTED", "CANCELLED", "PARTIAL_CANCELLED", "FAILED"):
+            return False
+
+        return None
+
     def handle_post_trade(self):
         self.state.set(State.IDLE)
 
@@ -222,6 +538,8 @@ class Engine:
                 }
             )
 
+            if hasattr(self.risk, "on_failed"):
+                self.risk.on_failed(self.pending_action)
             self.pending_action = None
             self.human_confirmed = False
             self.state.set(State.IDLE)
@@ -237,11 +555,23 @@ class Engine:
 
         if hasattr(self.strategy, "regime"):
             self.strategy.regime = regime.upper()
+            # Versão nova: o override entra no próximo snapshot persistido
+            if hasattr(self.strategy, "version"):
+                self.strategy.version += 1
 
     # -------------------------------------------------
     # SNAPSHOT
     # -------------------------------------------------
     def cognitive_snapshot(self) -> dict:
+        version = (
+            self._cache_version(),
+            self.state.current(),
+            id(self.pending_action),
+            self.mode,
+        )
+        return self.cache.get("snapshot", version, self._build_snapshot)
+
+    def _build_snapshot(self) -> dict:
         intent = None
         if self.pending_action:
             intent = {
@@ -253,7 +583,17 @@ class Engine:
 
         regime = getattr(self.strategy, "regime", None)
 
-        diagnosis = self.feedback.diagnose() if self.feedback else {}
+        breaker = getattr(self.broker, "breaker", None)
+        market = {
+            "breaker": breaker.snapshot() if breaker else None,
+            "stale": (
+                self.world.stale_symbols()
+                if hasattr(self.world, "stale_symbols")
+                else []
+            ),
+        }
+
+        diagnosis = self.diagnosis()
         human_profile = diagnosis.get("signals", [])
         identity = self.identity or {}
 
@@ -261,10 +601,11 @@ class Engine:
             "mode": self.mode,
             "identity": identity,
             "state": self.state.current().name,
-            "health": self.feedback.health() if self.feedback else None,
+            "health": self.health(),
             "regime": regime,
             "human_profile": human_profile,
             "intent": intent,
+            "market": market,
             "awaiting_human": self.state.current() == State.AWAIT_CONFIRMATION,
             "last_events": (
                 self.store.read_events(limit=5)
@@ -276,11 +617,48 @@ class Engine:
     # -------------------------------------------------
     # PERSISTÊNCIA
     # -------------------------------------------------
+    def _versions(self):
+        return (
+            self.state.version,
+            getattr(self.world, "version", None),
+            getattr(self.strategy, "version", None),
+            self.mode,
+        )
+
     def persist(self):
+        """
+        Entrega um snapshot ao persister somente se World, Strategy,
+        StateMachine ou o modo mudaram desde o último.
+        Componentes sem `version` são considerados sempre sujos.
+        """
+        versions = self._versions()
+        if versions == self._persisted_versions and None not in versions:
+            return
+
         snapshot = {
             "state": self.state.current().name,
             "world": self.world.export(),
             "strategy": self.strategy.export(),
             "mode": self.mode,
         }
-        self.store.save(snapshot)
+        self._persisted_versions = versions
+        self.persister.submit(snapshot)
+
+    def _checkpoint(self):
+        """
+        Grava o estado antes de mandar uma ordem, para um crash logo
+        depois não esquecer o que foi enviado. Em tempo simulado não
+        há corretora real: a gravação fica para o persister.
+        """
+        if not getattr(self.clock, "simulated", False):
+            self.flush()
+
+    def flush(self):
+        """
+        Grava imediatamente o estado atual.
+        Usado no boot, antes de chamadas ao broker e no desligamento.
+        """
+        if self.bus is not None:
+            self.bus.dispatch()
+        self.persist()
+        self.persister.flush()
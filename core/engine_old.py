@@ -1,3 +1,4 @@
+from core.reconcile import fetch_positions
 from core.state_machine import State, StateMachine
 
 
@@ -69,16 +70,21 @@ class Engine:
             self.mode = self.initial_mode
             print(f"🆕 Modo inicial aplicado: {self.mode}")
 
-        # Sincronização REAL
+        # Sincronização REAL (todas as posições numa chamada só)
         if self.mode == "REAL":
+            positions = fetch_positions(self.broker, self.world.symbols) or {}
+            synced = False
             for symbol in self.world.symbols:
-                pos = self.broker.get_open_position(symbol)
+                pos = positions.get(symbol)
                 if pos:
                     print(f"🔗 Posição real detectada em {symbol}. Sincronizando.")
-                    self.strategy.on_sync(symbol, pos["entry_price"])
-                    self.state.set(State.IN_POSITION)
-                    self.persist()
-                    return
+                    self.strategy.on_position_opened(symbol, pos["entry_price"])
+                    synced = True
+
+            if synced:
+                self.state.set(State.IN_POSITION)
+                self.persist()
+                return
 
         if self.state.current() == State.BOOT:
             self.state.set(State.IDLE)
@@ -0,0 +1,141 @@
+import threading
+
+
+class Cursor:
+    """Posição de leitura de um assinante no FeedHub."""
+
+    __slots__ = ("hub", "name", "seq", "read", "missed", "overruns")
+
+    def __init__(self, hub, name, seq):
+        self.hub = hub
+        self.name = name
+        self.seq = seq  # próximo número de sequência a ler
+
+        # Métricas
+        self.read = 0
+        self.missed = 0  # snapshots sobrescritos antes de serem lidos
+        self.overruns = 0  # vezes em que o anel passou por cima do cursor
+
+    def poll(self, limit: int | None = None) -> list[dict]:
+        """Snapshots novos, em ordem. Não bloqueia."""
+        return self.hub.read(self, limit)
+
+    def wait(self, timeout: float | None = None, limit: int | None = None):
+        """Como poll(), mas espera até haver algo novo (ou o prazo)."""
+        return self.hub.read(self, limit, timeout=timeout)
+
+    @property
+    def lag(self) -> int:
+        """Quantos snapshots publicados ainda não foram lidos."""
+        return self.hub.seq - self.seq
+
+    def stats(self) -> dict:
+        return {
+            "seq": self.seq,
+            "lag": self.lag,
+            "read": self.read,
+            "missed": self.missed,
+            "overruns": self.overruns,
+        }
+
+
+class FeedHub:
+    """
+    Distribuição de um único feed de mercado para vários consumidores.
+
+    - publish() grava o snapshot do broker.tick() uma vez, num anel de
+      `capacity` posições; não copia nem conhece os assinantes
+    - cada assinante lê pelo próprio Cursor (número de sequência):
+      recebe as mesmas referências, sem cópia por assinante — os
+      snapshots são somente leitura depois de publicados
+    - assinante atrasado é detectado pelo `lag`: acima de `lag_warn`
+      aparece em laggards(); se o anel der a volta por cima dele, os
+      snapshots perdidos são contados em `missed` e o cursor salta
+      para o mais antigo ainda disponível
+
+    A carga na corretora é a de um broker só, com qualquer número de
+    consumidores.
+    """
+
+    def __init__(self, capacity: int = 256, lag_warn: int | None = None):
+        self.capacity = capacity
+        self.lag_warn = lag_warn if lag_warn is not None else capacity // 2
+        self._ring = [None] * capacity
+        self.seq = 0  # próximo número de sequência a publicar
+        self.cursors: dict[str, Cursor] = {}
+        self._cond = threading.Condition()
+
+    # -------------------------------------------------
+    # PRODUTOR
+    # -------------------------------------------------
+    def publish(self, snapshot: dict) -> int:
+        """Grava o snapshot e acorda quem espera. Retorna sua sequência."""
+        with self._cond:
+            seq = self.seq
+            self._ring[seq % self.capacity] = snapshot
+            self.seq = seq + 1
+            self._cond.notify_all()
+        return seq
+
+    # -------------------------------------------------
+    # CONSUMIDORES
+    # -------------------------------------------------
+    def subscribe(self, name: str, backlog: int = 0) -> Cursor:
+        """
+        Novo cursor. Começa no próximo snapshot, ou `backlog` snapshots
+        antes (limitado ao que ainda está no anel).
+        """
+        with self._cond:
+            if name in self.cursors:
+                raise ValueError(f"Assinante já existe: {name}")
+            oldest = max(0, self.seq - self.capacity)
+            cursor = Cursor(self, name, max(oldest, self.seq - backlog))
+            self.cursors[name] = cursor
+        return cursor
+
+    def unsubscribe(self, cursor: Cursor):
+        with self._cond:
+            self.cursors.pop(cursor.name, None)
+
+    def read(self, cursor: Cursor, limit=None, timeout=None) -> list[dict]:
+        with self._cond:
+            if timeout is not None and cursor.seq >= self.seq:
+                self._cond.wait_for(lambda: cursor.seq < self.seq, timeout)
+
+            oldest = self.seq - self.capacity
+            if cursor.seq < oldest:
+                cursor.missed += oldest - cursor.seq
+                cursor.overruns += 1
+                print(
+                    f"⚠️ [FEED] {cursor.name} ficou {oldest - cursor.seq} "
+                    "snapshots para trás. Pulando para o mais antigo."
+                )
+                cursor.seq = oldest
+
+            end = self.seq
+            if limit is not None:
+                end = min(end, cursor.seq + limit)
+
+            ring, cap = self._ring, self.capacity
+            out = [ring[s % cap] for s in range(cursor.seq, end)]
+            cursor.read += len(out)
+            cursor.seq = end
+        return out
+
+    def latest(self) -> dict | None:
+        """Último snapshot publicado (sem mexer em cursor algum)."""
+        with self._cond:
+            return self._ring[(self.seq - 1) % self.capacity] if self.seq else None
+
+    def laggards(self) -> list[str]:
+        with self._cond:
+            return [c.name for c in self.cursors.values() if c.lag >= self.lag_warn]
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "published": self.seq,
+                "capacity": self.capacity,
+                "lag_warn": self.lag_warn,
+                "subscribers": {n: c.stats() for n, c in self.cursors.items()},
+            }
@@ -0,0 +1,250 @@
+import math
+from collections import deque
+
+
+class Indicator:
+    """
+    Indicador em streaming.
+
+    update() recebe uma amostra e atualiza `value` em O(1),
+    sem reler o histórico. `value` é None até o aquecimento.
+    """
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period deve ser >= 1")
+        self.period = period
+        self.value = None
+
+    def update(self, close: float, high: float, low: float):
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.window = deque()
+        self.total = 0.0
+
+    def update(self, close, high, low):
+        self.window.append(close)
+        self.total += close
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+
+        if len(self.window) == self.period:
+            self.value = self.total / self.period
+
+
+class EMA(Indicator):
+    """Semeada pela média simples dos primeiros `period` valores."""
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.alpha = 2.0 / (period + 1)
+        self.seed = []
+
+    def update(self, close, high, low):
+        if self.value is None:
+            self.seed.append(close)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = None
+            return
+
+        self.value += self.alpha * (close - self.value)
+
+
+class RollingStd(Indicator):
+    """
+    Desvio padrão populacional da janela (Welford com remoção):
+    média e soma dos quadrados dos desvios andam por diferenças, sem
+    o cancelamento de soma dos quadrados − média² em preços altos.
+    A cada RESYNC atualizações ambas são refeitas da janela, para o
+    arredondamento não se acumular em execuções longas.
+    """
+
+    RESYNC = 1024
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.window = deque()
+        self.mean = None
+        self.m2 = 0.0  # soma dos quadrados dos desvios à média
+        self._updates = 0
+
+    def update(self, close, high, low):
+        window = self.window
+        window.append(close)
+
+        if len(window) > self.period:
+            # Janela cheia: o mais antigo sai, o novo entra
+            old = window.popleft()
+            mean = self.mean + (close - old) / self.period
+            self.m2 += (close - old) * (close - mean + old - self.mean)
+            self.mean = mean
+        elif self.mean is None:
+            self.mean = close
+        else:
+            delta = close - self.mean
+            self.mean += delta / len(window)
+            self.m2 += delta * (close - self.mean)
+
+        self._updates += 1
+        if self._updates >= self.RESYNC:
+            self._updates = 0
+            self.mean = math.fsum(window) / len(window)
+            self.m2 = math.fsum((x - self.mean) ** 2 for x in window)
+
+        if len(window) == self.period:
+            variance = self.m2 / self.period
+            # Erro de arredondamento pode dar variância levemente negativa
+            self.value = math.sqrt(variance) if variance > 0 else 0.0
+
+
+class ZScore(Indicator):
+    """Distância do preço à média da janela, em desvios padrão."""
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.std = RollingStd(period)
+
+    def update(self, close, high, low):
+        self.std.update(close, high, low)
+        if self.std.value is None:
+            return
+        self.value = (close - self.std.mean) / self.std.value if self.std.value else 0.0
+
+
+class RSI(Indicator):
+    """RSI de Wilder."""
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.prev = None
+        self.samples = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close, high, low):
+        prev = self.prev
+        self.prev = close
+        if prev is None:
+            return
+
+        change = close - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        if self.samples < self.period:
+            # Aquecimento: média simples dos primeiros movimentos
+            self.samples += 1
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.samples < self.period:
+                return
+        else:
+            n = self.period
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+
+        if self.avg_loss == 0:
+            self.value = 100.0 if self.avg_gain > 0 else 50.0
+        else:
+            rs = self.avg_gain / self.avg_loss
+            self.value = 100.0 - 100.0 / (1.0 + rs)
+
+
+class ATR(Indicator):
+    """
+    ATR de Wilder. Sem high/low (só fechamento), o true range
+    vira a variação absoluta entre fechamentos.
+    """
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.prev = None
+        self.samples = 0
+        self.total = 0.0
+
+    def update(self, close, high, low):
+        prev = self.prev
+        self.prev = close
+        if prev is None:
+            return
+
+        tr = max(high - low, abs(high - prev), abs(low - prev))
+
+        if self.value is None:
+            self.samples += 1
+            self.total += tr
+            if self.samples == self.period:
+                self.value = self.total / self.period
+            return
+
+        self.value = (self.value * (self.period - 1) + tr) / self.period
+
+
+class RollingHigh(Indicator):
+    """Máxima da janela via deque monotônica (O(1) amortizado)."""
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.index = 0
+        self.candidates = deque()  # (índice, valor), valores decrescentes
+
+    def _better(self, new, old):
+        return new >= old
+
+    def _sample(self, close, high, low):
+        return high
+
+    def update(self, close, high, low):
+        sample = self._sample(close, high, low)
+        candidates = self.candidates
+
+        while candidates and self._better(sample, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self.index, sample))
+
+        if candidates[0][0] <= self.index - self.period:
+            candidates.popleft()
+
+        self.index += 1
+        if self.index >= self.period:
+            self.value = candidates[0][1]
+
+
+class RollingLow(RollingHigh):
+    """Mínima da janela via deque monotônica (O(1) amortizado)."""
+
+    def _better(self, new, old):
+        return new <= old
+
+    def _sample(self, close, high, low):
+        return low
+
+
+INDICATORS = {
+    "sma": SMA,
+    "ema": EMA,
+    "std": RollingStd,
+    "zscore": ZScore,
+    "rsi": RSI,
+    "atr": ATR,
+    "high": RollingHigh,
+    "low": RollingLow,
+}
+
+
+def indicator_label(name: str, period: int) -> str:
+    """Nome pelo qual o valor aparece no snapshot: ex. "ema_20"."""
+    return f"{name}_{period}"
+
+
+def create_indicator(name: str, period: int) -> Indicator:
+    try:
+        cls = INDICATORS[name]
+    except KeyError:
+        raise ValueError(f"Indicador desconhecido: {name}")
+    return cls(period)
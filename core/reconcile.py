@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import deque
+
+# Tipos de divergência
+UNTRACKED = "UNTRACKED"  # corretora tem posição que a estratégia não conhece
+VANISHED = "VANISHED"  # estratégia acha que está posicionada; corretora não
+
+
+def fetch_positions(broker, symbols) -> dict | None:
+    """
+    {símbolo: {"symbol", "entry_price", "qty"}} das posições abertas.
+
+    Uma chamada só quando o broker oferece get_open_positions();
+    senão, uma por símbolo via get_open_position(). None = falha
+    (não dá para afirmar que não há posição).
+    """
+    if hasattr(broker, "get_open_positions"):
+        return broker.get_open_positions()
+
+    positions = {}
+    for symbol in symbols:
+        pos = broker.get_open_position(symbol)
+        if pos:
+            positions[symbol] = pos
+    return positions
+
+
+class Reconciler:
+    """
+    Conciliação de posições: corretora × estratégia.
+
+    - busca todas as posições numa única chamada ao broker
+    - compara com `strategy.entries` através de um índice de símbolos
+      (só o universo configurado entra na comparação)
+    - roda periodicamente numa thread própria, fora do caminho do tick
+    - entrega ao Engine apenas as divergências, via drain()
+
+    Cada divergência carrega `state_version`: a versão da StateMachine
+    quando as posições foram lidas. Se o Engine mudou de estado desde
+    então (ordem executada no meio), a divergência é descartada — a
+    próxima rodada confirma ou não.
+    """
+
+    def __init__(self, broker, symbols: list[str], interval: float = 30.0):
+        self.broker = broker
+        self.index = frozenset(symbols)
+        self.interval = interval
+
+        self._view = None  # () -> (entries, state_version)
+        self._diffs = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Métricas
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration = None
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def attach(self, view):
+        """
+        `view()` retorna (entries, state_version) do Engine.
+        Chamado pelo próprio Engine.
+        """
+        self._view = view
+
+    def check(self) -> list[dict] | None:
+        """
+        Uma rodada de conciliação. Retorna as divergências encontradas
+        (também enfileiradas para drain()), ou None se a corretora não
+        respondeu.
+        """
+        if self._view is None:
+            return None
+
+        entries, version = self._view()
+        started = time.monotonic()
+
+        try:
+            positions = fetch_positions(self.broker, sorted(self.index))
+        except Exception as e:
+            print(f"[RECONCILE] Erro ao buscar posições: {e}")
+            positions = None
+
+        self.runs += 1
+        self.last_run = time.time()
+        self.last_duration = time.monotonic() - started
+
+        if positions is None:
+            self.failures += 1
+            return None
+
+        diffs = self.diff(positions, entries, version)
+        if diffs:
+            with self._lock:
+                self._diffs.extend(diffs)
+        return diffs
+
+    def diff(self, positions: dict, entries: dict, version=None) -> list[dict]:
+        index = self.index
+        diffs = []
+
+        for symbol, pos in positions.items():
+            if symbol in index and symbol not in entries:
+                diffs.append(
+                    {
+                        "kind": UNTRACKED,
+                        "symbol": symbol,
+                        "entry_price": pos.get("entry_price"),
+                        "qty": pos.get("qty"),
+                        "state_version": version,
+                    }
+                )
+
+        for symbol in entries:
+            if symbol in index and symbol not in positions:
+                diffs.append(
+                    {
+                        "kind": VANISHED,
+                        "symbol": symbol,
+                        "entry_price": entries[symbol],
+                        "state_version": version,
+                    }
+                )
+
+        return diffs
+
+    def drain(self) -> list[dict]:
+        """Divergências pendentes (esvazia a fila). Não bloqueia."""
+        if not self._diffs:
+            return []
+        with self._lock:
+            diffs = list(self._diffs)
+            self._diffs.clear()
+        return diffs
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="reconciler", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_duration_ms": (
+                round(self.last_duration * 1000, 1)
+                if self.last_duration is not None
+                else None
+            ),
+            "pending": len(self._diffs),
+        }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -1,6 +1,5 @@
+from core.clock import WallClock
 from core.state_machine import State
-from datetime import date
-import time
 
 
 class RiskManager:
@@ -9,17 +8,22 @@ class RiskManager:
     O comportamento é definido pelo perfil/config.
     """
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, clock=None):
         self.config = config
+        self.clock = clock or WallClock()
         self.cooldown_until = 0
 
-        self.today = date.today()
+        self.today = self.clock.today()
         self.trades_today = 0
         self.daily_pnl = 0.0
 
+        # Posições abertas aprovadas por este gestor
+        self.open_positions = config.get("_open_positions", 0)
+
     def reset_if_new_day(self):
-        if date.today() != self.today:
-            self.today = date.today()
+        today = self.clock.today()
+        if today != self.today:
+            self.today = today
             self.trades_today = 0
             self.daily_pnl = 0.0
 
@@ -34,7 +38,7 @@ class RiskManager:
 
         self.reset_if_new_day()
 
-        now = time.time()
+        now = self.clock.time()
 
         # Cooldown ativo
         if now < self.cooldown_until:
@@ -46,9 +50,13 @@ class RiskManager:
         # Limite de posições simultâneas
         max_pos = self.config.get("max_parallel_positions", 1)
 
+        # Preço velho não abre posição (saídas continuam permitidas)
+        if kind == "BUY" and action.get("stale"):
+            print("📉 [RISK] Dados de mercado defasados.")
+            return False
+
         if kind == "BUY":
-            open_positions = self.config.get("_open_positions", 0)
-            if open_positions >= max_pos:
+            if self.open_positions >= max_pos:
                 print("🚫 [RISK] Limite de posições atingido.")
                 return False
 
@@ -77,6 +85,24 @@ class RiskManager:
         Atualiza métricas de segurança.
         """
         self.trades_today += 1
+        if action.get("type") == "BUY":
+            self.open_positions += 1
+
+        pnl = action.get("pnl")
+        if pnl is not None:
+            self.daily_pnl += pnl
+
+    def on_restored(self, count: int):
+        """
+        Chamado pelo Engine no boot com as posições que ele restaurou.
+        """
+        self.open_positions += count
+
+    def on_position_closed(self, action: dict):
+        """
+        Chamado pelo Engine após uma venda executada.
+        """
+        self.open_positions = max(0, self.open_positions - 1)
 
         pnl = action.get("pnl")
         if pnl is not None:
@@ -89,4 +115,4 @@ class RiskManager:
         if result == "LOSS":
             cooldown = self.config.get("cooldown_after_loss", 0)
             if cooldown > 0:
-                self.cooldown_until = time.time() + cooldown
+                self.cooldown_until = self.clock.time() + cooldown
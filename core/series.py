@@ -0,0 +1,102 @@
+from array import array
+
+
+class PriceSeries:
+    """
+    Histórico de preços de um símbolo em buffer circular colunar.
+
+    Cada coluna (ts, close e, opcionalmente, open/high/low/volume) é um
+    array('d') de tamanho fixo 2 × capacity: toda escrita vai para a
+    posição i e para o espelho i + capacity. Assim as últimas N amostras
+    estão sempre contíguas na memória e window() devolve uma memoryview
+    sem copiar nada.
+
+    append() é O(1) e não aloca.
+    """
+
+    __slots__ = ("capacity", "fields", "count", "_pos", "_cols", "_ts", "_close")
+
+    BASE_FIELDS = ("ts", "close")
+    OHLCV_FIELDS = ("open", "high", "low", "volume")
+
+    def __init__(self, capacity: int = 512, ohlcv: bool = False):
+        if capacity < 1:
+            raise ValueError("capacity deve ser >= 1")
+
+        self.capacity = capacity
+        self.fields = self.BASE_FIELDS + (self.OHLCV_FIELDS if ohlcv else ())
+        self.count = 0  # total de amostras já recebidas
+        self._pos = 0  # próxima posição de escrita (0..capacity-1)
+        self._cols = {f: array("d", [0.0]) * (2 * capacity) for f in self.fields}
+        self._ts = self._cols["ts"]
+        self._close = self._cols["close"]
+
+    # -------------------------------------------------
+    # ESCRITA
+    # -------------------------------------------------
+    def append(self, ts: float, close: float, **bar):
+        """
+        Registra uma amostra. Campos OHLCV ausentes assumem o close
+        (volume assume 0).
+        """
+        pos = self._pos
+        mirror = pos + self.capacity
+
+        self._ts[pos] = self._ts[mirror] = ts
+        self._close[pos] = self._close[mirror] = close
+
+        if len(self.fields) > 2:
+            for field in self.OHLCV_FIELDS:
+                value = bar.get(field)
+                if value is None:
+                    value = 0.0 if field == "volume" else close
+                col = self._cols[field]
+                col[pos] = col[mirror] = value
+
+        self._pos = (pos + 1) % self.capacity
+        self.count += 1
+
+    # -------------------------------------------------
+    # LEITURA
+    # -------------------------------------------------
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def window(self, n: int | None = None, field: str = "close") -> memoryview:
+        """
+        As últimas `n` amostras (todas, se None), da mais antiga para a
+        mais recente. Visão direta do buffer: válida até o próximo
+        append(); use .tolist() para guardar.
+        """
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        end = self._pos + self.capacity
+        return memoryview(self._cols[field])[end - n : end]
+
+    def last(self, field: str = "close") -> float | None:
+        if not self.count:
+            return None
+        return self._cols[field][self._pos + self.capacity - 1]
+
+    # -------------------------------------------------
+    # PERSISTÊNCIA
+    # -------------------------------------------------
+    def export(self, n: int | None = None) -> dict:
+        """
+        Cauda compacta: uma cópia array('d') por coluna.
+        A cópia é um memcpy, barata o bastante para rodar a cada tick;
+        a conversão para lista fica para quem serializa.
+        """
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        end = self._pos + self.capacity
+        return {field: col[end - n : end] for field, col in self._cols.items()}
+
+    def import_state(self, data: dict):
+        ts = data.get("ts", [])
+        close = data.get("close", [])
+        extra = {f: data.get(f, []) for f in self.OHLCV_FIELDS if f in self.fields}
+
+        for i in range(min(len(ts), len(close))):
+            bar = {f: col[i] for f, col in extra.items() if i < len(col)}
+            self.append(ts[i], close[i], **bar)
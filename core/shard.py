@@ -0,0 +1,395 @@
+import multiprocessing
+import threading
+import time
+import zlib
+from multiprocessing.connection import wait
+
+from core.state_machine import State
+
+# -------------------------------------------------
+# PARTIÇÃO
+# -------------------------------------------------
+
+
+def shard_of(symbol: str, shards: int) -> int:
+    """Shard do símbolo. Estável entre execuções (não usa hash())."""
+    return zlib.crc32(symbol.encode("utf-8")) % shards
+
+
+def partition(symbols, shards: int) -> list[list[str]]:
+    parts = [[] for _ in range(shards)]
+    for symbol in symbols:
+        parts[shard_of(symbol, shards)].append(symbol)
+    return parts
+
+
+def split_snapshot(snapshot: dict, index: dict, shards: int) -> list[dict]:
+    """
+    Um snapshot do broker -> um por shard.
+
+    Preços vão para o shard do símbolo. Metadados ("_...") indexados
+    por símbolo (ex.: "_freshness", "_bars") são divididos do mesmo
+    jeito; os demais (ex.: "_event") vão para todos.
+    """
+    parts = [{} for _ in range(shards)]
+
+    for key, value in snapshot.items():
+        shard = index.get(key)
+        if shard is not None:
+            parts[shard][key] = value
+            continue
+
+        if key[:1] != "_":
+            continue
+
+        if isinstance(value, dict) and value and all(k in index for k in value):
+            for symbol, item in value.items():
+                parts[index[symbol]].setdefault(key, {})[symbol] = item
+        else:
+            for part in parts:
+                part[key] = value
+
+    return parts
+
+
+# -------------------------------------------------
+# RISCO REMOTO
+# -------------------------------------------------
+
+
+class RemoteRisk:
+    """
+    RiskManager visto de um worker: mesma interface que o Engine usa,
+    mas quem decide é o RiskCoordinator, no processo coordenador.
+
+    allow() espera a resposta (ida e volta num Pipe local); as
+    notificações (on_executed, on_failed, on_position_closed,
+    on_trade_result, on_restored) seguem sem esperar — a ordem no
+    canal garante que chegam antes do próximo allow() deste worker.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def allow(self, state: State, action: dict) -> bool:
+        self.conn.send(("allow", state.name, _slim(action)))
+        return self.conn.recv()
+
+    def on_executed(self, action: dict):
+        self.conn.send(("executed", _slim(action)))
+
+    def on_failed(self, action: dict):
+        self.conn.send(("failed", _slim(action)))
+
+    def on_position_closed(self, action: dict):
+        self.conn.send(("closed", _slim(action)))
+
+    def on_restored(self, count: int):
+        self.conn.send(("restored", count))
+
+    def on_trade_result(self, result: str):
+        self.conn.send(("result", result))
+
+
+def _slim(action):
+    """Só o que o RiskManager lê (menos bytes no canal)."""
+    if action is None:
+        return None
+    return {k: action[k] for k in ("type", "symbol", "stale", "pnl") if k in action}
+
+
+class RiskCoordinator:
+    """
+    Dono dos contadores globais de risco (trades_today, daily_pnl,
+    posições abertas) para todos os workers.
+
+    Atende os pedidos numa thread única: cada allow() é avaliado e
+    contabilizado sem corrida com os outros workers.
+
+    BUY aprovado já ocupa uma vaga de posição (reserva do worker) até
+    a execução. A reserva é devolvida quando o worker avisa a falha
+    (on_failed: ordem recusada, cancelamento humano), quando volta a
+    pedir sem ter executado, quando o worker morre, ou após
+    `reserve_timeout` segundos sem notícia. Cada Engine tem no máximo
+    uma ação pendente, então basta uma reserva por worker.
+
+    No boot, cada worker informa as posições restauradas
+    (on_restored), que entram na contagem global.
+    """
+
+    def __init__(self, risk, reserve_timeout: float = 300.0):
+        self.risk = risk
+        self.reserve_timeout = reserve_timeout
+        self._conns = {}  # conn -> worker
+        self._reserved = {}  # worker -> quando o BUY foi aprovado
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Métricas
+        self.requests = 0
+        self.approved = 0
+        self.denied = 0
+
+    def attach(self, worker: int, conn):
+        self._conns[conn] = worker
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="risk-coordinator", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "approved": self.approved,
+            "denied": self.denied,
+            "open_positions": self.risk.open_positions,
+            "reserved": len(self._reserved),
+            "trades_today": self.risk.trades_today,
+            "daily_pnl": self.risk.daily_pnl,
+        }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set() and self._conns:
+            for conn in wait(list(self._conns), timeout=0.5):
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self._release(self._conns.pop(conn))
+                    continue
+                self._handle(self._conns[conn], conn, message)
+            self._expire()
+
+    def _handle(self, worker, conn, message):
+        kind = message[0]
+        risk = self.risk
+
+        if kind == "allow":
+            self.requests += 1
+            self._release(worker)
+
+            action = message[2]
+            allowed = risk.allow(State[message[1]], action)
+            if allowed and action and action.get("type") == "BUY":
+                self._reserved[worker] = time.monotonic()
+                risk.open_positions += 1
+
+            if allowed:
+                self.approved += 1
+            else:
+                self.denied += 1
+            conn.send(allowed)
+
+        elif kind == "executed":
+            if self._reserved.pop(worker, None) is not None:
+                # A reserva vira a posição contada por on_executed()
+                risk.open_positions -= 1
+            risk.on_executed(message[1])
+
+        elif kind == "failed":
+            self._release(worker)
+
+        elif kind == "restored":
+            risk.on_restored(message[1])
+
+        elif kind == "closed":
+            risk.on_position_closed(message[1])
+
+        elif kind == "result":
+            risk.on_trade_result(message[1])
+
+    def _release(self, worker):
+        if self._reserved.pop(worker, None) is not None:
+            self.risk.open_positions -= 1
+
+    def _expire(self):
+        limit = time.monotonic() - self.reserve_timeout
+        for worker, since in list(self._reserved.items()):
+            if since < limit:
+                print(f"⌛ [RISK] Reserva do shard {worker} expirou. Liberando vaga.")
+                self._release(worker)
+
+
+# -------------------------------------------------
+# WORKERS
+# -------------------------------------------------
+
+
+def worker_main(shard: int, symbols, build, feed_conn, risk_conn):
+    """
+    Processo worker: um Engine completo (World, estratégia, estado)
+    só com os símbolos do shard. `build(shard, symbols, risk)` monta
+    o Engine — precisa ser função de módulo (vai por pickle).
+    """
+    engine = build(shard, symbols, RemoteRisk(risk_conn))
+    engine.boot()
+    broker = engine.broker
+
+    while True:
+        item = feed_conn.recv()
+        if item is None:
+            break
+
+        seq, snapshot = item
+        if hasattr(broker, "poll_orders"):
+            broker.poll_orders()
+        try:
+            engine.step(snapshot)
+        except Exception as e:
+            print(f"❌ [SHARD {shard}] Erro no step: {e}")
+
+        feed_conn.send(seq)
+
+    engine.flush()
+
+
+class ShardedRuntime:
+    """
+    Universo de símbolos dividido entre processos.
+
+    - cada worker roda o próprio Engine (World, estratégia, estado e
+      store) sobre um shard fixo de símbolos (crc32 do nome)
+    - o coordenador faz um tick só na corretora, divide o snapshot e
+      manda a fatia de cada worker pelo Pipe dele
+    - risco global fica no coordenador (RiskCoordinator); os workers
+      usam RemoteRisk
+
+    Cada worker pode ter até `max_inflight` snapshots sem confirmação;
+    acima disso publish() espera por ele (contrapressão em vez de fila
+    crescendo). `lag` por worker aparece em stats().
+    """
+
+    def __init__(
+        self,
+        symbols,
+        build,
+        risk,
+        workers: int | None = None,
+        max_inflight: int = 4,
+        start_method: str = "spawn",
+        reserve_timeout: float = 300.0,
+    ):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.shards = partition(symbols, self.workers)
+        self.index = {s: i for i, part in enumerate(self.shards) for s in part}
+        self.build = build
+        self.max_inflight = max_inflight
+        self.coordinator = RiskCoordinator(risk, reserve_timeout)
+
+        self._ctx = multiprocessing.get_context(start_method)
+        self._procs = []
+        self._feeds = []
+        self._sent = [0] * self.workers
+        self._acked = [0] * self.workers
+        self._seq = 0
+
+        # Métricas
+        self.published = 0
+        self.waits = 0  # vezes em que publish() esperou um worker
+        self.publish_seconds = 0.0
+
+    def start(self):
+        for shard, symbols in enumerate(self.shards):
+            feed_parent, feed_child = self._ctx.Pipe()
+            risk_parent, risk_child = self._ctx.Pipe()
+
+            proc = self._ctx.Process(
+                target=worker_main,
+                args=(shard, symbols, self.build, feed_child, risk_child),
+                name=f"shard-{shard}",
+                daemon=True,
+            )
+            proc.start()
+            feed_child.close()
+            risk_child.close()
+
+            self._procs.append(proc)
+            self._feeds.append(feed_parent)
+            self.coordinator.attach(shard, risk_parent)
+
+            print(f"🧩 [SHARD {shard}] {len(symbols)} símbolos (pid {proc.pid})")
+
+        self.coordinator.start()
+        return self
+
+    def publish(self, snapshot: dict):
+        started = time.perf_counter()
+        self._seq += 1
+        parts = split_snapshot(snapshot, self.index, self.workers)
+
+        for shard, conn in enumerate(self._feeds):
+            self._collect(shard, block=False)
+            while self._sent[shard] - self._acked[shard] >= self.max_inflight:
+                self.waits += 1
+                self._collect(shard, block=True)
+
+            conn.send((self._seq, parts[shard]))
+            self._sent[shard] += 1
+
+        self.published += 1
+        self.publish_seconds += time.perf_counter() - started
+
+    def drain(self, timeout: float = 30.0):
+        """Espera os workers processarem tudo o que foi publicado."""
+        deadline = time.monotonic() + timeout
+        for shard in range(self.workers):
+            while self._acked[shard] < self._sent[shard]:
+                if time.monotonic() >= deadline:
+                    return False
+                self._collect(shard, block=True)
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        for conn in self._feeds:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for proc in self._procs:
+            proc.join(timeout)
+        self.coordinator.stop()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "published": self.published,
+            "waits": self.waits,
+            "publish_ms": (
+                round(self.publish_seconds / self.published * 1000, 3)
+                if self.published
+                else None
+            ),
+            "shards": [
+                {
+                    "symbols": len(self.shards[i]),
+                    "processed": self._acked[i],
+                    "lag": self._sent[i] - self._acked[i],
+                    "alive": self._procs[i].is_alive() if self._procs else False,
+                }
+                for i in range(self.workers)
+            ],
+            "risk": self.coordinator.stats(),
+        }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _collect(self, shard, block):
+        """Lê as confirmações (seq processado) do worker."""
+        conn = self._feeds[shard]
+        if block and not conn.poll(1.0):
+            if not self._procs[shard].is_alive():
+                raise RuntimeError(f"Worker do shard {shard} morreu")
+            return
+        while conn.poll():
+            conn.recv()
+            self._acked[shard] += 1
@@ -19,6 +19,7 @@ class StateMachine:
 
     def __init__(self):
         self._state = State.BOOT
+        self.version = 0  # incrementa a cada transição
 
     def current(self) -> State:
         return self._state
@@ -28,6 +29,8 @@ class StateMachine:
             raise ValueError("Estado inválido")
 
         print(f"🔁 STATE: {self._state.name} → {new_state.name}")
+        if new_state != self._state:
+            self.version += 1
         self._state = new_state
 
     # ---------- Persistência ----------
@@ -42,3 +45,4 @@ class StateMachine:
 
         if name:
             self._state = State[name]
+            self.version += 1
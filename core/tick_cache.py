@@ -0,0 +1,64 @@
+import threading
+from types import MappingProxyType
+
+
+def freeze(value):
+    """
+    Converte dicts/listas em estruturas somente-leitura
+    (MappingProxyType / tuple), para que vários leitores
+    possam compartilhar o mesmo resultado com segurança.
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class TickCache:
+    """
+    Cache versionado por tick.
+
+    Cada chave guarda (versão, valor). Enquanto a versão informada
+    pelo chamador for a mesma, o valor é reaproveitado; quando muda
+    (novo tick, novo evento), é recalculado uma única vez.
+
+    Os valores são congelados: Engine, Panel e API recebem
+    exatamente o mesmo objeto imutável.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.RLock()
+
+        self.hits = {}
+        self.recomputes = {}
+
+    def get(self, key: str, version, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits[key] = self.hits.get(key, 0) + 1
+                return entry[1]
+
+            value = freeze(compute())
+            self._entries[key] = (version, value)
+            self.recomputes[key] = self.recomputes.get(key, 0) + 1
+            return value
+
+    def invalidate(self, key: str | None = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        keys = sorted(set(self.hits) | set(self.recomputes))
+        return {
+            k: {
+                "hits": self.hits.get(k, 0),
+                "recomputes": self.recomputes.get(k, 0),
+            }
+            for k in keys
+        }
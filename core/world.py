@@ -1,13 +1,78 @@
+from core.clock import WallClock
+from core.indicators import create_indicator, indicator_label
+from core.series import PriceSeries
+
+
 class World:
     """
     Representa o mundo observado pelo robô.
-    Mantém preços por símbolo.
+    Mantém o último preço, um histórico circular e os indicadores
+    registrados por símbolo.
     """
 
-    def __init__(self, symbols, store):
+    def __init__(
+        self,
+        symbols,
+        store,
+        history: int = 512,
+        ohlcv: bool = False,
+        persist_history: int = 128,
+        max_age: float | None = 10.0,
+        clock=None,
+    ):
         self.symbols = symbols
         self.store = store
+        self.clock = clock or WallClock()
         self.prices = {s: None for s in symbols}
+        self.series = {s: PriceSeries(history, ohlcv) for s in symbols}
+        self.persist_history = persist_history
+        self.version = 0  # incrementa quando preço ou histórico mudam
+        self.changed = {}.keys()  # símbolos alterados no último update
+        self.meta = {}  # metadados do último tick ("_event", ...)
+
+        # Idade (s) de cada preço, quando o broker informa "_freshness".
+        # Acima de max_age o dado é considerado defasado.
+        self.freshness = {}
+        self.max_age = max_age
+
+        # Indicadores em streaming: um por (nome, período) e símbolo,
+        # compartilhados por quem os registrar.
+        self.indicators = {s: {} for s in symbols}
+        self.indicator_values = {s: {} for s in symbols}
+
+    # ---------- Indicadores ----------
+
+    def register(self, name: str, period: int) -> str:
+        """
+        Registra um indicador para todos os símbolos e devolve o rótulo
+        pelo qual ele aparece em snapshot()["indicators"][symbol].
+        Registrar de novo o mesmo (nome, período) não duplica cálculo.
+        O indicador novo é aquecido com o histórico já disponível.
+        """
+        label = indicator_label(name, period)
+
+        for symbol, registered in self.indicators.items():
+            if label in registered:
+                continue
+
+            indicator = create_indicator(name, period)
+            series = self.series[symbol]
+            close = series.window(field="close")
+            high = series.window(field="high") if "high" in series.fields else close
+            low = series.window(field="low") if "low" in series.fields else close
+            for i in range(len(close)):
+                indicator.update(close[i], high[i], low[i])
+
+            registered[label] = indicator
+            self.indicator_values[symbol][label] = indicator.value
+
+        return label
+
+    def _update_indicators(self, symbol, close, high, low):
+        values = self.indicator_values[symbol]
+        for label, indicator in self.indicators[symbol].items():
+            indicator.update(close, high, low)
+            values[label] = indicator.value
 
     def update(self, feed: dict):
         """
@@ -16,20 +81,138 @@ class World:
             "ETHUSDT": 2310.2,
             ...
         }
+
+        Valores também podem ser dicts com "price" (e, opcionalmente,
+        "ts", "open", "high", "low", "volume").
+        Chaves com "_" (ex.: "_event") são metadados do tick e valem
+        só até o próximo update.
+
+        Cada tick (ou candle) vira amostra no histórico e nos
+        indicadores, mesmo com o preço repetido: os períodos contam
+        amostras, não mudanças. Só um candle reenviado igual (mesmo
+        "ts") é ignorado.
+
+        Retorna os símbolos cujo valor mudou (também em self.changed),
+        na ordem do feed: é o que a decisão precisa reavaliar.
+        """
+        changed = {}
+        meta = {}
+        now = None
+        sampled = False
+        prices = self.prices
+
+        for symbol, value in feed.items():
+            if symbol not in prices:
+                if symbol[:1] == "_":
+                    meta[symbol] = value
+                continue
+
+            same = prices[symbol] == value
+            if not same:
+                prices[symbol] = value
+                changed[symbol] = None
+            series = self.series[symbol]
+
+            if value.__class__ is float or value.__class__ is int:
+                if now is None:
+                    now = self.clock.time()
+                series.append(now, value)
+                self._update_indicators(symbol, value, value, value)
+                sampled = True
+                continue
+
+            if not isinstance(value, dict):
+                continue
+
+            price = value.get("price")
+            if not isinstance(price, (int, float)):
+                continue
+
+            ts = value.get("ts")
+            if same and ts is not None:
+                continue  # o mesmo candle de novo
+            if ts is None:
+                if now is None:
+                    now = self.clock.time()
+                ts = now
+
+            high = value.get("high")
+            low = value.get("low")
+            series.append(
+                ts,
+                price,
+                open=value.get("open"),
+                high=high,
+                low=low,
+                volume=value.get("volume"),
+            )
+            self._update_indicators(
+                symbol,
+                price,
+                price if high is None else high,
+                price if low is None else low,
+            )
+            sampled = True
+
+        if sampled:
+            self.version += 1
+
+        # dict como conjunto ordenado: keys() aceita &, |, in, len
+        self.changed = changed.keys()
+        self.meta = meta
+        if "_freshness" in meta:
+            self.freshness = meta["_freshness"]
+        return self.changed
+
+    # ---------- Defasagem ----------
+
+    def age(self, symbol: str) -> float | None:
+        return self.freshness.get(symbol)
+
+    def is_stale(self, symbol: str) -> bool:
+        """
+        Preço velho demais para abrir posição. Brokers que não informam
+        "_freshness" (virtual, histórico) nunca ficam defasados.
         """
-        for symbol, price in feed.items():
-            if symbol in self.prices:
-                self.prices[symbol] = price
+        if not self.freshness or self.max_age is None:
+            return False
+        age = self.freshness.get(symbol)
+        return age is None or age > self.max_age
+
+    def stale_symbols(self) -> list[str]:
+        return [s for s in self.symbols if self.is_stale(s)]
+
+    @property
+    def degraded(self) -> bool:
+        """Todo o mercado defasado: não adianta nem decidir entradas."""
+        return bool(self.freshness) and len(self.stale_symbols()) == len(self.symbols)
+
+    def window(self, symbol: str, n: int | None = None, field: str = "close"):
+        """Últimas n amostras de um símbolo (memoryview, sem cópia)."""
+        return self.series[symbol].window(n, field)
 
     def snapshot(self) -> dict:
-        return {"prices": dict(self.prices)}
+        snapshot = {
+            "prices": dict(self.prices),
+            "history": self.series,
+            "indicators": self.indicator_values,
+            "changed": self.changed,
+            "freshness": self.freshness,
+        }
+        snapshot.update(self.meta)
+        return snapshot
 
     # ---------- Persistência ----------
 
     def export(self) -> dict:
-        return {
-            "prices": dict(self.prices),
-        }
+        data = {"prices": dict(self.prices)}
+        if self.persist_history:
+            data["history"] = {
+                s: series.export(self.persist_history)
+                for s, series in self.series.items()
+                if series.count
+            }
+        return data
 
     def import_state(self, data: dict):
         if not data:
@@ -38,3 +221,18 @@ class World:
         for s, p in prices.items():
             if s in self.prices:
                 self.prices[s] = p
+
+        history = data.get("history", {})
+        for s, columns in history.items():
+            if s in self.series and isinstance(columns, dict):
+                self.series[s].import_state(columns)
+
+                # Indicadores já registrados reaquecem com o histórico
+                ts = columns.get("ts", [])
+                close = columns.get("close", [])
+                high = columns.get("high") or close
+                low = columns.get("low") or close
+                for i in range(min(len(ts), len(close))):
+                    self._update_indicators(s, close[i], high[i], low[i])
+
+        self.version += 1
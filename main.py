@@ -4,6 +4,7 @@ import json
 
 
 from core.engine import Engine
+from core.reconcile import Reconciler
 from core.risk import RiskManager
 from core.world import World
 from core.profiles.registry import load_profile
@@ -12,6 +13,7 @@ from strategies.canonical.registry import load_strategy
 from tools.feedback import FeedbackEngine
 from tools.memory import CognitiveMemory
 from tools.panel import Panel
+from tools.tracing import Tracer
 
 
 from adapters.virtual import VirtualBroker
@@ -29,7 +31,7 @@ def main():
     memory = CognitiveMemory("storage/memory.json")
 
     feedback = FeedbackEngine(
-        events_path="storage/events.jsonl",
+        events_path="storage/events",
         memory_path="storage/memory.json",
         journal_path="storage/journal.jsonl",
     )
@@ -52,22 +54,44 @@ def main():
         "store_path": "storage/state.json",
         "armed": True,
         "strategy": "simple_trend",
+        "persist_max_staleness": 2.0,
+        "tracing": True,
+        "market_stream": True,  # Bybit: WebSocket em vez de REST por tick
+        "timeframes": ("5m", "4h"),  # barras locais a partir dos ticks
+        "reconcile_interval": 30,  # segundos entre conciliações de posição
     }
 
     profile = load_profile(config["profile"])
     config = profile.apply(config)
 
+    reconciler = None
     if MODE == "VIRTUAL":
         broker = VirtualBroker(config["symbols"])
     elif MODE in ("REAL", "ASSISTED"):
-        broker = BybitBroker(config["symbols"], mode="REAL", armed=config["armed"])
+        broker = BybitBroker(
+            config["symbols"],
+            mode="REAL",
+            armed=config["armed"],
+            stream=config["market_stream"],
+            timeframes=config["timeframes"],
+        )
+        reconciler = Reconciler(
+            broker, config["symbols"], interval=config["reconcile_interval"]
+        )
     else:
-        broker = BybitBroker(config["symbols"], mode="OBSERVADOR", armed=False)
+        broker = BybitBroker(
+            config["symbols"],
+            mode="OBSERVADOR",
+            armed=False,
+            stream=config["market_stream"],
+            timeframes=config["timeframes"],
+        )
 
     store = JSONStore(config["store_path"])
     world = World(config["symbols"], store)
     strategy = load_strategy(config["strategy"], config)
     risk = RiskManager(config)
+    tracer = Tracer(enabled=config["tracing"])
     # NÃO recriar feedback aqui
 
     engine = Engine(
@@ -78,9 +102,14 @@ def main():
         store=store,
         feedback=feedback,
         mode=MODE,
+        max_staleness=config["persist_max_staleness"],
+        tracer=tracer,
+        reconciler=reconciler,
     )
 
     engine.boot()
+    if reconciler:
+        reconciler.start()
     from tools import web
 
     web.engine_ref = engine
@@ -97,14 +126,19 @@ def main():
 
     while True:
         try:
-            feed = broker.tick()
+            with tracer.span("broker.tick"):
+                feed = broker.tick()
+
             engine.step(feed)
-            panel.render()
+
+            with tracer.span("panel.render"):
+                panel.render()
 
             time.sleep(config["sleep"])
 
         except KeyboardInterrupt:
             print("\n⏹ Execução interrompida.")
+            engine.flush()
             break
 
 
@@ -0,0 +1,451 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class EventLog:
+    """
+    Log de eventos append-only, dividido em segmentos de tamanho fixo.
+
+    Layout em disco:
+        <directory>/000001.jsonl
+        <directory>/000002.jsonl
+        ...
+        <directory>/index.json   (índice esparso dos segmentos)
+
+    O índice guarda, por segmento, o primeiro/último offset (número
+    sequencial global do evento) e o primeiro/último timestamp.
+    Ele só é regravado quando um segmento é fechado; o segmento ativo
+    é reconstituído relendo apenas ele na abertura.
+
+    Leitura:
+    - tail(n): últimos n eventos, lendo do fim do segmento para trás
+    - since(ts): eventos com ts >= ts, a partir do segmento certo
+    - iter(): todos os eventos, em streaming
+    - follow(cursor): eventos novos desde um cursor (segmento, byte)
+
+    Um único escritor por diretório. Leitores (painel, métricas)
+    abrem com readonly=True: não criam o diretório, não releem o
+    segmento ativo, nunca gravam o index.json e não podem acrescentar
+    eventos. Um leitor pode (e deve) ser reaproveitado:
+    tail()/iter()/follow() sempre olham o disco; o índice lido na
+    abertura só serve para since() pular segmentos antigos.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 4 * 1024 * 1024,
+        readonly: bool = False,
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self.readonly = readonly
+
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._fh = None
+        self.segments = self._load_index()
+
+    # -------------------------------------------------
+    # ÍNDICE
+    # -------------------------------------------------
+    def _segment_path(self, seg_id: int) -> str:
+        return os.path.join(self.directory, f"{seg_id:06d}.jsonl")
+
+    def _segment_ids_on_disk(self) -> list[int]:
+        if not os.path.isdir(self.directory):
+            return []
+        ids = []
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext == ".jsonl" and stem.isdigit():
+                ids.append(int(stem))
+        return sorted(ids)
+
+    def _scan_segment(self, seg_id: int, first: int) -> dict:
+        seg = {
+            "id": seg_id,
+            "first": first,
+            "last": first - 1,
+            "first_ts": None,
+            "last_ts": None,
+            "bytes": 0,
+        }
+
+        path = self._segment_path(seg_id)
+        if not os.path.exists(path):
+            return seg
+
+        with open(path, "rb") as f:
+            for raw in f:
+                seg["bytes"] += len(raw)
+                try:
+                    event = json.loads(raw)
+                except Exception:
+                    continue
+                self._observe(seg, event)
+
+        return seg
+
+    def _load_index(self) -> list[dict]:
+        segments = []
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                segments = json.load(f).get("segments", [])
+        except Exception:
+            segments = []
+
+        on_disk = self._segment_ids_on_disk()
+        known = {s["id"] for s in segments}
+
+        if self.readonly:
+            # Leitor: só o que o escritor já indexou (segmentos
+            # fechados); nada é relido nem regravado
+            if any(i not in known for i in on_disk[:-1]):
+                return []
+            active_id = on_disk[-1] if on_disk else None
+            return [s for s in segments if active_id is None or s["id"] < active_id]
+
+        # Índice ausente/desatualizado → reconstrói a partir dos arquivos
+        if any(i not in known for i in on_disk[:-1]):
+            segments = []
+            first = 0
+            for seg_id in on_disk:
+                seg = self._scan_segment(seg_id, first)
+                segments.append(seg)
+                first = seg["last"] + 1
+            if not self.readonly:
+                self._write_index(segments)
+            return segments
+
+        # O segmento ativo é sempre relido (é limitado por segment_bytes)
+        if on_disk:
+            active_id = on_disk[-1]
+            segments = [s for s in segments if s["id"] < active_id]
+            first = segments[-1]["last"] + 1 if segments else 0
+            segments.append(self._scan_segment(active_id, first))
+
+        return segments
+
+    def _write_index(self, segments: list[dict]):
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "segments": segments}, f)
+        os.replace(tmp, self.index_path)
+
+    @staticmethod
+    def _event_ts(event) -> float | None:
+        ts = event.get("ts") if isinstance(event, dict) else None
+        return ts if isinstance(ts, (int, float)) else None
+
+    def _observe(self, seg: dict, event):
+        seg["last"] += 1
+        ts = self._event_ts(event)
+        if ts is not None:
+            if seg["first_ts"] is None:
+                seg["first_ts"] = ts
+            seg["last_ts"] = ts
+
+    # -------------------------------------------------
+    # ESCRITA
+    # -------------------------------------------------
+    def __len__(self) -> int:
+        if not self.segments:
+            return 0
+        return self.segments[-1]["last"] + 1
+
+    def _active(self) -> dict:
+        if not self.segments:
+            self.segments.append(self._scan_segment(1, 0))
+        return self.segments[-1]
+
+    def _roll(self):
+        closed = self.segments[-1]
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+        self.segments.append(self._scan_segment(closed["id"] + 1, closed["last"] + 1))
+        self._write_index(self.segments)
+
+    def append(self, event: dict) -> int:
+        """
+        Acrescenta um evento e retorna seu offset global.
+        Eventos sem "ts" numérico recebem o horário atual.
+        """
+        return self.append_many([event])
+
+    def append_many(self, events: list[dict]) -> int:
+        if self.readonly:
+            raise RuntimeError(f"EventLog somente leitura: {self.directory}")
+
+        with self._lock:
+            seg = self._active()
+
+            for event in events:
+                if self._event_ts(event) is None:
+                    event = {**event, "ts": time.time()}
+
+                line = json.dumps(event, ensure_ascii=False) + "\n"
+
+                if self._fh is None:
+                    self._fh = open(
+                        self._segment_path(seg["id"]), "a", encoding="utf-8"
+                    )
+
+                self._fh.write(line)
+                seg["bytes"] += len(line.encode("utf-8"))
+                self._observe(seg, event)
+
+                if seg["bytes"] >= self.segment_bytes:
+                    self._fh.flush()
+                    self._roll()
+                    seg = self.segments[-1]
+
+            if self._fh:
+                self._fh.flush()
+
+            return seg["last"]
+
+    def import_jsonl(self, path: str) -> int:
+        """
+        Migra um events.jsonl legado para dentro do log.
+        Retorna o número de eventos importados.
+        """
+        if not os.path.exists(path):
+            return 0
+
+        batch = []
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    batch.append(json.loads(line.strip()))
+                except Exception:
+                    continue
+                if len(batch) >= 1000:
+                    self.append_many(batch)
+                    count += len(batch)
+                    batch = []
+
+        if batch:
+            self.append_many(batch)
+            count += len(batch)
+
+        return count
+
+    def close(self):
+        with self._lock:
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+
+    # -------------------------------------------------
+    # LEITURA
+    # -------------------------------------------------
+    @staticmethod
+    def _parse(raw: bytes):
+        try:
+            return json.loads(raw)
+        except Exception:
+            return None
+
+    def _read_segment(self, seg_id: int):
+        path = self._segment_path(seg_id)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # escrita em andamento
+                event = self._parse(raw)
+                if event is not None:
+                    yield event
+
+    def _read_segment_backwards(self, seg_id: int, block: int = 64 * 1024):
+        """Eventos do segmento, do mais novo ao mais antigo."""
+        path = self._segment_path(seg_id)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            rest = b""
+            complete = False  # linha final incompleta = escrita em andamento
+
+            while pos > 0:
+                size = min(block, pos)
+                pos -= size
+                f.seek(pos)
+                lines = (f.read(size) + rest).split(b"\n")
+                rest = lines.pop(0)  # pode continuar no bloco anterior
+
+                if not complete:
+                    if not lines:
+                        continue  # nenhuma quebra de linha ainda
+                    lines.pop()  # depois da última quebra: vazio ou parcial
+                    complete = True
+
+                for raw in reversed(lines):
+                    event = self._parse(raw) if raw else None
+                    if event is not None:
+                        yield event
+
+            if complete and rest:
+                event = self._parse(rest)
+                if event is not None:
+                    yield event
+
+    def iter(self):
+        """
+        Todos os eventos, do mais antigo ao mais novo, sem carregar
+        o log inteiro em memória.
+        """
+        for seg_id in self._segment_ids_on_disk():
+            yield from self._read_segment(seg_id)
+
+    def tail(self, n: int) -> list[dict]:
+        """
+        Últimos n eventos. Lê os segmentos de trás para frente, a
+        partir do fim do arquivo, e para assim que tiver n: o custo
+        depende de n, não do tamanho do segmento.
+        """
+        if n <= 0:
+            return []
+
+        out = []
+        for seg_id in reversed(self._segment_ids_on_disk()):
+            for event in self._read_segment_backwards(seg_id):
+                out.append(event)
+                if len(out) >= n:
+                    out.reverse()
+                    return out
+
+        out.reverse()
+        return out
+
+    def since(self, ts: float):
+        """
+        Eventos com ts >= ts. Usa o índice para pular os segmentos
+        inteiramente anteriores ao instante pedido.
+        """
+        segments = [s for s in self.segments if s["last_ts"] is not None]
+        last_ts = [s["last_ts"] for s in segments]
+        pos = bisect.bisect_left(last_ts, ts)
+        if pos < len(segments):
+            start = segments[pos]["id"]
+        else:
+            # Depois de tudo o que o índice conhece: só o último
+            # segmento indexado (ainda ativo na abertura) e os novos
+            start = segments[-1]["id"] if segments else None
+
+        for seg_id in self._segment_ids_on_disk():
+            if start is not None and seg_id < start:
+                continue
+            for event in self._read_segment(seg_id):
+                event_ts = self._event_ts(event)
+                if event_ts is not None and event_ts >= ts:
+                    yield event
+
+    # -------------------------------------------------
+    # ACOMPANHAMENTO INCREMENTAL
+    # -------------------------------------------------
+    def start_cursor(self, backlog: int = 0) -> tuple[int, int]:
+        """
+        Cursor posicionado no início do segmento que contém
+        os últimos `backlog` eventos (ou no fim do log, se 0).
+        """
+        ids = self._segment_ids_on_disk()
+        if not ids:
+            return (1, 0)
+
+        if backlog <= 0:
+            last = ids[-1]
+            return (last, os.path.getsize(self._segment_path(last)))
+
+        counts = {s["id"]: s["last"] - s["first"] + 1 for s in self.segments}
+        remaining = backlog
+        for seg_id in reversed(ids):
+            remaining -= counts.get(seg_id, backlog)
+            if remaining <= 0:
+                return (seg_id, 0)
+
+        return (ids[0], 0)
+
+    def follow(self, cursor: tuple[int, int]) -> tuple[list[dict], tuple[int, int]]:
+        """
+        Lê apenas o que foi escrito depois do cursor.
+        Retorna (eventos novos, novo cursor).
+        """
+        seg_id, offset = cursor
+        events = []
+
+        while True:
+            # Verifica o próximo segmento ANTES de ler o atual:
+            # se ele já existe, o atual está fechado e completo.
+            has_next = os.path.exists(self._segment_path(seg_id + 1))
+
+            path = self._segment_path(seg_id)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    chunk = f.read()
+
+                end = chunk.rfind(b"\n") + 1
+                for raw in chunk[:end].split(b"\n")[:-1]:
+                    event = self._parse(raw)
+                    if event is not None:
+                        events.append(event)
+                offset += end
+
+            if not has_next:
+                break
+
+            seg_id, offset = seg_id + 1, 0
+
+        return events, (seg_id, offset)
+
+
+class EventLogTail:
+    """
+    Janela deslizante dos últimos `maxlen` eventos de um EventLog,
+    atualizada incrementalmente a cada poll().
+    """
+
+    def __init__(self, log: EventLog, maxlen: int = 500):
+        self.log = log
+        self.maxlen = maxlen
+        self.items = deque(maxlen=maxlen)
+        self.generation = 0
+        self.cursor = log.start_cursor(backlog=maxlen)
+
+    def reset(self):
+        self.items.clear()
+        self.cursor = self.log.start_cursor(backlog=self.maxlen)
+        self.generation += 1
+
+    def poll(self) -> list:
+        seg_id, offset = self.cursor
+        path = self.log._segment_path(seg_id)
+
+        # Segmento sumiu ou encolheu → log recriado
+        if offset and (not os.path.exists(path) or os.path.getsize(path) < offset):
+            self.reset()
+
+        new, self.cursor = self.log.follow(self.cursor)
+        self.items.extend(new)
+        return new
+
+    def last(self, limit: int) -> list:
+        if limit <= 0:
+            return []
+        n = len(self.items)
+        if limit >= n:
+            return list(self.items)
+        return [self.items[i] for i in range(n - limit, n)]
@@ -0,0 +1,123 @@
+import threading
+import time
+
+
+class StatePersister:
+    """
+    Persistência write-behind do estado do Engine.
+
+    - submit() apenas guarda o snapshot mais recente (não toca o disco)
+    - uma thread de fundo grava no máximo `max_staleness` segundos depois
+      da primeira mudança pendente
+    - rajadas de submits dentro dessa janela viram uma única escrita
+    - flush() grava imediatamente o que estiver pendente
+
+    Com max_staleness <= 0 a gravação é síncrona.
+    Nunca lança exceção.
+    """
+
+    def __init__(self, store, max_staleness: float = 1.0):
+        self.store = store
+        self.max_staleness = max_staleness
+
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+        self._pending = None
+        self._pending_seq = 0
+        self._dirty_since = None
+        self._written_seq = 0
+
+        # Métricas
+        self.submits = 0
+        self.writes = 0
+        self.coalesced = 0
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def submit(self, snapshot: dict):
+        with self._cond:
+            self.submits += 1
+            if self._pending is not None:
+                self.coalesced += 1
+
+            self._pending_seq += 1
+            self._pending = (self._pending_seq, snapshot)
+
+            if self.max_staleness > 0:
+                # A thread só precisa acordar na transição limpo → sujo;
+                # depois disso ela já está esperando o prazo.
+                if self._dirty_since is None:
+                    self._dirty_since = time.monotonic()
+                    self._ensure_thread()
+                    self._cond.notify()
+                return
+
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+
+        self.flush()
+
+    def flush(self):
+        with self._cond:
+            pending = self._take()
+
+        if pending:
+            self._write(*pending)
+
+    def pending(self) -> bool:
+        return self._pending is not None
+
+    def stats(self) -> dict:
+        return {
+            "submits": self.submits,
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "pending": self.pending(),
+        }
+
+    # -------------------------------------------------
+    # INTERNOS
+    # -------------------------------------------------
+    def _take(self):
+        pending = self._pending
+        self._pending = None
+        self._dirty_since = None
+        return pending
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="state-persister", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+
+                delay = self._dirty_since + self.max_staleness - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                pending = self._take()
+
+            self._write(*pending)
+
+    def _write(self, seq: int, snapshot: dict):
+        with self._write_lock:
+            # Um flush() pode ter gravado uma versão mais nova antes
+            if seq <= self._written_seq:
+                return
+
+            try:
+                self.store.save(snapshot)
+                self._written_seq = seq
+                self.writes += 1
+            except Exception as e:
+                print(f"[STORE] Falha ao persistir estado: {e}")
@@ -1,11 +1,41 @@
 import json
 import os
+import threading
+from array import array
 from datetime import datetime
 
+from storage.event_log import EventLog
+
+
+def _encode(value):
+    # Históricos do World chegam como array('d')
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} não é serializável")
+
 
 class JSONStore:
-    def __init__(self, path: str):
+    """
+    Estado "quente" em state.json (pequeno e limitado) +
+    histórico append-only em logs segmentados:
+
+        <dir>/events/   eventos operacionais
+        <dir>/trades/   ações financeiras
+    """
+
+    def __init__(self, path: str, events_dir: str | None = None):
         self.path = path
+        self.event_seq = 0  # eventos registrados nesta execução
+        self._lock = threading.Lock()
+
+        base = os.path.dirname(path) or "."
+        self.events = EventLog(events_dir or os.path.join(base, "events"))
+        self.trades = EventLog(os.path.join(base, "trades"))
+
+        # Migração única do log plano legado
+        legacy = os.path.join(base, "events.jsonl")
+        if len(self.events) == 0 and os.path.exists(legacy):
+            self.events.import_jsonl(legacy)
 
     def exists(self) -> bool:
         return os.path.exists(self.path)
@@ -23,45 +53,51 @@ class JSONStore:
             "last_update": datetime.utcnow().isoformat(),
         }
 
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(snapshot, f, indent=4, ensure_ascii=False)
+        # Grava em arquivo temporário e troca atomicamente:
+        # leitores nunca enxergam um state.json pela metade.
+        tmp = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    snapshot,
+                    f,
+                    separators=(",", ":"),
+                    ensure_ascii=False,
+                    default=_encode,
+                )
+            os.replace(tmp, self.path)
 
     def record_event(self, event: dict) -> None:
         """
-        Acrescenta o evento em um log sequencial.
+        Registra eventos operacionais (decisões, bloqueios, estados, erros)
+        no log segmentado. Custo O(1): não relê nem regrava o state.json.
         Nunca lança exceção.
         Nunca altera eventos anteriores.
         """
+        self.event_seq += 1
+
         try:
-            path = "storage/events.jsonl"
-            with open(path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self.events.append(event)
         except Exception:
             pass  # nunca quebra o robô
 
-        """
-        Registra eventos operacionais:
-        - decisões
-        - bloqueios
-        - estados
-        - erros
-        """
-        data = self.load() or {}
+    def record_events(self, events: list[dict]) -> None:
+        """Lote de eventos numa única escrita (assinante do EventBus)."""
+        self.event_seq += len(events)
 
-        events = data.get("events", [])
-        events.append(event)
-
-        data["events"] = events
-        self.save(data)
+        try:
+            self.events.append_many(events)
+        except Exception:
+            pass
 
     def record_trade(self, trade: dict) -> None:
         """
         Registra apenas ações financeiras.
         """
-        data = self.load() or {}
-
-        trades = data.get("trades", [])
-        trades.append(trade)
+        try:
+            self.trades.append(trade)
+        except Exception:
+            pass
 
-        data["trades"] = trades
-        self.save(data)
+    def read_events(self, limit: int = 100) -> list[dict]:
+        return self.events.tail(limit)
@@ -9,9 +9,15 @@ class BaseBinaryStrategy:
     - adapt(...)
     - export()
     - import_state(...)
+
+    learn(eventos) é o assinante do EventBus: recebe, em lote, os
+    resultados de contratos ("binary_result") e os passa a adapt().
+
+    `version` deve ser incrementado sempre que o estado exportável mudar.
     """
 
     name = "base-binary"
+    version = 0
 
     def decide(self, state, world, context=None):
         """
@@ -28,6 +34,12 @@ class BaseBinaryStrategy:
         """
         return
 
+    def learn(self, events: list[dict]):
+        """Lote de resultados de contratos vindo do EventBus."""
+        for event in events:
+            if event.get("type") == "binary_result":
+                self.adapt(event)
+
     def export(self) -> dict:
         """
         Estado persistente da estratégia.
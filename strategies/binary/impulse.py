@@ -1,20 +1,50 @@
 # strategies/binary/impulse.py
 
-import time
+from core.clock import WallClock
 from strategies.binary.base import BaseBinaryStrategy
+from strategies.binary.stats import (
+    PATTERNS,
+    TEMPOS,
+    ZONES,
+    StatsTable,
+    context_code,
+)
+
+try:
+    import numpy as np
+except ImportError:  # caminho escalar continua disponível
+    np = None
+
+# Abaixo disso o custo fixo do NumPy supera o ganho do lote
+BATCH_MIN_SYMBOLS = 64
 
 
 class ImpulseBinary(BaseBinaryStrategy):
     name = "impulse-binary"
 
-    def __init__(self, symbols, base_threshold=2, expiry=60):
+    def __init__(
+        self,
+        symbols,
+        base_threshold=2,
+        expiry=60,
+        clock=None,
+        vectorized=None,
+        stats_path=None,
+    ):
         self.symbols = symbols
+        self.clock = clock or WallClock()
         self.base_threshold = base_threshold
         self.expiry = expiry
 
-        # Aprendizado
-        self.context_stats = {}  # (pattern, zone, tempo) -> stats
-        self.by_symbol = {}  # symbol -> {win, loss}
+        # Aprendizado: tabela por contexto (padrão × zona × tempo) e
+        # por símbolo. Com stats_path, vive em arquivo próprio, gravado
+        # só quando muda; sem ele, vai junto no export().
+        self.stats = StatsTable(symbols, base_threshold)
+        self.stats_path = stats_path
+        self._stats_loaded = False
+        if stats_path:
+            self._stats_loaded = self.stats.load(stats_path)
+        self._saved_stats = self.stats.version
 
         # Eventos temporais
         self.last_event_ts = None
@@ -42,6 +72,18 @@ class ImpulseBinary(BaseBinaryStrategy):
         self.quality_memory = []  # [(quality, result)]
         self.quality_memory_limit = 20
 
+        self.version = 0
+
+        # Avaliação em lote (NumPy): mesmas decisões do caminho escalar,
+        # com o estado por símbolo em arrays
+        if vectorized is None:
+            vectorized = np is not None and len(symbols) >= BATCH_MIN_SYMBOLS
+        if vectorized and np is None:
+            raise ImportError("vectorized=True requer numpy")
+        self.vectorized = vectorized
+        if vectorized:
+            self._init_arrays()
+
     # ==================================================
     # AUXILIARES COGNITIVOS
     # ==================================================
@@ -85,20 +127,16 @@ class ImpulseBinary(BaseBinaryStrategy):
         return score
 
     def _threshold(self, pattern, zone, tempo):
-        key = (pattern, zone, tempo)
-        ctx = self.context_stats.get(key)
-        return ctx.get("threshold", self.base_threshold) if ctx else self.base_threshold
+        return self.stats.threshold(context_code(pattern, zone, tempo))
 
     def symbol_bias(self, symbol):
-        rec = self.by_symbol.get(symbol)
-        if not rec:
-            return 0
+        win, loss = self.stats.symbol_record(symbol)
 
-        total = rec["win"] + rec["loss"]
+        total = win + loss
         if total < 5:
             return 0
 
-        rate = rec["win"] / total
+        rate = win / total
         if rate > 0.65:
             return -1
         if rate < 0.35:
@@ -110,7 +148,7 @@ class ImpulseBinary(BaseBinaryStrategy):
     # ==================================================
 
     def decide(self, state, world, context=None):
-        now = time.time()
+        now = self.clock.time()
 
         # Eventos temporais
         event = world.get("_event", {})
@@ -141,13 +179,19 @@ class ImpulseBinary(BaseBinaryStrategy):
         if state.name != "IDLE":
             return None
 
+        if self.vectorized:
+            return self._decide_batched(world, now)
+        return self._decide_scalar(world, now)
+
+    def _decide_scalar(self, world, now):
+        """Caminho de referência: um símbolo por vez."""
         for symbol in self.symbols:
             # Cooldown por símbolo
             last_ts = self.symbol_cooldown.get(symbol)
             if last_ts and now - last_ts < self.cooldown:
                 continue
 
-            data = world.get(symbol)
+            data = world.get("prices", {}).get(symbol)
             if not data:
                 continue
 
@@ -249,6 +293,191 @@ class ImpulseBinary(BaseBinaryStrategy):
 
         return None
 
+    # ==================================================
+    # DECIDE EM LOTE (NumPy)
+    # ==================================================
+
+    def _init_arrays(self):
+        n = len(self.symbols)
+        self._zones = {z: i for i, z in enumerate(ZONES)}
+        self._conv = np.zeros((n, 2), dtype=np.int64)  # [buy, sell]
+        self._last_emit = np.zeros(n)  # 0 = nunca (como o dict vazio)
+        self._bias = np.zeros(n, dtype=np.int64)
+        self._bias_version = None
+
+    def _zone_code(self, zone):
+        code = self._zones.get(zone)
+        if code is None:
+            code = self._zones[zone] = len(self._zones)
+        return code
+
+    def _threshold_table(self):
+        """thresholds[padrão, zona, tempo]; zonas fora de ZONES usam a base."""
+        table = np.full(
+            (len(PATTERNS), len(self._zones), len(TEMPOS)), self.base_threshold
+        )
+        table[:, : len(ZONES), :] = np.array(self.stats.ctx_threshold).reshape(
+            len(PATTERNS), len(ZONES), len(TEMPOS)
+        )
+        return table
+
+    def _symbol_biases(self):
+        """symbol_bias() de todos os símbolos de uma vez."""
+        n = len(self.symbols)
+        win = np.array(self.stats.sym_win[:n], dtype=float)
+        total = win + np.array(self.stats.sym_loss[:n], dtype=float)
+        rate = win / np.maximum(total, 1)
+        bias = np.where(rate > 0.65, -1, np.where(rate < 0.35, 1, 0))
+        return np.where(total < 5, 0, bias)
+
+    def _gather(self, world):
+        """
+        Lê o mundo numa única volta em Python e devolve colunas NumPy
+        (símbolos sem dados ficam com wlen = -1).
+        """
+        prices = world.get("prices", {})
+        zone_code = self._zone_code
+        rows, flat, lens, micros, prevs, zones = [], [], [], [], [], []
+
+        for symbol in self.symbols:
+            data = prices.get(symbol)
+            binary = data.get("binary") if data else None
+            macro = data.get("macro") if data else None
+            if not binary or not macro:
+                rows.append(None)
+                lens.append(-1)
+                micros.append(0)
+                prevs.append(0)
+                zones.append(0)
+                continue
+
+            window = binary.get("window", [])
+            zone = macro.get("zone")
+            micro = binary.get("micro_trend", 0)
+            flat.extend(window)
+            lens.append(len(window))
+            micros.append(micro)
+            prevs.append(binary.get("prev_trend", 0))
+            zones.append(zone_code(zone))
+            rows.append((zone, micro, window))
+
+        wlen = np.array(lens)
+        sizes = np.maximum(wlen, 0)
+
+        # Energia = soma de |x| de cada janela, via soma acumulada
+        acc = np.concatenate(([0.0], np.cumsum(np.abs(np.array(flat, dtype=float)))))
+        ends = np.cumsum(sizes)
+        energy = acc[ends] - acc[ends - sizes]
+
+        return (
+            rows,
+            wlen,
+            energy,
+            np.array(micros, dtype=float),
+            np.array(prevs, dtype=float),
+            np.array(zones),
+        )
+
+    def _decide_batched(self, world, now):
+        """
+        Mesmas regras de _decide_scalar para todos os símbolos de uma
+        vez. O efeito sequencial do laço escalar (ele para no primeiro
+        símbolo que emite) é reproduzido aplicando as atualizações de
+        convicção só até esse símbolo.
+        """
+        rows, wlen, energy, micro, prev, zone = self._gather(world)
+
+        if self._bias_version != self.stats.version:
+            self._bias[:] = self._symbol_biases()
+            self._bias_version = self.stats.version
+
+        top = zone == self._zones["top"]
+        bottom = zone == self._zones["bottom"]
+        middle = zone == self._zones["middle"]
+
+        # Validade
+        last = self._last_emit
+        cooling = (last != 0) & (now - last < self.cooldown)
+        valid = ~cooling & (wlen >= 4) & (energy >= 4)
+
+        # Dissonância / ritmo / tempo
+        strong = ((top & (micro > 0)) | (bottom & (micro < 0))) & valid
+        active = valid & ~strong
+        moderate = middle
+        dis_none = ~strong & ~moderate
+        fast = energy >= 5
+        slow = energy <= 2
+        normal = ~fast & ~slow
+        tempo = np.where(np.abs(micro) >= 3, 0, 1)  # índice em TEMPOS
+
+        # Limiares efetivos
+        table = self._threshold_table()
+        penalty = slow.astype(np.int64) + moderate
+        eff_buy = table[0, zone, tempo] + self._bias + penalty
+        eff_sell = table[1, zone, tempo] + self._bias + penalty
+
+        buy = active & bottom & (prev < 0) & (micro >= eff_buy)
+        sell = active & top & (prev > 0) & (micro <= -eff_sell)
+
+        conv_buy, conv_sell = self._conv[:, 0], self._conv[:, 1]
+        new_buy = np.where(buy, conv_buy + 1, 0)
+        new_sell = np.where(sell, conv_sell + 1, 0)
+
+        # Qualidade
+        base_q = 2 * fast + normal + 2 * dis_none + moderate + (energy >= 5)
+        ready_buy = buy & (new_buy >= self.conviction_threshold)
+        ready_sell = sell & (new_sell >= self.conviction_threshold)
+        q_buy = base_q + (new_buy >= self.conviction_threshold)
+        q_sell = base_q + (new_sell >= self.conviction_threshold)
+        fire_buy = ready_buy & (q_buy >= self.min_quality)
+        fire_sell = ready_sell & (q_sell >= self.min_quality)
+
+        # Compra pronta mas de baixa qualidade: o escalar faz `continue`
+        # antes de avaliar a venda, então a convicção de venda fica como está
+        skip_sell = ready_buy & ~fire_buy
+
+        hits = np.flatnonzero(fire_buy | fire_sell)
+        k = int(hits[0]) if hits.size else len(self.symbols)
+
+        upd_buy = np.where(active, new_buy, np.where(strong, 0, conv_buy))
+        upd_sell = np.where(
+            active & ~skip_sell, new_sell, np.where(strong, 0, conv_sell)
+        )
+        conv_buy[:k] = upd_buy[:k]
+        conv_sell[:k] = upd_sell[:k]
+
+        if k == len(self.symbols):
+            return None
+
+        symbol = self.symbols[k]
+        zone_name, micro_trend, window = rows[k]
+        rhythm = "FAST" if fast[k] else "SLOW" if slow[k] else "NORMAL"
+        dissonance = "MODERATE" if moderate[k] else "NONE"
+        tempo_name = TEMPOS[tempo[k]]
+
+        if fire_buy[k]:
+            side, pattern, quality = "BUY", PATTERNS[0], int(q_buy[k])
+            conv_buy[k] = 0
+        else:
+            side, pattern, quality = "SELL", PATTERNS[1], int(q_sell[k])
+            conv_buy[k] = upd_buy[k]
+            conv_sell[k] = 0
+
+        self._last_emit[k] = now
+        return self._emit(
+            symbol,
+            side,
+            pattern,
+            zone_name,
+            tempo_name,
+            micro_trend,
+            window,
+            rhythm,
+            dissonance,
+            now,
+            quality,
+        )
+
     # ==================================================
     # EMIT
     # ==================================================
@@ -277,6 +506,7 @@ class ImpulseBinary(BaseBinaryStrategy):
         self.conviction[(symbol, pattern)] = 0
 
         return {
+            "type": "CONTRACT",
             "symbol": symbol,
             "side": side,
             "amount": 1.0,
@@ -308,6 +538,8 @@ class ImpulseBinary(BaseBinaryStrategy):
         if result not in ("WIN", "LOSS"):
             return
 
+        self.version += 1
+
         symbol = diagnosis.get("symbol")
         pattern = diagnosis.get("pattern")
         zone = diagnosis.get("zone")
@@ -333,50 +565,56 @@ class ImpulseBinary(BaseBinaryStrategy):
                     self.min_quality -= 1
 
         # Aprendizado por símbolo
+        won = result == "WIN"
         if symbol:
-            rec = self.by_symbol.setdefault(symbol, {"win": 0, "loss": 0})
-            if result == "WIN":
-                rec["win"] += 1
-            else:
-                rec["loss"] += 1
+            self.stats.record_symbol(symbol, won)
 
         # Aprendizado contextual
         if pattern and zone and tempo:
-            key = (pattern, zone, tempo)
-            ctx = self.context_stats.setdefault(
-                key,
-                {"win": 0, "loss": 0, "threshold": self.base_threshold},
-            )
-
-            if result == "WIN":
-                ctx["win"] += 1
-            else:
-                ctx["loss"] += 1
-
-            total = ctx["win"] + ctx["loss"]
-            if total >= 8:
-                winrate = ctx["win"] / total
-                if winrate < 0.45:
-                    ctx["threshold"] = min(6, ctx["threshold"] + 1)
-                elif winrate > 0.6:
-                    ctx["threshold"] = max(1, ctx["threshold"] - 1)
+            code = context_code(pattern, zone, tempo)
+            if code is not None:
+                self.stats.record_context(code, won)
 
     # ==================================================
     # PERSISTÊNCIA
     # ==================================================
 
     def export(self):
-        return {
+        data = {
             "base_threshold": self.base_threshold,
-            "context_stats": self.context_stats,
-            "by_symbol": self.by_symbol,
             "min_quality": self.min_quality,
         }
 
+        if self.stats_path:
+            self.save_stats()
+        else:
+            # Cópia em listas: o snapshot é gravado fora da thread do Engine
+            data["stats"] = self.stats.to_dict()
+
+        return data
+
+    def save_stats(self):
+        """Grava a tabela de aprendizado no arquivo próprio, se mudou."""
+        if self.stats.version == self._saved_stats:
+            return
+        try:
+            self.stats.save(self.stats_path)
+            self._saved_stats = self.stats.version
+        except OSError as e:
+            print(f"⚠️ [IMPULSE] Falha ao gravar stats: {e}")
+
     def import_state(self, data):
         if not data:
             return
         self.base_threshold = data.get("base_threshold", self.base_threshold)
-        self.context_stats = data.get("context_stats", self.context_stats)
-        self.by_symbol = data.get("by_symbol", self.by_symbol)
+        self.stats.set_base(self.base_threshold)
         self.min_quality = data.get("min_quality", self.min_quality)
+
+        # O arquivo próprio, se existir, já foi lido e tem precedência
+        if not self._stats_loaded:
+            if "stats" in data:
+                self.stats.load_dict(data["stats"])
+            elif "context_stats" in data or "by_symbol" in data:
+                self.stats.load_legacy(data.get("context_stats"), data.get("by_symbol"))
+
+        self.version += 1
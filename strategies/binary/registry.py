@@ -11,7 +11,7 @@ def load_binary_strategies(name=None, config=None):
     symbols = config["symbols"]
 
     if name == "impulse":
-        return ImpulseBinary(symbols)
+        return ImpulseBinary(symbols, stats_path=config.get("stats_path"))
 
     # fallback seguro
     return ImpulseBinary(symbols, probability=0.01)
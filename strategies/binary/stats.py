@@ -0,0 +1,212 @@
+import json
+import os
+from array import array
+
+# Enumerações fixas: o código de um contexto é a posição em
+# PATTERNS × ZONES × TEMPOS (nessa ordem)
+PATTERNS = ("bottom_reversal", "top_reversal")
+ZONES = ("bottom", "middle", "top")
+TEMPOS = ("fast", "slow")
+
+FORMAT = 1
+
+
+def context_code(pattern, zone, tempo) -> int | None:
+    """(padrão, zona, tempo) -> código inteiro, ou None se desconhecido."""
+    try:
+        p = PATTERNS.index(pattern)
+        z = ZONES.index(zone)
+        t = TEMPOS.index(tempo)
+    except ValueError:
+        return None
+    return (p * len(ZONES) + z) * len(TEMPOS) + t
+
+
+def context_key(code: int) -> tuple:
+    rest, t = divmod(code, len(TEMPOS))
+    p, z = divmod(rest, len(ZONES))
+    return PATTERNS[p], ZONES[z], TEMPOS[t]
+
+
+N_CONTEXTS = len(PATTERNS) * len(ZONES) * len(TEMPOS)
+
+
+class StatsTable:
+    """
+    Estatísticas aprendidas do ImpulseBinary em colunas array('l'):
+
+    - por contexto (padrão × zona × tempo): vitórias, derrotas e limiar
+    - por símbolo: vitórias e derrotas
+
+    Atualizações são O(1) por código inteiro. `version` incrementa a
+    cada mudança, para quem persiste saber quando gravar.
+
+    to_dict()/load_dict() usam um formato versionado, só com listas e
+    strings (JSON puro). Contextos e símbolos são gravados pelo nome
+    das enumerações, então a leitura sobrevive a mudanças na ordem.
+    """
+
+    def __init__(self, symbols, base_threshold: int = 2):
+        self.base_threshold = base_threshold
+
+        self.ctx_win = array("l", [0]) * N_CONTEXTS
+        self.ctx_loss = array("l", [0]) * N_CONTEXTS
+        self.ctx_threshold = array("l", [base_threshold]) * N_CONTEXTS
+
+        self.symbols = []
+        self.symbol_codes: dict[str, int] = {}
+        self.sym_win = array("l")
+        self.sym_loss = array("l")
+        for symbol in symbols:
+            self.symbol_code(symbol)
+
+        self.version = 0
+
+    # -------------------------------------------------
+    # CÓDIGOS
+    # -------------------------------------------------
+    def symbol_code(self, symbol: str) -> int:
+        code = self.symbol_codes.get(symbol)
+        if code is None:
+            code = self.symbol_codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.sym_win.append(0)
+            self.sym_loss.append(0)
+        return code
+
+    # -------------------------------------------------
+    # ATUALIZAÇÃO
+    # -------------------------------------------------
+    def set_base(self, base_threshold: int):
+        """Novo limiar base para os contextos ainda sem amostras."""
+        for code in range(N_CONTEXTS):
+            if self.ctx_win[code] + self.ctx_loss[code] == 0:
+                self.ctx_threshold[code] = base_threshold
+        self.base_threshold = base_threshold
+
+    def record_symbol(self, symbol: str, won: bool):
+        code = self.symbol_code(symbol)
+        if won:
+            self.sym_win[code] += 1
+        else:
+            self.sym_loss[code] += 1
+        self.version += 1
+
+    def record_context(self, code: int, won: bool) -> int:
+        """
+        Registra o resultado e reajusta o limiar do contexto
+        (a partir de 8 amostras). Retorna o limiar atual.
+        """
+        if won:
+            self.ctx_win[code] += 1
+        else:
+            self.ctx_loss[code] += 1
+
+        win = self.ctx_win[code]
+        total = win + self.ctx_loss[code]
+        if total >= 8:
+            winrate = win / total
+            if winrate < 0.45:
+                self.ctx_threshold[code] = min(6, self.ctx_threshold[code] + 1)
+            elif winrate > 0.6:
+                self.ctx_threshold[code] = max(1, self.ctx_threshold[code] - 1)
+
+        self.version += 1
+        return self.ctx_threshold[code]
+
+    # -------------------------------------------------
+    # LEITURA
+    # -------------------------------------------------
+    def threshold(self, code: int | None) -> int:
+        if code is None:
+            return self.base_threshold
+        return self.ctx_threshold[code]
+
+    def symbol_record(self, symbol: str) -> tuple[int, int]:
+        code = self.symbol_codes.get(symbol)
+        if code is None:
+            return 0, 0
+        return self.sym_win[code], self.sym_loss[code]
+
+    # -------------------------------------------------
+    # SERIALIZAÇÃO
+    # -------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "format": FORMAT,
+            "patterns": list(PATTERNS),
+            "zones": list(ZONES),
+            "tempos": list(TEMPOS),
+            "context": {
+                "win": self.ctx_win.tolist(),
+                "loss": self.ctx_loss.tolist(),
+                "threshold": self.ctx_threshold.tolist(),
+            },
+            "symbols": list(self.symbols),
+            "symbol": {
+                "win": self.sym_win.tolist(),
+                "loss": self.sym_loss.tolist(),
+            },
+        }
+
+    def load_dict(self, data: dict):
+        if data.get("format") != FORMAT:
+            raise ValueError(f"Formato de stats desconhecido: {data.get('format')}")
+
+        patterns, zones, tempos = data["patterns"], data["zones"], data["tempos"]
+        ctx = data["context"]
+        for i, (win, loss, threshold) in enumerate(
+            zip(ctx["win"], ctx["loss"], ctx["threshold"])
+        ):
+            rest, t = divmod(i, len(tempos))
+            p, z = divmod(rest, len(zones))
+            code = context_code(patterns[p], zones[z], tempos[t])
+            if code is None:
+                continue
+            self.ctx_win[code] = win
+            self.ctx_loss[code] = loss
+            self.ctx_threshold[code] = threshold
+
+        sym = data["symbol"]
+        for symbol, win, loss in zip(data["symbols"], sym["win"], sym["loss"]):
+            code = self.symbol_code(symbol)
+            self.sym_win[code] = win
+            self.sym_loss[code] = loss
+
+        self.version += 1
+
+    def load_legacy(self, context_stats: dict, by_symbol: dict):
+        """Dicts antigos: {(padrão, zona, tempo): {...}} e {símbolo: {...}}."""
+        for key, rec in (context_stats or {}).items():
+            if isinstance(key, str):
+                key = tuple(key.split("|"))
+            code = context_code(*key) if len(key) == 3 else None
+            if code is None:
+                continue
+            self.ctx_win[code] = rec.get("win", 0)
+            self.ctx_loss[code] = rec.get("loss", 0)
+            self.ctx_threshold[code] = rec.get("threshold", self.base_threshold)
+
+        for symbol, rec in (by_symbol or {}).items():
+            code = self.symbol_code(symbol)
+            self.sym_win[code] = rec.get("win", 0)
+            self.sym_loss[code] = rec.get("loss", 0)
+
+        self.version += 1
+
+    # -------------------------------------------------
+    # ARQUIVO PRÓPRIO
+    # -------------------------------------------------
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            self.load_dict(json.load(f))
+        return True
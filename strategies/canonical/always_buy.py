@@ -8,19 +8,24 @@ class AlwaysBuyStrategy(BaseStrategy):
     def __init__(self, config: dict):
         self.config = config
         self.entries: dict[str, float] = {}
+        self.version = 0
 
     def decide(
-        self, state: State, world: dict, context: dict | None = None
+        self,
+        state: State,
+        world: dict,
+        context: dict | None = None,
+        symbols=None,
     ) -> dict | None:
         prices = world.get("prices", {})
 
         # Entrada
         if state == State.IDLE:
-            for symbol, price in prices.items():
+            for symbol in prices if symbols is None else symbols:
+                price = prices.get(symbol)
                 if price is None:
                     continue
 
-                self.entries[symbol] = price
                 return {
                     "type": "BUY",
                     "symbol": symbol,
@@ -30,6 +35,9 @@ class AlwaysBuyStrategy(BaseStrategy):
         # Saída
         if state == State.IN_POSITION:
             for symbol, entry in list(self.entries.items()):
+                if symbols is not None and symbol not in symbols:
+                    continue
+
                 price = prices.get(symbol)
                 if price is None:
                     continue
@@ -54,6 +62,17 @@ class AlwaysBuyStrategy(BaseStrategy):
 
         return None
 
+    def decide_changed(self, state, world, context, symbols):
+        return self.decide(state, world, context, symbols)
+
+    def on_position_opened(self, symbol: str, price: float):
+        self.entries[symbol] = price
+        self.version += 1
+
+    def on_position_closed(self, symbol: str):
+        self.entries.pop(symbol, None)
+        self.version += 1
+
     def export(self) -> dict:
         return {"entries": dict(self.entries)}
 
@@ -61,3 +80,4 @@ class AlwaysBuyStrategy(BaseStrategy):
         if not data:
             return
         self.entries = data.get("entries", {})
+        self.version += 1
@@ -8,8 +8,17 @@ class BaseStrategy:
     - ser serializável
     - ser restaurável
     - tolerar aprendizado histórico
+
+    `version` deve ser incrementado sempre que o estado exportável
+    mudar; o Engine só persiste quando alguma versão se move.
+
+    Opcional: decide_changed(state, world, context, symbols) avalia
+    apenas os símbolos alterados no tick. Sem ele, o Engine chama
+    decide() — e nenhum dos dois quando nada relevante mudou.
     """
 
+    version = 0
+
     def decide(self, state, world, context):
         """
         Retorna uma ação (dict) ou None.
@@ -40,6 +49,19 @@ class BaseStrategy:
         """
         pass
 
+    def on_position_opened(self, symbol: str, price: float):
+        """
+        Chamado pelo Engine quando a compra de `symbol` foi executada.
+        """
+        pass
+
+    def on_position_closed(self, symbol: str):
+        """
+        Chamado pelo Engine quando a venda de `symbol` foi executada.
+        Estratégias com memória de entradas devem esquecê-la aqui.
+        """
+        pass
+
     def export(self) -> dict:
         """
         Retorna o estado interno serializável da estratégia.
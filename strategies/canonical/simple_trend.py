@@ -17,6 +17,18 @@ class SimpleTrendStrategy:
         self.config = config
         self.entries = {}
         self.regime = "NORMAL"
+        self.version = 0  # incrementa quando o estado exportável muda
+
+        # Indicadores calculados pelo World (registrados pelo Engine)
+        self.fast = config.get("trend_fast", 9)
+        self.slow = config.get("trend_slow", 21)
+        self.rsi_period = config.get("rsi_period", 14)
+        self.indicators = [
+            ("ema", self.fast),
+            ("ema", self.slow),
+            ("rsi", self.rsi_period),
+            ("zscore", self.slow),
+        ]
 
     # ----------------------------
     # ADAPTAÇÃO COGNITIVA
@@ -24,6 +36,7 @@ class SimpleTrendStrategy:
     def adapt(self, diagnosis: dict) -> None:
         health = diagnosis.get("health", "OK")
         signals = diagnosis.get("signals", [])
+        previous = self.regime
 
         # Regimes fortes
         if health == "RISK_BLOCKED":
@@ -42,10 +55,13 @@ class SimpleTrendStrategy:
         else:
             self.regime = "NORMAL"
 
+        if self.regime != previous:
+            self.version += 1
+
     # ----------------------------
     # DECISÃO
     # ----------------------------
-    def decide(self, state, world, context):
+    def decide(self, state, world, context, symbols=None):
         mode = context.get("mode")
 
         # Estados absolutos
@@ -61,24 +77,27 @@ class SimpleTrendStrategy:
             return None
 
         prices = world["prices"]
+        indicators = world.get("indicators", {})
 
         # --------------------
         # ENTRADA
         # --------------------
         if state == State.IDLE:
-            for symbol, price in prices.items():
+            for symbol in prices if symbols is None else symbols:
+                price = prices.get(symbol)
                 if price is None:
                     continue
 
+                values = indicators.get(symbol, {})
+
                 if self.regime == "CAUTIOUS":
                     # Em modo cauteloso, só entra se o "sinal" for forte
-                    if not self.should_enter_strong(symbol, price):
+                    if not self.should_enter_strong(symbol, price, values):
                         continue
                 else:
-                    if not self.should_enter(symbol, price):
+                    if not self.should_enter(symbol, price, values):
                         continue
 
-                self.entries[symbol] = price
                 return {
                     "type": "BUY",
                     "symbol": symbol,
@@ -90,6 +109,9 @@ class SimpleTrendStrategy:
         # --------------------
         if state == State.IN_POSITION:
             for symbol, entry in list(self.entries.items()):
+                if symbols is not None and symbol not in symbols:
+                    continue
+
                 price = prices.get(symbol)
                 if not price:
                     continue
@@ -114,20 +136,60 @@ class SimpleTrendStrategy:
 
         return None
 
+    def decide_changed(self, state, world, context, symbols):
+        """
+        Caminho incremental: o Engine informa quais símbolos mudaram
+        e só eles são avaliados.
+        """
+        return self.decide(state, world, context, symbols)
+
     # ----------------------------
     # HEURÍSTICAS
     # ----------------------------
-    def should_enter(self, symbol: str, price: float) -> bool:
-        # Heurística básica atual
-        return True
+    def should_enter(self, symbol: str, price: float, values: dict) -> bool:
+        """
+        Tendência de alta: média rápida acima da lenta, preço acima
+        da rápida e RSI ainda fora de sobrecompra.
+        Sem indicadores aquecidos, não há sinal.
+        """
+        fast = values.get(f"ema_{self.fast}")
+        slow = values.get(f"ema_{self.slow}")
+        rsi = values.get(f"rsi_{self.rsi_period}")
+        if fast is None or slow is None or rsi is None:
+            return False
+
+        return fast > slow and price > fast and rsi < 70
+
+    def should_enter_strong(self, symbol: str, price: float, values: dict) -> bool:
+        """
+        Versão mais exigente do sinal: além da tendência, momento
+        claro (RSI > 55) sem preço esticado demais (z-score < 2).
+        """
+        if not self.should_enter(symbol, price, values):
+            return False
+
+        rsi = values.get(f"rsi_{self.rsi_period}")
+        zscore = values.get(f"zscore_{self.slow}")
+        if zscore is None:
+            return False
+
+        return rsi > 55 and 0 < zscore < 2
+
+    def on_position_opened(self, symbol: str, price: float):
+        """
+        Chamado pelo Engine após uma compra executada.
+        Só então a entrada passa a existir na memória da estratégia.
+        """
+        self.entries[symbol] = price
+        self.version += 1
 
-    def should_enter_strong(self, symbol: str, price: float) -> bool:
+    def on_position_closed(self, symbol: str):
         """
-        Versão mais exigente do sinal.
-        Por enquanto, é igual à normal,
-        mas aqui é onde filtros reais entrarão no futuro.
+        Chamado pelo Engine após uma venda executada.
+        Entradas antigas não podem disparar vendas fantasmas.
         """
-        return True
+        self.entries.pop(symbol, None)
+        self.version += 1
 
     # ----------------------------
     # PERSISTÊNCIA
@@ -144,3 +206,4 @@ class SimpleTrendStrategy:
 
         self.entries = data.get("entries", {})
         self.regime = data.get("regime", "NORMAL")
+        self.version += 1
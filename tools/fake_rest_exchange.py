@@ -0,0 +1,420 @@
+"""
+Servidor HTTP local que imita a API REST v5 da Bybit (market data e
+ordens spot a mercado), com latência injetável.
+
+    python -m tools.fake_rest_exchange --port 8766 --latency 0.05
+
+e no robô:
+
+    BybitBroker(symbols, endpoint="http://127.0.0.1:8766")
+
+Latência:
+- `latency`: atraso base de toda resposta
+- `slow`: {símbolo: atraso extra} para requisições individuais
+- `tail_prob` / `tail_latency`: cauda longa aleatória (para exercitar hedge)
+- `fail`: símbolos que respondem com erro
+- `bulk_fail`: a requisição em lote responde com erro
+
+Ordens (/v5/order/create, /v5/order/realtime, /v5/order/history):
+- `fill_delay`: segundos até uma ordem aceita ser executada
+- `ack_loss`: probabilidade de a ordem ser registrada mas a resposta
+  demorar `ack_loss_delay` (o cliente estoura o timeout sem saber
+  se a ordem chegou)
+- `reject`: símbolos cujas ordens são recusadas
+- `partial`: símbolos cujas ordens executam só metade e o resto é
+  cancelado (PartiallyFilledCanceled, como um mercado sem liquidez)
+- /v5/order/cancel cancela ordem ainda não executada
+- orderLinkId repetido responde 110072, como a Bybit
+- como a Bybit, /v5/order/realtime só lista ordens ativas (New,
+  PartiallyFilled); executadas e canceladas ficam em /v5/order/history
+
+Posições: ordens executadas abrem/fecham posição; `positions`:
+{símbolo: (qty, preço médio)} já abertas no início.
+- /v5/account/wallet-balance: moeda base de cada posição (spot)
+- /v5/position/list só aceita derivativos (category linear, inverse
+  ou option), como a Bybit: category=spot responde erro
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# orderStatus que /v5/order/realtime lista (ordens ativas)
+_ACTIVE = ("New", "PartiallyFilled")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        exchange = self.server.exchange
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        status, body = exchange.handle(url.path, query)
+        self._reply(status, body)
+
+    def do_POST(self):
+        exchange = self.server.exchange
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+
+        self._reply(*exchange.handle_post(urlparse(self.path).path, body))
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # o cliente desistiu (timeout/hedge)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeBybitREST:
+    def __init__(
+        self,
+        symbols: list[str],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        slow: dict | None = None,
+        tail_prob: float = 0.0,
+        tail_latency: float = 0.0,
+        fail: set | None = None,
+        bulk_fail: bool = False,
+        fill_delay: float = 0.0,
+        ack_loss: float = 0.0,
+        ack_loss_delay: float = 5.0,
+        reject: set | None = None,
+        partial: set | None = None,
+        positions: dict | None = None,
+        seed: int | None = None,
+    ):
+        self.symbols = list(symbols)
+        self.latency = latency
+        self.slow = dict(slow or {})
+        self.tail_prob = tail_prob
+        self.tail_latency = tail_latency
+        self.fail = set(fail or ())
+        self.bulk_fail = bulk_fail
+        self.fill_delay = fill_delay
+        self.ack_loss = ack_loss
+        self.ack_loss_delay = ack_loss_delay
+        self.reject = set(reject or ())
+        self.partial = set(partial or ())
+
+        self.random = random.Random(seed)
+        self.prices = {s: self.random.uniform(1, 1000) for s in symbols}
+        self._lock = threading.Lock()
+        self.orders: dict[str, dict] = {}  # orderLinkId -> ordem
+        self.positions = {s: tuple(p) for s, p in (positions or {}).items()}
+
+        self._server = _Server((host, port), _Handler)
+        self._server.exchange = self
+        self.host, self.port = self._server.server_address
+
+        # Métricas
+        self.requests = 0
+        self.bulk_requests = 0
+        self.order_requests = 0
+        self.position_requests = 0
+        self.duplicates = 0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def handle(self, path: str, query: dict) -> tuple[int, dict]:
+        with self._lock:
+            self.requests += 1
+            tail = self.random.random() < self.tail_prob
+
+        if path == "/v5/order/realtime":
+            time.sleep(self.latency)
+            return 200, self._ok(self._find_orders(query, active=True))
+
+        if path == "/v5/order/history":
+            time.sleep(self.latency)
+            return 200, self._ok(self._find_orders(query, active=False))
+
+        if path == "/v5/position/list":
+            time.sleep(self.latency)
+            if query.get("category") not in ("linear", "inverse", "option"):
+                return 200, self._error("Illegal category", 10001)
+            return 200, self._ok(self._find_positions(query))
+
+        if path == "/v5/account/wallet-balance":
+            time.sleep(self.latency)
+            return 200, self._wallet(query)
+
+        if path != "/v5/market/tickers":
+            return 404, {"retCode": 10001, "retMsg": "not found"}
+
+        symbol = query.get("symbol")
+        delay = self.latency + (self.tail_latency if tail else 0.0)
+        if symbol:
+            delay += self.slow.get(symbol, 0.0)
+        time.sleep(delay)
+
+        if symbol is None:
+            with self._lock:
+                self.bulk_requests += 1
+            if self.bulk_fail:
+                return 200, self._error("bulk indisponível")
+            items = [self._ticker(s) for s in self.symbols if s not in self.fail]
+            return 200, self._ok(items)
+
+        if symbol in self.fail or symbol not in self.prices:
+            return 200, self._error(f"symbol invalid: {symbol}")
+
+        return 200, self._ok([self._ticker(symbol)])
+
+    def handle_post(self, path: str, body: dict) -> tuple[int, dict]:
+        if path == "/v5/order/cancel":
+            time.sleep(self.latency)
+            return 200, self._cancel(body)
+
+        if path != "/v5/order/create":
+            return 404, {"retCode": 10001, "retMsg": "not found"}
+
+        time.sleep(self.latency)
+        symbol = body.get("symbol")
+        link_id = body.get("orderLinkId") or f"auto-{time.time_ns()}"
+
+        with self._lock:
+            self.order_requests += 1
+            lose_ack = self.random.random() < self.ack_loss
+
+            if link_id in self.orders:
+                self.duplicates += 1
+                return 200, self._error("OrderLinkedID is duplicate", 110072)
+            if symbol not in self.prices:
+                return 200, self._error(f"symbol invalid: {symbol}")
+            if symbol in self.reject:
+                return 200, self._error("Insufficient balance.", 170131)
+
+            order = {
+                "orderId": f"{len(self.orders) + 1:012d}",
+                "orderLinkId": link_id,
+                "symbol": symbol,
+                "side": body.get("side"),
+                "qty": float(body.get("qty") or 0),
+                "unit": body.get("marketUnit") or "baseCoin",
+                "created": time.monotonic(),
+            }
+            self.orders[link_id] = order
+
+        if lose_ack:
+            time.sleep(self.ack_loss_delay)
+
+        return 200, {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {"orderId": order["orderId"], "orderLinkId": link_id},
+            "retExtInfo": {},
+            "time": int(time.time() * 1000),
+        }
+
+    def _cancel(self, body):
+        with self._lock:
+            order = self.orders.get(body.get("orderLinkId"))
+            if order is None or "avgPrice" in order or order.get("cancelled"):
+                return self._error("Order does not exist.", 110001)
+            order["cancelled"] = True
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {
+                "orderId": order["orderId"],
+                "orderLinkId": order["orderLinkId"],
+            },
+            "retExtInfo": {},
+            "time": int(time.time() * 1000),
+        }
+
+    def _find_orders(self, query, active):
+        link_id = query.get("orderLinkId")
+        with self._lock:
+            orders = [
+                self._order(o)
+                for o in self.orders.values()
+                if link_id in (None, o["orderLinkId"])
+                and query.get("symbol") in (None, o["symbol"])
+            ]
+        return [o for o in orders if (o["orderStatus"] in _ACTIVE) == active]
+
+    def _find_positions(self, query):
+        symbol = query.get("symbol")
+        with self._lock:
+            self.position_requests += 1
+            for order in self.orders.values():
+                self._order(order)  # executa o que já venceu
+            return [
+                {
+                    "symbol": s,
+                    "size": f"{qty:.8f}",
+                    "avgPrice": f"{price:.6f}",
+                }
+                for s, (qty, price) in self.positions.items()
+                if symbol in (None, s)
+            ]
+
+    def _wallet(self, query):
+        coin = query.get("coin")
+        with self._lock:
+            for order in self.orders.values():
+                self._order(order)
+            coins = [
+                {
+                    "coin": s[: -len("USDT")],
+                    "walletBalance": f"{qty:.8f}",
+                    "locked": "0",
+                    "usdValue": f"{qty * self.prices.get(s, price):.8f}",
+                }
+                for s, (qty, price) in self.positions.items()
+                if coin in (None, s[: -len("USDT")])
+            ]
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {"list": [{"accountType": "UNIFIED", "coin": coins}]},
+            "retExtInfo": {},
+            "time": int(time.time() * 1000),
+        }
+
+    # -------------------------------------------------
+    # FORMATO v5
+    # -------------------------------------------------
+    def _ticker(self, symbol):
+        with self._lock:
+            price = self.prices[symbol] * (1 + self.random.uniform(-0.001, 0.001))
+            self.prices[symbol] = price
+        return {"symbol": symbol, "lastPrice": f"{price:.6f}"}
+
+    def _order(self, order):
+        """Chamado com o lock. Executa ao preço corrente após fill_delay."""
+        filled = time.monotonic() - order[
+            "created"
+        ] >= self.fill_delay and not order.get("cancelled")
+        if filled and "avgPrice" not in order:
+            price = self.prices[order["symbol"]]
+            qty = order["qty"]
+            if order["unit"] == "quoteCoin":
+                qty = qty / price
+            if order["symbol"] in self.partial:
+                qty *= 0.5
+            order["avgPrice"] = price
+            order["cumExecQty"] = qty
+            # Spot: taxa de 0,1% na moeda recebida
+            fee_base = order["side"] == "Buy"
+            order["cumExecFee"] = qty * 0.001 if fee_base else qty * price * 0.001
+
+            symbol = order["symbol"]
+            if order["side"] == "Buy":
+                held, _ = self.positions.get(symbol, (0.0, price))
+                self.positions[symbol] = (held + qty - order["cumExecFee"], price)
+            else:
+                self.positions.pop(symbol, None)
+
+        return {
+            "orderId": order["orderId"],
+            "orderLinkId": order["orderLinkId"],
+            "symbol": order["symbol"],
+            "side": order["side"],
+            "orderType": "Market",
+            "orderStatus": self._status(order),
+            "avgPrice": f"{order.get('avgPrice', 0):.6f}",
+            "cumExecQty": f"{order.get('cumExecQty', 0):.8f}",
+            "cumExecFee": f"{order.get('cumExecFee', 0):.8f}",
+            "rejectReason": "EC_NoError",
+        }
+
+    def _status(self, order):
+        if order.get("cancelled"):
+            return "Cancelled"
+        if "avgPrice" not in order:
+            return "New"
+        if order["symbol"] in self.partial:
+            return "PartiallyFilledCanceled"
+        return "Filled"
+
+    def _ok(self, items):
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {"category": "spot", "list": items},
+            "retExtInfo": {},
+            "time": int(time.time() * 1000),
+        }
+
+    def _error(self, message, code=10001):
+        # Código fora da lista de retry do pybit: vira InvalidRequestError
+        return {
+            "retCode": code,
+            "retMsg": message,
+            "result": {},
+            "retExtInfo": {},
+            "time": int(time.time() * 1000),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bybit REST falsa (local)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--symbols", nargs="*", default=["BTCUSDT", "ETHUSDT"])
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--tail-prob", type=float, default=0.0)
+    parser.add_argument("--tail-latency", type=float, default=0.0)
+    parser.add_argument("--fill-delay", type=float, default=0.0)
+    parser.add_argument("--ack-loss", type=float, default=0.0)
+    args = parser.parse_args()
+
+    exchange = FakeBybitREST(
+        args.symbols,
+        args.host,
+        args.port,
+        latency=args.latency,
+        tail_prob=args.tail_prob,
+        tail_latency=args.tail_latency,
+        fill_delay=args.fill_delay,
+        ack_loss=args.ack_loss,
+    ).start()
+    print(f"🧪 Bybit REST falsa em {exchange.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        exchange.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Servidor WebSocket local que imita o canal público spot da Bybit.
+
+Serve para testar o BybitTickerStream offline:
+
+    python -m tools.fake_ws_exchange --port 8765
+
+e no robô:
+
+    BybitBroker(symbols, stream=True, stream_url="ws://127.0.0.1:8765")
+
+Implementa só o necessário do RFC 6455 (handshake, frames de texto,
+ping/pong e close), sem dependências.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def _recv_exact(sock, n):
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("conexão fechada")
+        data += chunk
+    return data
+
+
+def read_frame(sock):
+    """Lê um frame (cliente → servidor, sempre mascarado)."""
+    b1, b2 = _recv_exact(sock, 2)
+    opcode = b1 & 0x0F
+    length = b2 & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", _recv_exact(sock, 2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", _recv_exact(sock, 8))
+
+    mask = _recv_exact(sock, 4) if b2 & 0x80 else None
+    payload = _recv_exact(sock, length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+def write_frame(sock, opcode, payload: bytes):
+    """Escreve um frame (servidor → cliente, sem máscara)."""
+    header = bytes([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header += bytes([n])
+    elif n < 65536:
+        header += bytes([126]) + struct.pack("!H", n)
+    else:
+        header += bytes([127]) + struct.pack("!Q", n)
+    sock.sendall(header + payload)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        exchange = self.server.exchange
+        sock = self.request
+
+        if not self._handshake(sock):
+            return
+
+        client = _Client(sock)
+        exchange._attach(client)
+        try:
+            while True:
+                opcode, payload = read_frame(sock)
+                if opcode == OP_CLOSE:
+                    client.send(OP_CLOSE, payload[:2])
+                    break
+                if opcode == OP_PING:
+                    client.send(OP_PONG, payload)
+                    continue
+                if opcode == OP_TEXT:
+                    exchange._handle(client, payload.decode("utf-8"))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            exchange._detach(client)
+
+    def _handshake(self, sock):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return False
+            request += chunk
+
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        key = headers.get("sec-websocket-key")
+        if not key:
+            sock.sendall(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            return False
+
+        accept = base64.b64encode(
+            hashlib.sha1((key + _GUID).encode()).digest()
+        ).decode()
+        sock.sendall(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode()
+        )
+        return True
+
+
+class _Client:
+    def __init__(self, sock):
+        self.sock = sock
+        self.topics = set()
+        self.lock = threading.Lock()
+
+    def send(self, opcode, payload: bytes):
+        with self.lock:
+            write_frame(self.sock, opcode, payload)
+
+    def send_json(self, message: dict):
+        self.send(OP_TEXT, json.dumps(message).encode("utf-8"))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeBybitWS:
+    """
+    Bolsa falsa: aceita subscribe/ping no formato da Bybit v5 e
+    publica tickers (e publicTrade) com passeio aleatório a cada
+    `interval` segundos para os tópicos assinados.
+
+    drop_connections() derruba todos os clientes, para exercitar
+    reconexão e reassinatura.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, interval=0.1, seed=None):
+        self.interval = interval
+        self.random = random.Random(seed)
+        self.prices = {}
+
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._server = _Server((host, port), _Handler)
+        self._server.exchange = self
+        self.host, self.port = self._server.server_address
+
+        # Métricas
+        self.connections = 0
+        self.subscriptions = 0
+        self.pings = 0
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    # -------------------------------------------------
+    # CICLO DE VIDA
+    # -------------------------------------------------
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._publish_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.drop_connections()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def drop_connections(self):
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # -------------------------------------------------
+    # PROTOCOLO
+    # -------------------------------------------------
+    def _attach(self, client):
+        with self._lock:
+            self._clients.add(client)
+            self.connections += 1
+
+    def _detach(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def _handle(self, client, raw):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+
+        op = message.get("op")
+        if op == "ping":
+            self.pings += 1
+            client.send_json({"success": True, "ret_msg": "pong", "op": "ping"})
+        elif op == "subscribe":
+            args = message.get("args", [])
+            client.topics.update(args)
+            self.subscriptions += len(args)
+            client.send_json(
+                {"success": True, "ret_msg": "subscribe", "op": "subscribe"}
+            )
+
+    def _publish_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                clients = list(self._clients)
+
+            now = int(time.time() * 1000)
+            for client in clients:
+                for topic in list(client.topics):
+                    try:
+                        client.send_json(self._message(topic, now))
+                    except OSError:
+                        break
+
+    def _price(self, symbol):
+        price = self.prices.get(symbol) or self.random.uniform(1, 1000)
+        price *= 1 + self.random.uniform(-0.001, 0.001)
+        self.prices[symbol] = price
+        return round(price, 6)
+
+    def _message(self, topic, now):
+        kind, symbol = topic.split(".", 1)
+        price = str(self._price(symbol))
+
+        if kind == "publicTrade":
+            return {
+                "topic": topic,
+                "type": "snapshot",
+                "ts": now,
+                "data": [{"T": now, "s": symbol, "S": "Buy", "v": "0.01", "p": price}],
+            }
+
+        return {
+            "topic": topic,
+            "type": "snapshot",
+            "ts": now,
+            "data": {"symbol": symbol, "lastPrice": price},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bybit WebSocket falsa (local)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    exchange = FakeBybitWS(args.host, args.port, args.interval).start()
+    print(f"🧪 Bybit WS falsa em {exchange.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        exchange.stop()
+
+
+if __name__ == "__main__":
+    main()
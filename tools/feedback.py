@@ -1,17 +1,130 @@
 import json
 import os
+from collections import deque
 from datetime import datetime
 
+from storage.event_log import EventLog, EventLogTail
+from tools.tail import JsonlTail
+
+
+class RollingSummary:
+    """
+    Agregados de `FeedbackEngine.summary()` mantidos de forma incremental
+    sobre as últimas `limit` entradas.
+
+    Cada evento entra uma vez (`add`) e sai uma vez (`evict`),
+    então o custo por evento é O(1), independente do tamanho do log.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.window = deque()
+
+        self.buys = self.sells = self.blocked = self.errors = 0
+        self.human_confirms = 0
+        self.human_cancels = 0
+
+        # (seq, regime) na ordem do log — preserva a ordem de primeira
+        # ocorrência dentro da janela, como em summary()
+        self.overrides = deque()
+        self._seq = 0
+
+        # Cancelamentos por segmento delimitado por confirmações.
+        # runs[0] é o segmento que começa na borda esquerda da janela.
+        self.runs = deque([0])
+
+    def _apply(self, e: dict, sign: int):
+        etype = e.get("type")
+        result = e.get("result")
+        action = e.get("action", {})
+
+        if result == "APPROVED" and action.get("type") == "BUY":
+            self.buys += sign
+        elif result == "APPROVED" and action.get("type") == "SELL":
+            self.sells += sign
+        elif result == "BLOCKED_BY_RISK":
+            self.blocked += sign
+        elif result in ("FAILED", "ERROR"):
+            self.errors += sign
+
+        if etype == "human_confirm":
+            self.human_confirms += sign
+        elif etype == "human_cancel":
+            self.human_cancels += sign
+
+    def add(self, e: dict):
+        self._apply(e, 1)
+
+        etype = e.get("type")
+        if etype == "human_confirm":
+            self.runs.append(0)
+        elif etype == "human_cancel":
+            self.runs[-1] += 1
+        elif etype == "human_override_regime" and e.get("regime"):
+            self.overrides.append((self._seq, e.get("regime")))
+
+        self.window.append((self._seq, e))
+        self._seq += 1
+
+        if len(self.window) > self.limit:
+            self.evict()
+
+    def evict(self):
+        seq, e = self.window.popleft()
+        self._apply(e, -1)
+
+        etype = e.get("type")
+        if etype == "human_confirm":
+            # Tudo antes desta confirmação já saiu da janela
+            self.runs.popleft()
+        elif etype == "human_cancel":
+            self.runs[0] -= 1
+
+        if self.overrides and self.overrides[0][0] == seq:
+            self.overrides.popleft()
+
+    def result(self) -> dict:
+        human_overrides = {}
+        for _, regime in self.overrides:
+            human_overrides[regime] = human_overrides.get(regime, 0) + 1
+
+        return {
+            "events": len(self.window),
+            "buys": self.buys,
+            "sells": self.sells,
+            "blocked": self.blocked,
+            "errors": self.errors,
+            "human_confirms": self.human_confirms,
+            "human_cancels": self.human_cancels,
+            "human_overrides": human_overrides,
+            "max_consecutive_cancels": max(self.runs),
+        }
+
 
 class FeedbackEngine:
 
-    def __init__(self, events_path: str, memory_path: str, journal_path: str):
+    def __init__(
+        self,
+        events_path: str,
+        memory_path: str,
+        journal_path: str,
+        window: int = 500,
+    ):
         self.events_path = events_path
         self.memory_path = memory_path
         self.journal_path = journal_path
 
+        # Log segmentado de eventos (events_path é um diretório)
+        self.event_log = EventLog(events_path)
+
+        # Leitura incremental: só o que foi acrescentado desde o último tick
+        self.window = window
+        self._events = EventLogTail(self.event_log, maxlen=window)
+        self._journal = JsonlTail(journal_path, maxlen=50)
+        self._rolling: dict[int, RollingSummary] = {}
+
         # Garante que todos os órgãos existam fisicamente
-        for path in (self.events_path, self.memory_path, self.journal_path):
+        for path in (self.memory_path, self.journal_path):
             os.makedirs(os.path.dirname(path), exist_ok=True)
             if not os.path.exists(path):
                 open(path, "a", encoding="utf-8").close()
@@ -21,30 +134,42 @@ class FeedbackEngine:
     # --------------------------------------------------
     def log(self, event: dict):
         try:
-            os.makedirs(os.path.dirname(self.events_path), exist_ok=True)
-            with open(self.events_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self.event_log.append(event)
         except Exception as e:
             print(f"[EVENTS] Falha ao registrar evento: {e}")
 
+    def _sync_events(self):
+        generation = self._events.generation
+        new = self._events.poll()
+
+        if self._events.generation != generation:
+            # Log truncado/recriado → agregados precisam ser refeitos
+            self._rolling.clear()
+            return
+
+        for e in new:
+            for rolling in self._rolling.values():
+                rolling.add(e)
+
     def read_events(self, limit: int = 100) -> list[dict]:
-        if not os.path.exists(self.events_path):
-            return []
+        if limit <= self.window:
+            self._sync_events()
+            return self._events.last(limit)
 
-        events = []
-        with open(self.events_path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    events.append(json.loads(line.strip()))
-                except Exception:
-                    continue
+        # Janela maior que a retida em memória → leitura completa
+        return self._read_all_events(limit)
 
-        return events[-limit:]
+    def _read_all_events(self, limit: int) -> list[dict]:
+        return self.event_log.tail(limit)
 
     # --------------------------------------------------
     # Diário cognitivo
     # --------------------------------------------------
     def read_journal(self, limit: int = 20):
+        if limit <= self._journal.maxlen:
+            self._journal.poll()
+            return self._journal.last(limit)
+
         if not os.path.exists(self.journal_path):
             return []
 
@@ -129,9 +254,30 @@ class FeedbackEngine:
             "max_consecutive_cancels": max_consecutive_cancels,
         }
 
+    def rolling_summary(self, limit: int) -> dict:
+        """
+        Equivalente a summary(read_events(limit)), porém incremental:
+        apenas eventos novos são interpretados e agregados.
+        """
+        if limit > self.window:
+            return self.summary(self._read_all_events(limit))
+
+        # A sincronização pode descartar as janelas (log reiniciado):
+        # só depois dela se sabe se esta janela ainda existe
+        self._sync_events()
+
+        rolling = self._rolling.get(limit)
+        if rolling is None:
+            # Primeira janela deste tamanho → semeia com o que já está retido
+            rolling = RollingSummary(limit)
+            for e in self._events.last(limit):
+                rolling.add(e)
+            self._rolling[limit] = rolling
+
+        return rolling.result()
+
     def diagnose(self, limit: int = 100) -> dict:
-        events = self.read_events(limit)
-        summary = self.summary(events)
+        summary = self.rolling_summary(limit)
 
         signals = []
         recommendations = []
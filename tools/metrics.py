@@ -1,28 +1,25 @@
-import json
 from collections import Counter, defaultdict
 from pathlib import Path
 
+from storage.event_log import EventLog
+
 
 class CognitiveMetrics:
     def __init__(self, events_path: str):
         self.path = Path(events_path)
+        self._log = None  # leitor único, aberto na primeira leitura
 
-    def load_events(self) -> list[dict]:
+    def load_events(self):
+        """
+        Itera os eventos do log segmentado em streaming
+        (linhas corrompidas são ignoradas).
+        """
         if not self.path.exists():
-            raise FileNotFoundError(f"Arquivo não encontrado: {self.path}")
-
-        events = []
-        with open(self.path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    events.append(json.loads(line))
-                except Exception:
-                    continue  # ignora linhas corrompidas
+            raise FileNotFoundError(f"Diretório não encontrado: {self.path}")
 
-        return events
+        if self._log is None:
+            self._log = EventLog(str(self.path), readonly=True)
+        return self._log.iter()
 
     def analyze(self) -> dict:
         events = self.load_events()
@@ -108,6 +105,45 @@ class CognitiveMetrics:
                 print(f"  {k:<10} {v}")
 
 
+class OutcomeMetrics:
+    """
+    Placar dos contratos binários em memória, alimentado em lote
+    pelo EventBus (tópico "binary_result"). Custo O(1) por evento.
+    """
+
+    def __init__(self):
+        self.total = Counter()
+        self.by_symbol = defaultdict(Counter)
+        self.by_pattern = defaultdict(Counter)
+
+    def on_batch(self, events: list[dict]) -> None:
+        for e in events:
+            result = e.get("result")
+            if result not in ("WIN", "LOSS"):
+                continue
+            self.total[result] += 1
+            self.by_symbol[e.get("symbol")][result] += 1
+            self.by_pattern[e.get("pattern")][result] += 1
+
+    @staticmethod
+    def _rate(c: Counter):
+        n = c["WIN"] + c["LOSS"]
+        return round(c["WIN"] / n, 3) if n else None
+
+    def summary(self) -> dict:
+        return {
+            "wins": self.total["WIN"],
+            "losses": self.total["LOSS"],
+            "winrate": self._rate(self.total),
+            "by_symbol": {
+                s: {**c, "winrate": self._rate(c)} for s, c in self.by_symbol.items()
+            },
+            "by_pattern": {
+                p: {**c, "winrate": self._rate(c)} for p, c in self.by_pattern.items()
+            },
+        }
+
+
 if __name__ == "__main__":
-    metrics = CognitiveMetrics("storage/events.jsonl")
+    metrics = CognitiveMetrics("storage/events")
     metrics.report()
@@ -29,6 +29,13 @@ class Panel:
         if regime:
             print(f"Regime da Estratégia: {regime}")
 
+        market = snap.get("market") or {}
+        breaker = market.get("breaker")
+        if breaker:
+            print(f"Corretora: {breaker['state']}")
+        if market.get("stale"):
+            print(f"Dados defasados: {', '.join(market['stale'])}")
+
         human = snap.get("human_profile")
         if human:
             print("\n👤 PERFIL HUMANO (inferido)")
@@ -70,6 +77,24 @@ class Panel:
             tag = e.get("result") or e.get("type")
             print(f"- {tag}")
 
+    def render_latency(self):
+        tracer = getattr(self.engine, "tracer", None)
+        if not tracer or not tracer.enabled:
+            return
+
+        stages = tracer.snapshot()
+        if not stages:
+            return
+
+        print("\n⏱ LATÊNCIA POR ESTÁGIO (ms)")
+        print("-" * 60)
+        print(f"{'estágio':<20} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for name, s in sorted(stages.items()):
+            print(
+                f"{name:<20} {s['p50']:>8.2f} {s['p95']:>8.2f} "
+                f"{s['p99']:>8.2f} {s['max']:>8.2f}"
+            )
+
     def render(self):
         self.clear()
         snap = self.engine.cognitive_snapshot()
@@ -78,3 +103,4 @@ class Panel:
         self.render_state(snap)
         self.render_intent(snap)
         self.render_events(snap)
+        self.render_latency()
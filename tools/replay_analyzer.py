@@ -1,31 +1,39 @@
-import json
 from pathlib import Path
 from datetime import datetime
 
+from storage.event_log import EventLog
+
 
 class ReplayAnalyzer:
     """
-    Lê eventos persistidos pelo JSONStore e reconstrói
-    a linha mental do robô em linguagem humana.
+    Lê eventos persistidos pelo JSONStore (log segmentado)
+    e reconstrói a linha mental do robô em linguagem humana.
     """
 
     def __init__(self, path: str):
         self.path = Path(path)
+        self._log = None  # leitor único, aberto na primeira leitura
 
-    def load(self) -> list[dict]:
+    def load(self, since: float | None = None):
+        """
+        Itera os eventos em streaming; com `since`, começa
+        direto no segmento que contém o instante pedido.
+        """
         if not self.path.exists():
-            raise FileNotFoundError(f"Arquivo não encontrado: {self.path}")
-
-        with open(self.path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            raise FileNotFoundError(f"Diretório não encontrado: {self.path}")
 
-        # Esperamos que os eventos estejam em data["events"]
-        return data.get("events", [])
+        if self._log is None:
+            self._log = EventLog(str(self.path), readonly=True)
+        log = self._log
+        return log.iter() if since is None else log.since(since)
 
     def format_event(self, ev: dict) -> str:
-        ts = ev.get("timestamp") or ev.get("time") or "?"
+        ts = ev.get("ts") or ev.get("timestamp") or ev.get("time") or "?"
         try:
-            ts = datetime.fromisoformat(ts).strftime("%Y-%m-%d %H:%M:%S")
+            if isinstance(ts, (int, float)):
+                ts = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+            else:
+                ts = datetime.fromisoformat(ts).strftime("%Y-%m-%d %H:%M:%S")
         except Exception:
             pass
 
@@ -53,19 +61,19 @@ class ReplayAnalyzer:
 
         return "\n".join(lines)
 
-    def run(self):
-        events = self.load()
-
-        if not events:
-            print("Nenhum evento encontrado.")
-            return
+    def run(self, since: float | None = None):
+        found = False
 
-        for ev in events:
+        for ev in self.load(since):
+            found = True
             print(self.format_event(ev))
             print("-" * 40)
 
+        if not found:
+            print("Nenhum evento encontrado.")
+
 
 if __name__ == "__main__":
     # Ajuste o caminho conforme seu projeto
-    analyzer = ReplayAnalyzer("storage/state.json")
+    analyzer = ReplayAnalyzer("storage/events")
     analyzer.run()
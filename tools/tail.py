@@ -0,0 +1,85 @@
+import json
+import os
+from collections import deque
+
+
+class JsonlTail:
+    """
+    Leitor incremental de um arquivo JSONL.
+
+    Lembra o offset (em bytes) já consumido e, a cada `poll()`,
+    interpreta apenas as linhas acrescentadas desde a última leitura.
+    Mantém em memória somente as últimas `maxlen` entradas.
+
+    Nunca lança exceção.
+    """
+
+    def __init__(self, path: str, maxlen: int = 500):
+        self.path = path
+        self.maxlen = maxlen
+        self.items = deque(maxlen=maxlen)
+        self.offset = 0
+        self.generation = 0  # incrementa quando o arquivo é relido do zero
+
+    def reset(self):
+        self.items.clear()
+        self.offset = 0
+        self.generation += 1
+
+    def poll(self) -> list:
+        """
+        Consome o que foi acrescentado ao arquivo.
+        Retorna apenas as entradas novas (já incorporadas à janela).
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+
+        # Arquivo truncado ou recriado → recomeça do zero
+        if size < self.offset:
+            self.reset()
+
+        if size == self.offset:
+            return []
+
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read(size - self.offset)
+        except OSError:
+            return []
+
+        lines = chunk.split(b"\n")
+        tail = lines.pop()
+        consumed = len(chunk) - len(tail)
+
+        # Um fragmento final sem "\n" só é aceito se já for um JSON completo
+        # (o prefixo de um objeto JSON nunca é um objeto válido).
+        if tail.strip():
+            try:
+                json.loads(tail.decode("utf-8").strip())
+                lines.append(tail)
+                consumed = len(chunk)
+            except Exception:
+                pass
+
+        self.offset += consumed
+
+        new = []
+        for raw in lines:
+            try:
+                new.append(json.loads(raw.decode("utf-8").strip()))
+            except Exception:
+                continue
+
+        self.items.extend(new)
+        return new
+
+    def last(self, limit: int) -> list:
+        if limit <= 0:
+            return []
+        n = len(self.items)
+        if limit >= n:
+            return list(self.items)
+        return [self.items[i] for i in range(n - limit, n)]
@@ -1,28 +1,23 @@
-import json
 import os
-from collections import deque
+
+from storage.event_log import EventLog
 
 
 class TimelineEngine:
     def __init__(self, path: str, max_items: int = 50):
         self.path = path
         self.max_items = max_items
+        self._log = None  # leitor único, aberto na primeira leitura
 
     def read(self):
         if not os.path.exists(self.path):
             return []
 
-        items = deque(maxlen=self.max_items)
-
-        with open(self.path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    e = json.loads(line)
-                    items.append(e)
-                except Exception:
-                    continue
+        if self._log is None:
+            self._log = EventLog(self.path, readonly=True)
 
-        return list(items)
+        # Só os segmentos finais são lidos
+        return self._log.tail(self.max_items)
 
     def summarize(self):
         events = self.read()
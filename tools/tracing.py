@@ -0,0 +1,121 @@
+import math
+import time
+
+
+class Histogram:
+    """
+    Histograma de latência em streaming.
+
+    Baldes logarítmicos (cada um ~`growth` vezes maior que o anterior),
+    então a memória é constante e os percentis têm erro relativo
+    limitado (~5% com growth=1.1), sem guardar amostras.
+    """
+
+    def __init__(self, growth: float = 1.1):
+        self._log_growth = math.log(growth)
+        self.growth = growth
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        us = seconds * 1e6
+        index = int(math.log(us) / self._log_growth) if us > 1 else 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """Percentil p (0–100) em segundos."""
+        if not self.count:
+            return 0.0
+
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # limite superior do balde, nunca acima do máximo observado
+                return min(self.growth ** (index + 1) / 1e6, self.max)
+
+        return self.max
+
+    def summary(self) -> dict:
+        """Resumo em milissegundos."""
+
+        def ms(s):
+            return round(s * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean": ms(self.total / self.count) if self.count else 0.0,
+            "p50": ms(self.percentile(50)),
+            "p95": ms(self.percentile(95)),
+            "p99": ms(self.percentile(99)),
+            "max": ms(self.max),
+        }
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "started")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """
+    Instrumentação leve por estágio.
+
+        with tracer.span("strategy.decide"):
+            ...
+
+    Desligado, span() devolve sempre o mesmo objeto vazio:
+    nenhuma medição, nenhuma alocação.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: dict[str, Histogram] = {}
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        hist.record(seconds)
+
+    def snapshot(self) -> dict:
+        return {name: hist.summary() for name, hist in list(self.histograms.items())}
+
+    def reset(self):
+        self.histograms = {}
@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI()
 engine_ref = None
+outcomes_ref = None  # OutcomeMetrics (linhagem binária)
+hub_ref = None  # FeedHub (vários Engines num feed só)
 
 # Permitir qualquer origem (apenas em ambiente local)
 app.add_middleware(
@@ -19,3 +21,78 @@ def snapshot():
     if engine_ref is None:
         return {"error": "Engine not attached"}
     return engine_ref.cognitive_snapshot()
+
+
+@app.get("/latency")
+def latency():
+    if engine_ref is None:
+        return {"error": "Engine not attached"}
+    return engine_ref.tracer.snapshot()
+
+
+@app.get("/requests")
+def requests_stats():
+    if engine_ref is None:
+        return {"error": "Engine not attached"}
+    scheduler = getattr(engine_ref.broker, "scheduler", None)
+    if scheduler is None:
+        return {"error": "Broker sem agendador"}
+    return scheduler.stats()
+
+
+@app.get("/orders")
+def orders():
+    if engine_ref is None:
+        return {"error": "Engine not attached"}
+    pipeline = getattr(engine_ref.broker, "orders", None)
+    if pipeline is None:
+        return {"error": "Broker sem livro de ordens"}
+    return pipeline.stats()
+
+
+@app.get("/reconcile")
+def reconcile():
+    if engine_ref is None:
+        return {"error": "Engine not attached"}
+    if engine_ref.reconciler is None:
+        return {"error": "Conciliação desligada"}
+    return engine_ref.reconciler.stats()
+
+
+@app.get("/broker")
+def broker_stats():
+    if engine_ref is None:
+        return {"error": "Engine not attached"}
+    if not hasattr(engine_ref.broker, "stats"):
+        return {"error": "Broker sem métricas"}
+    return engine_ref.broker.stats()
+
+
+@app.get("/bus")
+def bus():
+    if engine_ref is None:
+        return {"error": "Engine not attached"}
+    if engine_ref.bus is None:
+        return {"error": "Engine sem barramento de eventos"}
+    return engine_ref.bus.stats()
+
+
+@app.get("/outcomes")
+def outcomes():
+    if outcomes_ref is None:
+        return {"error": "Placar de contratos não anexado"}
+    return outcomes_ref.summary()
+
+
+@app.get("/feed")
+def feed():
+    if hub_ref is None:
+        return {"error": "Feed compartilhado não anexado"}
+    return {**hub_ref.stats(), "laggards": hub_ref.laggards()}
+
+
+@app.get("/cache")
+def cache():
+    if engine_ref is None:
+        return {"error": "Engine not attached"}
+    return engine_ref.cache.stats()